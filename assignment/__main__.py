@@ -0,0 +1,5 @@
+import sys
+
+from assignment.cli import main
+
+sys.exit(main())
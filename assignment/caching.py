@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, NamedTuple
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    max_size: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+
+class DependencyLRUCache:
+    """
+    Bounded least recently used cache in which every entry records the keys of the information it was derived from,
+    e.g. the galactic digits of a converted amount. Invalidating a dependency only removes the entries derived from it.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        """
+        :param max_size: The maximum number of entries before the least recently used one is evicted.
+        """
+
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+
+        self.max_size = max_size
+
+        # key -> (value, dependencies), ordered from least to most recently used
+        self._entries: OrderedDict = OrderedDict()
+
+        # dependency -> keys of the entries that were derived from it
+        self._dependents: dict[Hashable, set] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        :param key: The key of the requested entry.
+        :param default: Returned in case no entry exists, such that None can be cached as a regular value.
+        :return: The cached value or default.
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Reads an entry without counting the lookup or marking the entry as recently used.
+        :param key: The key of the requested entry.
+        :param default: Returned in case no entry exists.
+        :return: The cached value or default.
+        """
+
+        entry = self._entries.get(key)
+        return default if entry is None else entry[0]
+
+    def put(self, key: Hashable, value: Any, dependencies: Iterable[Hashable] = ()) -> None:
+        """
+        Adds or replaces an entry and evicts the least recently used one if the cache is full.
+        :param key: The key of the entry.
+        :param value: The value to be cached.
+        :param dependencies: Keys of the information the value was derived from.
+        :return: None
+        """
+
+        if key in self._entries:
+            self._remove(key)
+
+        dependencies = frozenset(dependencies)
+        self._entries[key] = (value, dependencies)
+        for dependency in dependencies:
+            self._dependents.setdefault(dependency, set()).add(key)
+
+        if len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, dependency: Hashable) -> int:
+        """
+        Removes all entries that were derived from a changed piece of information.
+        :param dependency: The key of the information that changed.
+        :return: The number of removed entries.
+        """
+
+        keys = self._dependents.pop(dependency, ())
+        for key in list(keys):
+            self._remove(key)
+
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        """
+        Removes all entries, the counters are kept.
+        :return: None
+        """
+
+        self._entries.clear()
+        self._dependents.clear()
+
+    def stats(self) -> CacheStats:
+        """
+        :return: The current counters of the cache, e.g. for sizing it.
+        """
+
+        return CacheStats(self.hits, self.misses, self.evictions, self.invalidations, len(self._entries),
+                          self.max_size)
+
+    def _remove(self, key: Hashable) -> None:
+        """
+        Removes an entry and its references in the dependency index.
+        :param key: The key of the entry.
+        :return: None
+        """
+
+        _, dependencies = self._entries.pop(key)
+        for dependency in dependencies:
+            dependents = self._dependents.get(dependency)
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._dependents[dependency]
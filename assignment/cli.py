@@ -0,0 +1,113 @@
+import sys
+from typing import NamedTuple, Optional
+
+# Values of pricing.PriceFormat, repeated here such that parsing the arguments doesn't import the converter
+PRICE_FORMATS = ('float', 'fraction', 'fixed')
+
+# Values of roman_numerals.NumeralMode
+NUMERAL_MODES = ('standard', 'repeated-m', 'vinculum')
+
+# Values of records.OutputFormat
+OUTPUT_FORMATS = ('text', 'jsonl', 'csv')
+
+
+class Options(NamedTuple):
+    # Batch mode: the file to process at once, '-' for the standard input. Interactive mode: None.
+    source: Optional[str] = None
+
+    # Batch mode: the file the answers are written to, None for the standard output
+    output: Optional[str] = None
+
+    non_interactive: bool = False
+    price_format: str = 'float'
+    decimal_places: int = 2
+    numeral_mode: str = 'standard'
+
+    # Batch mode: the text of the answers or a record per answer
+    output_format: str = 'text'
+
+
+def parse_arguments(argv: list[str]) -> Options:
+    """
+    The common invocations without options, i.e. no arguments or only a source file, are recognized without
+    argparse, which takes longer to import than the whole converter.
+    :param argv: The arguments without the name of the program.
+    :return: The Options.
+    """
+
+    if len(argv) == 0:
+        return Options()
+    if len(argv) == 1 and (argv[0] == '-' or not argv[0].startswith('-')):
+        return Options(argv[0])
+
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='galactic-converter',
+                                     description='Converts galactic numerals and answers requests for the value of '
+                                                 'materials in Credits.')
+    parser.add_argument('source', nargs='?',
+                        help='Batch mode: processes this file, or the standard input for "-", at once. Without a '
+                             'source, lines are read interactively until an empty line.')
+    parser.add_argument('-o', '--output', help='Batch mode: writes the answers to this file instead of the standard '
+                                               'output')
+    parser.add_argument('--non-interactive', action='store_true',
+                        help='Defers inputs with missing galactic digits until they are defined, instead of asking')
+    parser.add_argument('--price-format', choices=PRICE_FORMATS, default='float',
+                        help='How values that are not whole numbers are shown')
+    parser.add_argument('--decimal-places', type=int, default=2, help='Decimal places of --price-format fixed')
+    parser.add_argument('--numeral-mode', choices=NUMERAL_MODES, default='standard',
+                        help='Amounts beyond 3999 are written by repeating M or with overlined digits for thousands')
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default='text',
+                        help='Batch mode: writes a record per answer as JSON Lines or CSV instead of its text')
+    args = parser.parse_args(argv)
+
+    if args.output is not None and args.source is None:
+        parser.error('--output requires a source')
+    if args.output_format != 'text' and args.source is None:
+        parser.error('--output-format requires a source')
+
+    return Options(args.source, args.output, args.non_interactive, args.price_format, args.decimal_places,
+                   args.numeral_mode, args.output_format)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Console entry point, e.g. galactic-converter input.txt or python -m assignment input.txt.
+    Only the modules needed to answer the input are imported. Everything else, e.g. argparse for options, the JSON
+    output of the instrumentation or the table of all roman numerals, is loaded on first use.
+    :param argv: The arguments, sys.argv[1:] by default.
+    :return: The exit status.
+    """
+
+    options = parse_arguments(sys.argv[1:] if argv is None else argv)
+
+    from assignment.pricing import PriceFormat
+    from assignment.problem_3 import GalacticUnitConverter
+    from assignment.roman_numerals import NumeralMode
+
+    converter = GalacticUnitConverter(interactive=not options.non_interactive,
+                                      price_format=PriceFormat(options.price_format),
+                                      decimal_places=options.decimal_places,
+                                      numeral_mode=NumeralMode(options.numeral_mode))
+
+    if options.source is None:
+        converter.convert()
+        return 0
+
+    output_format = None
+    if options.output_format != 'text':
+        from assignment.records import OutputFormat
+        output_format = OutputFormat(options.output_format)
+
+    source = None if options.source == '-' else options.source
+    if options.output is None:
+        converter.convert_batch(source, output_format=output_format)
+    else:
+        with open(options.output, 'w') as output:
+            converter.convert_batch(source, output, output_format=output_format)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+from typing import Mapping, Optional
+
+from assignment.pricing import Price
+
+
+def exchange_rate(source_price: Price, target_price: Price) -> Optional[Price]:
+    """
+    :param source_price: The price of a single unit of the material that is exchanged.
+    :param target_price: The price of a single unit of the material it is exchanged for.
+    :return: The exact number of units of the target material worth a single unit of the source material,
+        None in case the target material is worth nothing.
+    """
+
+    if target_price.numerator == 0:
+        return None
+
+    return Price.of(source_price.numerator * target_price.denominator,
+                    source_price.denominator * target_price.numerator)
+
+
+class ExchangeRates:
+    """
+    Dense matrix of the exchange rates between all materials with a value. Each material has a slot, the rate from
+    the material of one slot to the one of another slot is stored at the row of the first and the column of the
+    second. A changed price only updates the row and the column of its material, so a new price costs time linear
+    in the number of materials and an exchange request is answered with two lookups.
+    """
+
+    def __init__(self, material_values: Optional[Mapping[str, Price]] = None):
+        """
+        :param material_values: Material -> price of a single unit, e.g. the material values of a converter.
+        """
+
+        # Material -> its slot
+        self.slots: dict[str, int] = {}
+
+        # Slot -> material and its price, None for the slot of a removed material
+        self.materials: list[Optional[str]] = []
+        self.prices: list[Optional[Price]] = []
+
+        # Row slot -> column slot -> rate, None if one of the slots is empty or the column material is worthless
+        self.rates: list[list[Optional[Price]]] = []
+
+        # Slots of removed materials, reused by the next new material
+        self._free_slots: list[int] = []
+
+        for material, price in (material_values or {}).items():
+            self.set_price(material, price)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def set_price(self, material: str, price: Optional[Price]) -> None:
+        """
+        Updates the row and the column of a material.
+        :param material: The material.
+        :param price: The price of a single unit, None removes the material.
+        :return: None
+        """
+
+        slot = self.slots.get(material)
+        if price is None:
+            if slot is not None:
+                self._clear_slot(material, slot)
+            return
+
+        if slot is None:
+            slot = self._new_slot(material)
+
+        self.prices[slot] = price
+        row = self.rates[slot]
+        rates = self.rates
+        for other_slot, other_price in enumerate(self.prices):
+            if other_price is None:
+                continue
+
+            # The reverse rate is the inverse of the reduced rate, so only one of them needs a gcd
+            rate = exchange_rate(price, other_price)
+            row[other_slot] = rate
+            if rate is None:
+                rates[other_slot][slot] = None if price.numerator == 0 else Price(0)
+            elif rate.numerator == 0:
+                rates[other_slot][slot] = None
+            elif rate.numerator > 0:
+                rates[other_slot][slot] = Price(rate.denominator, rate.numerator)
+            else:
+                rates[other_slot][slot] = Price(-rate.denominator, -rate.numerator)
+
+    def _new_slot(self, material: str) -> int:
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            # The matrix grows by one row and one column
+            slot = len(self.materials)
+            self.materials.append(None)
+            self.prices.append(None)
+            for row in self.rates:
+                row.append(None)
+            self.rates.append([None] * (slot + 1))
+
+        self.slots[material] = slot
+        self.materials[slot] = material
+        return slot
+
+    def _clear_slot(self, material: str, slot: int) -> None:
+        del self.slots[material]
+        self.materials[slot] = None
+        self.prices[slot] = None
+
+        row = self.rates[slot]
+        for other_slot, other_row in enumerate(self.rates):
+            row[other_slot] = None
+            other_row[slot] = None
+
+        self._free_slots.append(slot)
+
+    def rate(self, source: str, target: str) -> Optional[Price]:
+        """
+        :param source: The material that is exchanged.
+        :param target: The material it is exchanged for.
+        :return: The number of units of target worth a single unit of source.
+        :raises KeyError: In case one of the materials has no value.
+        """
+
+        return self.rates[self.slots[source]][self.slots[target]]
+
+    def row(self, source: str) -> dict[str, Price]:
+        """
+        :param source: A material with a value.
+        :return: Material -> number of its units worth a single unit of source, for all materials with a value
+            except worthless ones.
+        :raises KeyError: In case the material has no value.
+        """
+
+        return {material: rate for material, rate in zip(self.materials, self.rates[self.slots[source]])
+                if rate is not None}
+
+    def column(self, target: str) -> dict[str, Price]:
+        """
+        :param target: A material with a value.
+        :return: Material -> number of units of target worth a single unit of it, for all materials with a value.
+            Empty in case target is worthless.
+        :raises KeyError: In case the material has no value.
+        """
+
+        slot = self.slots[target]
+        return {material: row[slot] for material, row in zip(self.materials, self.rates) if row[slot] is not None}
@@ -0,0 +1,156 @@
+import sys
+from enum import IntEnum
+
+from assignment import roman_numerals
+
+
+class LineKind(IntEnum):
+    """
+    Integer values such that the kinds are hashed as cheaply as integers in the dispatch tables.
+    """
+
+    # e.g. pish is X
+    GALACTIC_NUMERAL_INFO = 0
+
+    # e.g. glob glob Silver is 34 Credits
+    MATERIAL_INFO = 1
+
+    # e.g. how much is pish tegj glob glob ?
+    AMOUNT_REQUEST = 2
+
+    # e.g. how many Credits is glob prok Silver ?
+    CREDITS_REQUEST = 3
+
+    # Any other input ending with a '?'
+    UNKNOWN_REQUEST = 4
+
+    # Input that can't be interpreted
+    INVALID = 5
+
+    # stats ?
+    STATS_REQUEST = 6
+
+    # e.g. what is 42 in galactic ?
+    GALACTIC_REQUEST = 7
+
+    # e.g. how many Silver is glob prok Gold ?
+    EXCHANGE_REQUEST = 8
+
+
+# Placeholder in a request prefix for any term starting with an upper case letter, i.e. a material.
+# Terms given explicitly take precedence, e.g. Credits.
+MATERIAL_TERM = '<Material>'
+
+# Terms at the start of a request -> kind of the request
+REQUEST_PREFIXES = {
+    ('how', 'much', 'is'): LineKind.AMOUNT_REQUEST,
+    ('how', 'many', 'Credits', 'is'): LineKind.CREDITS_REQUEST,
+    ('how', 'many', MATERIAL_TERM, 'is'): LineKind.EXCHANGE_REQUEST,
+    ('what', 'is'): LineKind.GALACTIC_REQUEST,
+}
+
+# Kind of a request -> terms at its end, without them the request is unknown, e.g. what is this ?
+REQUEST_SUFFIXES = {
+    LineKind.GALACTIC_REQUEST: ('in', 'galactic', '?'),
+}
+
+
+def _build_prefix_tree(prefixes: dict[tuple[str, ...], LineKind]) -> dict:
+    """
+    :param prefixes: Sequences of terms -> kind.
+    :return: Nested dictionaries, in which each term leads to the next level and the last term to the kind.
+    """
+
+    tree = {}
+    for prefix, kind in prefixes.items():
+        node = tree
+        for term in prefix[:-1]:
+            node = node.setdefault(term, {})
+        node[prefix[-1]] = kind
+
+    return tree
+
+
+_REQUEST_PREFIX_TREE = _build_prefix_tree(REQUEST_PREFIXES)
+
+# Terms of the request for the statistics of the instrumentation
+STATS_REQUEST = ['stats', '?']
+
+
+def classify_request(parts: list[str]) -> LineKind:
+    """
+    Determines the kind of a request by following its first terms through the prefix tree.
+    :param parts: A list of terms (strings) in the input line, ending with a '?'.
+    :return: The kind of the request.
+    """
+
+    node = _REQUEST_PREFIX_TREE
+    for term in parts:
+        next_node = node.get(term)
+        if next_node is None:
+            next_node = node.get(MATERIAL_TERM) if term[:1].isupper() else None
+            if next_node is None:
+                return LineKind.UNKNOWN_REQUEST
+        node = next_node
+        if node.__class__ is not dict:
+            suffix = REQUEST_SUFFIXES.get(node)
+            if suffix is not None and tuple(parts[-len(suffix):]) != suffix:
+                return LineKind.UNKNOWN_REQUEST
+            return node
+
+    return LineKind.UNKNOWN_REQUEST
+
+
+def parse_line(input_line: str) -> tuple[LineKind, list[str]]:
+    """
+    Splits an input line into its terms and classifies it in a single pass, without joining terms again.
+    :param input_line: A single line of input as a string.
+    :return: The kind of the line and the list of terms.
+    """
+
+    # Split the input line into single terms separated by a space
+    parts = input_line.strip().split(' ')
+
+    # Basic check for the number of terms such that out of range errors are avoided.
+    if len(parts) < 3:
+        if parts == STATS_REQUEST:
+            return LineKind.STATS_REQUEST, parts
+        return LineKind.INVALID, parts
+
+    last_term = parts[-1]
+    if last_term == '?':
+        return classify_request(parts), parts
+    elif last_term == 'Credits':
+        return LineKind.MATERIAL_INFO, parts
+    elif parts[1] == 'is' and (roman_numerals.is_valid_roman_numeral(last_term) or
+                               last_term in roman_numerals.ROMAN_DIGITS):
+        # Digits of the extended numeral modes, e.g. V̅, are accepted by the converter depending on its mode
+        return LineKind.GALACTIC_NUMERAL_INFO, parts
+    else:
+        return LineKind.INVALID, parts
+
+
+class TokenTable:
+    """
+    Interns galactic digits and material names, such that each one is stored once.
+    The interned strings are used as keys of the knowledge base, which makes lookups with them identity comparisons.
+    """
+
+    def __init__(self):
+        # Token -> its interned instance, in the order the tokens were added
+        self.tokens: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def intern(self, token: str) -> str:
+        """
+        :param token: A galactic digit or material name.
+        :return: The interned instance of the token.
+        """
+
+        interned = self.tokens.get(token)
+        if interned is None:
+            interned = self.tokens[token] = sys.intern(token)
+
+        return interned
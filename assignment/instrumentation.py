@@ -0,0 +1,203 @@
+import os
+import time
+from typing import Any, Callable, Union
+
+# Number of most recent durations per stage from which percentiles are calculated
+DEFAULT_WINDOW_SIZE = 4096
+
+# Every how many input lines the stages within a line are timed
+DEFAULT_SAMPLE_EVERY = 16
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """
+    :param sorted_values: Values in ascending order.
+    :param fraction: The percentile as fraction, e.g. 0.99.
+    :return: The value below which the given fraction of values lies (nearest rank), 0 for no values.
+    """
+
+    if not sorted_values:
+        return 0.0
+
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))]
+
+
+class StageStats:
+    """
+    Number of calls and durations of a single stage of the processing, e.g. the conversion of galactic amounts.
+    Durations are only appended when they are added, they are summed up once the oldest ones leave the window.
+    """
+
+    __slots__ = ('_folded_count', '_folded_seconds', '_folded_max_seconds', '_durations', '_window_size')
+
+    def __init__(self, window_size: int = DEFAULT_WINDOW_SIZE):
+        """
+        :param window_size: Number of most recent durations from which percentiles are calculated.
+        """
+
+        self._window_size = window_size
+        self.clear()
+
+    def clear(self) -> None:
+        # Number, sum and maximum of the durations that were removed from the list of durations
+        self._folded_count = 0
+        self._folded_seconds = 0.0
+        self._folded_max_seconds = 0.0
+
+        # The most recent durations, at least the window and less than twice the window
+        self._durations: list[float] = []
+
+    def add(self, seconds: float) -> None:
+        """
+        :param seconds: The duration of a single call.
+        :return: None
+        """
+
+        durations = self._durations
+        durations.append(seconds)
+        if len(durations) >= 2 * self._window_size:
+            self._fold()
+
+    def _fold(self) -> None:
+        # Durations before the window only contribute to the count, sum and maximum
+        folded = self._durations[:-self._window_size]
+        self._folded_count += len(folded)
+        self._folded_seconds += sum(folded)
+        self._folded_max_seconds = max(self._folded_max_seconds, max(folded))
+        del self._durations[:-self._window_size]
+
+    @property
+    def count(self) -> int:
+        return self._folded_count + len(self._durations)
+
+    @property
+    def total_seconds(self) -> float:
+        return self._folded_seconds + sum(self._durations)
+
+    @property
+    def max_seconds(self) -> float:
+        return max(self._folded_max_seconds, max(self._durations, default=0.0))
+
+    def summary(self) -> dict[str, Union[int, float]]:
+        """
+        :return: The number of calls, the cumulative duration in seconds and the mean, percentiles and maximum
+            of the duration in microseconds.
+        """
+
+        window = sorted(self._durations[-self._window_size:])
+        count = self.count
+        total_seconds = self.total_seconds
+        return {
+            'count': count,
+            'total_seconds': total_seconds,
+            'mean_us': total_seconds / count * 1e6 if count > 0 else 0.0,
+            'p50_us': percentile(window, 0.5) * 1e6,
+            'p90_us': percentile(window, 0.9) * 1e6,
+            'p99_us': percentile(window, 0.99) * 1e6,
+            'max_us': self.max_seconds * 1e6,
+        }
+
+
+class Instrumentation:
+    """
+    Call counts and durations per stage of the processing and counts of named events, e.g. the kinds of responses.
+    Functions are measured by replacing them with a timed wrapper, see timed(), such that nothing is measured and
+    no overhead is added as long as the original functions are used.
+    """
+
+    def __init__(self, window_size: int = DEFAULT_WINDOW_SIZE, sample_every: int = 1):
+        """
+        :param window_size: Number of most recent durations per stage from which percentiles are calculated.
+        :param sample_every: Every how many calls of the enclosing stage sampled stages are measured, reported with
+            the statistics such that their counts can be interpreted.
+        """
+
+        self.window_size = window_size
+        self.sample_every = sample_every
+        self.stages: dict[str, StageStats] = {}
+
+        # Group, e.g. 'responses' -> event -> count
+        self.counters: dict[str, dict[str, int]] = {}
+
+        self.started = time.time()
+
+    def stage(self, name: str) -> StageStats:
+        """
+        :param name: The name of the stage.
+        :return: The statistics of the stage, created on first use.
+        """
+
+        stage_stats = self.stages.get(name)
+        if stage_stats is None:
+            stage_stats = self.stages[name] = StageStats(self.window_size)
+
+        return stage_stats
+
+    def timed(self, name: str, function: Callable) -> Callable:
+        """
+        :param name: The name of the stage.
+        :param function: The function which performs the stage.
+        :return: A function with the same behaviour, which records the duration of every call.
+        """
+
+        stage_stats = self.stage(name)
+        perf_counter = time.perf_counter
+
+        def timed_function(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stage_stats.add(perf_counter() - start)
+
+        return timed_function
+
+    def counter(self, group: str) -> dict[str, int]:
+        """
+        :param group: The group of events, e.g. 'responses'.
+        :return: Event -> count of the group, created on first use, to be incremented directly.
+        """
+
+        return self.counters.setdefault(group, {})
+
+    def summary(self) -> dict[str, Any]:
+        """
+        :return: All statistics as JSON serializable dictionary.
+        """
+
+        return {
+            'uptime_seconds': time.time() - self.started,
+            'sample_every': self.sample_every,
+            'stages': {name: stage_stats.summary() for name, stage_stats in self.stages.items()},
+            **{group: dict(events) for group, events in self.counters.items()},
+        }
+
+    def to_json(self) -> str:
+        # Imported on first use, such that converters without instrumentation start faster
+        import json
+
+        return json.dumps(self.summary(), sort_keys=True)
+
+    def dump(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Writes all statistics to a JSON file.
+        :param path: The path of the file.
+        :return: None
+        """
+
+        import json
+
+        with open(path, 'w') as file:
+            json.dump(self.summary(), file, indent=2, sort_keys=True)
+            file.write('\n')
+
+    def reset(self) -> None:
+        """
+        Removes all statistics, wrappers created by timed() keep recording to the stages of this instance.
+        :return: None
+        """
+
+        for stage_stats in self.stages.values():
+            stage_stats.clear()
+        self.counters.clear()
+        self.started = time.time()
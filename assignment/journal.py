@@ -0,0 +1,253 @@
+import atexit
+import os
+import struct
+import threading
+import time
+import zlib
+from enum import Enum
+from typing import Optional, Union
+
+# Identifies journal files and the version of their format
+MAGIC = b'GUCJRNL\n'
+FORMAT_VERSION = 1
+_FILE_HEADER = struct.Struct('<8sH')
+
+# Length and checksum of the encoded fact at the start of each record
+_RECORD_HEADER = struct.Struct('<II')
+
+
+class JournalFormatError(ValueError):
+    """
+    Raised in case a file is not a journal or has an unsupported format version.
+    """
+
+
+class Durability(Enum):
+    # Records are handed to the operating system once per group, they survive a crash of the process
+    WRITE = 'write'
+
+    # Records are additionally flushed to the disk once per group, they survive a crash of the system
+    FSYNC = 'fsync'
+
+
+def galactic_digit_fact(galactic_digit: str, roman_digit: str) -> str:
+    """
+    :return: The input line which defines a galactic digit.
+    """
+
+    return f'{galactic_digit} is {roman_digit}'
+
+
+def material_fact(amount_galactic: tuple[str, ...], material: str, credits: int) -> str:
+    """
+    :return: The input line which defines the value of a material.
+    """
+
+    return ' '.join([*amount_galactic, material, 'is', str(credits), 'Credits'])
+
+
+class FactJournal:
+    """
+    Append-only file of the information accepted by a converter, stored as input lines which restore the knowledge
+    base when they are processed again in the same order.
+
+    Records are collected and written as a group, either once sync_every records were appended or sync_interval_ms
+    after the previous group was written. A flusher thread writes the group in case no further record is appended in
+    time, and the last group is written when the journal is closed or the process exits. Records which were not
+    written yet are lost in case of a crash, commit() writes them immediately. Each record carries a checksum, such
+    that a record which was only partially written before a crash is detected and removed when the journal is opened
+    again.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], durability: Durability = Durability.FSYNC,
+                 sync_every: int = 64, sync_interval_ms: float = 10.0):
+        """
+        :param path: The path of the journal, created if it doesn't exist.
+        :param durability: Whether groups of records are only written or also flushed to the disk.
+        :param sync_every: Maximum number of records in a group, 1 writes every record on its own.
+        :param sync_interval_ms: Maximum age of a group, measured from the time the previous group was written.
+        """
+
+        if sync_every < 1:
+            raise ValueError('sync_every must be at least 1')
+
+        self.path = path
+        self.durability = durability
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval_ms / 1000
+
+        # The facts of all complete records, the journal is truncated after the last one
+        self.recovered_facts = _recover(path)
+
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(_FILE_HEADER.pack(MAGIC, FORMAT_VERSION))
+            self._sync()
+
+        # Encoded records of the current group. The flusher thread is started with the first group and writes a group
+        # once it is due, all access to the group and the file is guarded by the lock.
+        self._group: list[bytes] = []
+        self._group_start = time.monotonic()
+        self._lock = threading.Lock()
+        self._group_started = threading.Condition(self._lock)
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_idle = False
+
+        self.records_written = 0
+        self.groups_written = 0
+
+    def __enter__(self) -> 'FactJournal':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def append(self, fact: str) -> None:
+        """
+        :param fact: An input line containing accepted information.
+        :return: None
+        """
+
+        encoded_fact = fact.encode('utf-8')
+        record = _RECORD_HEADER.pack(len(encoded_fact), zlib.crc32(encoded_fact)) + encoded_fact
+
+        with self._lock:
+            self._group.append(record)
+            if len(self._group) >= self.sync_every or time.monotonic() - self._group_start >= self.sync_interval:
+                self._commit()
+            elif len(self._group) == 1:
+                if self._flusher is None:
+                    self._start_flusher()
+                elif self._flusher_idle:
+                    self._group_started.notify()
+
+    def commit(self) -> None:
+        """
+        Writes the current group of records.
+        :return: None
+        """
+
+        with self._lock:
+            self._commit()
+
+    def _commit(self) -> None:
+        if self._group:
+            self._file.write(b''.join(self._group))
+            self._sync()
+            self.records_written += len(self._group)
+            self.groups_written += 1
+            self._group.clear()
+
+        self._group_start = time.monotonic()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        if self.durability == Durability.FSYNC:
+            os.fsync(self._file.fileno())
+
+    def truncate(self) -> None:
+        """
+        Removes all records, e.g. after the knowledge base was stored in a snapshot.
+        :return: None
+        """
+
+        with self._lock:
+            self._group.clear()
+            self._file.truncate(_FILE_HEADER.size)
+            self._file.seek(0, os.SEEK_END)
+            self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+
+            self._commit()
+            self._file.close()
+            self._group_started.notify()
+
+        if self._flusher is not None:
+            atexit.unregister(self.close)
+            self._flusher.join()
+
+    def _start_flusher(self) -> None:
+        """
+        Starts the thread writing groups which are due while no further record is appended.
+        :return: None
+        """
+
+        self._flusher = threading.Thread(target=self._flush_due_groups, name='journal-flusher', daemon=True)
+        self._flusher.start()
+
+        # The daemon thread is stopped at exit without writing the last group
+        atexit.register(self.close)
+
+    def _flush_due_groups(self) -> None:
+        with self._lock:
+            while not self._file.closed:
+                # The thread wakes up once per interval while records are appended, not once per group
+                remaining = self._group_start + self.sync_interval - time.monotonic()
+                if remaining > 0:
+                    self._group_started.wait(remaining)
+                elif self._group:
+                    self._commit()
+                else:
+                    # No group was started for a whole interval, the next one wakes the thread up
+                    self._flusher_idle = True
+                    self._group_started.wait()
+                    self._flusher_idle = False
+
+
+def _recover(path: Union[str, os.PathLike]) -> list[str]:
+    """
+    Reads the facts of a journal and removes an incomplete or corrupt record at its end.
+    :param path: The path of the journal.
+    :return: The facts in the order they were appended, empty in case the journal doesn't exist.
+    :raises JournalFormatError: In case the file is not a journal of the supported format version.
+    """
+
+    try:
+        with open(path, 'rb') as file:
+            data = file.read()
+    except FileNotFoundError:
+        return []
+
+    if not data:
+        return []
+
+    if len(data) < _FILE_HEADER.size or _FILE_HEADER.unpack_from(data)[0] != MAGIC:
+        raise JournalFormatError(f'{os.fspath(path)} is not a journal')
+
+    format_version = _FILE_HEADER.unpack_from(data)[1]
+    if format_version != FORMAT_VERSION:
+        raise JournalFormatError(f'Unsupported journal format version {format_version}, expected {FORMAT_VERSION}')
+
+    facts, end = _read_records(data)
+
+    # Everything after the last complete record was written partially during a crash
+    if end < len(data):
+        with open(path, 'r+b') as file:
+            file.truncate(end)
+
+    return facts
+
+
+def _read_records(data: bytes) -> tuple[list[str], int]:
+    """
+    :param data: The content of a journal.
+    :return: The facts of all complete records with a valid checksum and the position after the last one.
+    """
+
+    facts = []
+    offset = _FILE_HEADER.size
+    while offset + _RECORD_HEADER.size <= len(data):
+        length, checksum = _RECORD_HEADER.unpack_from(data, offset)
+        start = offset + _RECORD_HEADER.size
+        encoded_fact = data[start:start + length]
+        if len(encoded_fact) < length or zlib.crc32(encoded_fact) != checksum:
+            break
+
+        facts.append(encoded_fact.decode('utf-8'))
+        offset = start + length
+
+    return facts, offset
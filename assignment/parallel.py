@@ -0,0 +1,250 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from assignment import grammar
+from assignment.pricing import PriceFormat
+from assignment.problem_3 import GalacticUnitConverter, KnowledgeBase
+from assignment.responses import Response, ResponseKind
+from assignment.roman_numerals import NumeralMode
+
+# Requests answered by the worker processes, as (line number, input line)
+_Queries = list[tuple[int, str]]
+
+# Chunk of requests sent to a worker process at once, as consecutive runs of requests referring to the same version
+# of the knowledge base: (number of facts accepted before the requests, requests)
+_Chunk = list[tuple[int, _Queries]]
+
+# Placeholder for the responses to a request in the ordered output of the first phase
+_REQUEST = object()
+
+
+class _ConverterOptions(NamedTuple):
+    """
+    The options of the converter holding the knowledge base, such that the workers answer requests alike.
+    """
+
+    numeral_mode: NumeralMode = NumeralMode.STANDARD
+    price_format: PriceFormat = PriceFormat.FLOAT
+    decimal_places: int = 2
+    detailed_responses: bool = False
+
+    @classmethod
+    def of(cls, converter: GalacticUnitConverter) -> '_ConverterOptions':
+        return cls(converter.numeral_mode, converter.price_format, converter.decimal_places,
+                   converter.detailed_responses)
+
+
+# Knowledge base at the first request and the facts accepted after it in the order of input, held by each worker
+# process. Every later version of the knowledge base is the base with a number of these facts replayed.
+_worker_base: Optional[KnowledgeBase] = None
+_worker_facts: list[str] = []
+_worker_options = _ConverterOptions()
+
+# Converter of the worker process and the number of facts it replayed on top of the base
+_worker_converter: Optional[GalacticUnitConverter] = None
+_worker_replayed_facts = 0
+
+
+def _init_worker(base: Optional[KnowledgeBase], facts: list[str],
+                 options: _ConverterOptions = _ConverterOptions()) -> None:
+    """
+    Receives the knowledge base and the facts once per worker process.
+    :param base: The knowledge base at the first request.
+    :param facts: The facts accepted after the first request, as input lines.
+    :param options: The options of the converter holding the knowledge base.
+    :return: None
+    """
+
+    global _worker_base, _worker_facts, _worker_options, _worker_converter
+    _worker_base = base
+    _worker_facts = facts
+    _worker_options = options
+    _worker_converter = None
+
+
+def _answer_requests(fact_count: int, requests: _Queries) -> list[list[Response]]:
+    """
+    Answers a chunk of requests that refer to the same version of the knowledge base.
+    :param fact_count: The number of facts accepted between the first request and the requests of the chunk.
+    :param requests: The requests as (line number, input line).
+    :return: The responses to each request.
+    """
+
+    global _worker_converter, _worker_replayed_facts
+    if _worker_converter is None or _worker_replayed_facts > fact_count:
+        # Chunks mostly arrive in the order of input, only a chunk of an older version starts over from the base
+        if _worker_converter is None:
+            _worker_converter = GalacticUnitConverter(interactive=False, price_format=_worker_options.price_format,
+                                                      decimal_places=_worker_options.decimal_places,
+                                                      numeral_mode=_worker_options.numeral_mode)
+            _worker_converter.detailed_responses = _worker_options.detailed_responses
+        _worker_converter.load_knowledge_base(_worker_base)
+        _worker_replayed_facts = 0
+
+    # The knowledge base moves forward to the version of the chunk
+    converter = _worker_converter
+    for fact in _worker_facts[_worker_replayed_facts:fact_count]:
+        converter.process_line(fact)
+    _worker_replayed_facts = fact_count
+
+    # The converter numbers the lines of the chunk after the ones it processed before, which is mapped back to the
+    # original numbers. Line numbers are never reset, since replayed facts must not be older than previous ones.
+    first_line_number = converter.line_number + 1
+    answers = [[] for _ in requests]
+    for response in converter.process_lines(input_line for _, input_line in requests):
+        index = response.line_number - first_line_number
+        answers[index].append(response._replace(line_number=requests[index][0]))
+
+    return answers
+
+
+def _answer_chunk(chunk: _Chunk) -> list[list[Response]]:
+    """
+    :param chunk: Runs of requests in the order of input.
+    :return: The responses to each request of the chunk.
+    """
+
+    return [answer for fact_count, requests in chunk for answer in _answer_requests(fact_count, requests)]
+
+
+def is_read_only_request(converter: GalacticUnitConverter, input_line: str) -> bool:
+    """
+    Checks whether an input line is a request that can be answered with the current knowledge base alone,
+    i.e. without asking for or waiting for a missing galactic digit.
+    :param converter: The converter holding the knowledge base.
+    :param input_line: A single line of input as a string.
+    :return: True if the line is a request that does not change the converter, False otherwise.
+    """
+
+    line_kind, parts = grammar.parse_line(input_line)
+    if line_kind == grammar.LineKind.AMOUNT_REQUEST:
+        amount_galactic = parts[3:-1]
+    elif line_kind == grammar.LineKind.CREDITS_REQUEST or line_kind == grammar.LineKind.EXCHANGE_REQUEST:
+        amount_galactic = parts[4:-2]
+    else:
+        # Numbers are written with the galactic digits known so far, such requests are never deferred
+        return line_kind == grammar.LineKind.UNKNOWN_REQUEST or line_kind == grammar.LineKind.GALACTIC_REQUEST
+
+    return all(map(converter.galactic_digit_to_roman.__contains__, amount_galactic))
+
+
+def process_lines_parallel(input_lines: Iterable[str], converter: Optional[GalacticUnitConverter] = None,
+                           max_workers: Optional[int] = None, chunk_size: int = 2000,
+                           stop_on_empty_line: bool = False) -> Iterator[Response]:
+    """
+    Two-phase variant of GalacticUnitConverter.process_lines for large inputs consisting mostly of requests.
+    First, all information is processed sequentially in the order of input, while requests are only assigned to the
+    version of the knowledge base at their position. Afterwards, the requests are answered in chunks by a pool of
+    processes. Each of them receives a snapshot of the knowledge base at the first request and the facts accepted
+    afterwards, which it replays up to the version of each chunk. The responses are returned in the order of input
+    and match the ones of the sequential processing.
+    Requests with missing galactic digits are processed sequentially, since they may read or wait for information.
+    The first phase parses every line once more, which takes about as long as answering a request with a short amount,
+    so the pool can only pay off for requests with long amounts, e.g. hundreds of galactic digits in
+    NumeralMode.REPEATED_M, on several processors. With a single processor, the lines are processed sequentially by
+    default. `python -m benchmarks.parallel` measures the overhead of the two phases.
+    :param input_lines: Any iterable of input lines.
+    :param converter: The converter holding the knowledge base, which is extended by the information in the input.
+    :param max_workers: Number of worker processes, by default the number of processors. With 1 no pool is used,
+        but the requests are still answered in two phases.
+    :param chunk_size: Maximum number of requests sent to a worker at once.
+    :param stop_on_empty_line: Whether an empty line ends the input, like in convert().
+    :return: An iterator over the responses.
+    """
+
+    if converter is None:
+        converter = GalacticUnitConverter()
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+        if max_workers == 1:
+            # Without further processors the two phases only add to the time of the sequential processing
+            yield from converter.process_lines(input_lines, stop_on_empty_line)
+            return
+
+    # Responses of the first phase in the order of input, with placeholders for the responses to requests
+    ordered_responses: list = []
+
+    # Knowledge base at the first request, the facts accepted afterwards and the chunks of requests. A chunk spans
+    # several versions, such that requests interleaved with many facts still form chunks of chunk_size requests.
+    base: Optional[KnowledgeBase] = None
+    facts: list[str] = []
+    chunks: list[_Chunk] = []
+    requests_in_last_chunk = 0
+
+    previous_fact_listener = converter.fact_listener
+
+    def record_fact(fact: str) -> None:
+        facts.append(fact)
+        if previous_fact_listener is not None:
+            previous_fact_listener(fact)
+
+    def awaits_answer() -> bool:
+        # The converter asked for a missing galactic digit, so the next line is the answer
+        return bool(ordered_responses) and ordered_responses[-1] is not _REQUEST and \
+               ordered_responses[-1].kind == ResponseKind.MISSING_INFORMATION
+
+    def collect_information(lines: Iterable[str]) -> Iterator[str]:
+        # Intercepts requests that can be answered later on, everything else is processed by the converter
+        nonlocal base, requests_in_last_chunk
+        for input_line in lines:
+            if awaits_answer() or not is_read_only_request(converter, input_line):
+                yield input_line
+                continue
+
+            converter.line_number += 1
+
+            # The only full copy of the knowledge base, later versions are described by the facts
+            if base is None:
+                base = converter.snapshot()
+                facts.clear()
+
+            if not chunks or requests_in_last_chunk >= chunk_size:
+                chunks.append([])
+                requests_in_last_chunk = 0
+
+            fact_count = len(facts)
+            chunk = chunks[-1]
+            if not chunk or chunk[-1][0] != fact_count:
+                chunk.append((fact_count, []))
+
+            chunk[-1][1].append((converter.line_number, input_line))
+            requests_in_last_chunk += 1
+            ordered_responses.append(_REQUEST)
+
+    # Phase 1: The converter reads the next line only after the responses to the previous one were consumed,
+    # such that responses and placeholders are collected in the order of input
+    converter.fact_listener = record_fact
+    try:
+        for response in converter.process_lines(collect_information(input_lines), stop_on_empty_line):
+            ordered_responses.append(response)
+    finally:
+        converter.fact_listener = previous_fact_listener
+
+    # Phase 2
+    options = _ConverterOptions.of(converter)
+    if max_workers == 1 or len(chunks) <= 1:
+        _init_worker(base, facts, options)
+        answered_chunks = map(_answer_chunk, chunks)
+        yield from _merge(ordered_responses, chain.from_iterable(answered_chunks))
+    else:
+        with ProcessPoolExecutor(max_workers, initializer=_init_worker,
+                                 initargs=(base, facts, options)) as executor:
+            answered_chunks = executor.map(_answer_chunk, chunks)
+            yield from _merge(ordered_responses, chain.from_iterable(answered_chunks))
+
+
+def _merge(ordered_responses: list, answered_requests: Iterator[list[Response]]) -> Iterator[Response]:
+    """
+    :param ordered_responses: Responses of the first phase with placeholders for the responses to requests.
+    :param answered_requests: The responses to each request in the order of input.
+    :return: An iterator over all responses in the order of input.
+    """
+
+    for response in ordered_responses:
+        if response is _REQUEST:
+            yield from next(answered_requests)
+        else:
+            yield response
@@ -0,0 +1,104 @@
+from enum import Enum
+from math import gcd
+from typing import NamedTuple, Optional, Union
+
+
+class Price(NamedTuple):
+    """
+    Exact value of a single unit of a material in Credits as reduced fraction, e.g. 34 Credits for 20 units are 17/10.
+    Only integer arithmetic is needed to calculate the value of an amount, which avoids the rounding errors of floats
+    and the overhead of fractions.Fraction.
+    """
+
+    numerator: int
+
+    # Always positive
+    denominator: int = 1
+
+    @classmethod
+    def of(cls, credits: int, amount: int) -> 'Price':
+        """
+        :param credits: The value of the amount in Credits.
+        :param amount: The amount of units, not 0.
+        :return: The price of a single unit.
+        """
+
+        if amount < 0:
+            credits, amount = -credits, -amount
+
+        divisor = gcd(credits, amount)
+        return cls(credits // divisor, amount // divisor)
+
+    def __float__(self) -> float:
+        return self.numerator / self.denominator
+
+
+class PriceFormat(Enum):
+    # Like floats, e.g. 8.5 or 0.3333333333333333
+    FLOAT = 'float'
+
+    # Reduced fractions, e.g. 17/2 or 1/3
+    FRACTION = 'fraction'
+
+    # Rounded to a fixed number of decimal places, half away from zero, e.g. 8.50 or 0.33
+    FIXED = 'fixed'
+
+
+def _scientific_text(numerator: int, denominator: int) -> str:
+    """
+    :param numerator: The numerator of a value beyond the range of floats.
+    :param denominator: The positive denominator of the value.
+    :return: The value with the 17 significant digits of a float, in the notation of floats, e.g. 1.5e+400.
+    """
+
+    # Imported here since only values beyond the range of floats need it
+    from decimal import Context, Decimal
+
+    context = Context(prec=17)
+    return str(context.divide(Decimal(numerator), Decimal(denominator)).normalize(context)).lower()
+
+
+def format_credits(price: Price, amount: int, price_format: PriceFormat = PriceFormat.FLOAT,
+                   decimal_places: int = 2) -> tuple[Optional[Union[int, float]], str]:
+    """
+    Calculates the value of an amount of a material and formats it. Whole numbers are always shown without decimal
+    places, independent of the format. The text of the FRACTION and FIXED formats is calculated with integer
+    arithmetic only, the FLOAT format shows values beyond the range of floats in the notation of floats.
+    :param price: The price of a single unit.
+    :param amount: The amount of units.
+    :param price_format: How values that are not whole numbers are shown.
+    :param decimal_places: The number of decimal places of the FIXED format.
+    :return: The value in Credits, as integer in case it is a whole number, otherwise as float or None in case it is
+        beyond the range of floats, and its text.
+    """
+
+    numerator = amount * price.numerator
+    denominator = price.denominator
+
+    whole, remainder = divmod(numerator, denominator)
+    if remainder == 0:
+        return whole, str(whole)
+
+    try:
+        value = numerator / denominator
+    except OverflowError:
+        value = None
+
+    if price_format == PriceFormat.FLOAT:
+        return value, str(value) if value is not None else _scientific_text(numerator, denominator)
+    elif price_format == PriceFormat.FRACTION:
+        divisor = gcd(numerator, denominator)
+        return value, f'{numerator // divisor}/{denominator // divisor}'
+    else:
+        # Round the absolute value with integer arithmetic, such that no float rounding error is introduced
+        scale = 10 ** decimal_places
+        scaled, remainder = divmod(abs(numerator) * scale, denominator)
+        if 2 * remainder >= denominator:
+            scaled += 1
+
+        sign = '-' if numerator < 0 else ''
+        if decimal_places == 0:
+            return value, f'{sign}{scaled}'
+
+        integer_part, fraction_part = divmod(scaled, scale)
+        return value, f'{sign}{integer_part}.{fraction_part:0{decimal_places}d}'
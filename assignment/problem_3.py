@@ -1,25 +1,376 @@
-import re
-from collections import Counter
-from typing import Optional
+import atexit
+import os
+import sys
+from contextlib import closing
+from typing import (TYPE_CHECKING, BinaryIO, Callable, Collection, Iterable, Iterator, MutableMapping, NamedTuple,
+                    Optional, Sequence, TextIO, Union)
 
-import roman
+from assignment import grammar, pricing, roman_numerals, stream_io
+from assignment.caching import DependencyLRUCache
+from assignment.instrumentation import DEFAULT_SAMPLE_EVERY, DEFAULT_WINDOW_SIZE, Instrumentation
+from assignment.pricing import Price, PriceFormat
+from assignment.responses import Response, ResponseDetails, ResponseKind
+from assignment.roman_numerals import NumeralMode
+
+# Only imported once they are used, such that a converter started for a few lines starts faster
+if TYPE_CHECKING:
+    from assignment import exchange, journal, records, spill
+
+# Marks a cache miss, since None is a valid cached result of a conversion
+_NOT_CACHED = object()
+
+# Tag of the dependencies of cached answers on material values, which distinguishes them from galactic digits
+MATERIAL_DEPENDENCY = 'material'
+
+# Kind of an input line -> its name in ResponseDetails, e.g. 'credits_request'
+_REQUEST_NAMES = {line_kind: line_kind.name.lower() for line_kind in grammar.LineKind}
+
+
+def _parse_int(term: str) -> Optional[int]:
+    """
+    :param term: A term of an input line, e.g. an amount of Credits.
+    :return: The integer, None in case the term is no integer or has more digits than Python converts to one.
+    """
+
+    try:
+        return int(term)
+    except ValueError:
+        return None
+
+
+class MissingGalacticDigitError(Exception):
+    """
+    Raised in case an input can't be processed because a galactic digit is unknown.
+    """
+
+    def __init__(self, galactic_digit: str):
+        super().__init__(f'How much is {galactic_digit} ?')
+        self.galactic_digit = galactic_digit
+
+
+class MaterialFact(NamedTuple):
+    """
+    An information about the value of a material, kept such that the value can be recalculated.
+    """
+
+    # The galactic digits of the amount, e.g. ('glob', 'glob') for "glob glob Silver is 34 Credits"
+    amount_galactic: tuple[str, ...]
+    credits: int
+
+    # The number of the input line which gave the information
+    line_number: int
+
+
+class KnowledgeBase(NamedTuple):
+    """
+    Copy of the information given to a converter, e.g. to answer requests in another process.
+    """
+
+    galactic_digit_to_roman: dict[str, str]
+    material_values: dict[str, Price]
+
+    # Version of the knowledge base of the converter at the time of the copy
+    version: int = 0
+
+    # Material -> information its value was calculated from, None if unknown
+    material_facts: Optional[dict[str, MaterialFact]] = None
+
+
+class DependencyIndex(dict):
+    """
+    Galactic digit -> materials whose value was calculated from an amount containing the digit.
+    spill.SpillIndex keeps the same index in a spill file.
+    """
+
+    def add(self, galactic_digit: str, material: str) -> None:
+        materials = self.get(galactic_digit)
+        if materials is None:
+            self[galactic_digit] = {material}
+        else:
+            materials.add(material)
+
+    def discard(self, galactic_digit: str, material: str) -> None:
+        materials = self[galactic_digit]
+        materials.discard(material)
+        if not materials:
+            del self[galactic_digit]
 
 
 class GalacticUnitConverter:
 
-    def __init__(self):
-        self.roman_digit_to_dec_value = {
-            'I': 1,
-            'V': 5,
-            'X': 10,
-            'L': 50,
-            'C': 100,
-            'D': 500,
-            'M': 1000
+    def __init__(self, conversion_cache_size: int = 4096, interactive: bool = True,
+                 price_format: PriceFormat = PriceFormat.FLOAT, decimal_places: int = 2,
+                 credits_cache_size: int = 4096, tokens: Optional[grammar.TokenTable] = None,
+                 numeral_mode: NumeralMode = NumeralMode.STANDARD):
+        """
+        :param conversion_cache_size: Maximum number of galactic amounts for which the decimal value is cached.
+        :param interactive: If True, the user is asked for missing galactic digits. Otherwise, inputs with missing
+            digits are deferred until the digit is defined by a later input.
+        :param price_format: How values in Credits that are not whole numbers are shown.
+        :param decimal_places: The number of decimal places of the PriceFormat.FIXED format.
+        :param credits_cache_size: Maximum number of answers to "how many Credits is ... ?" requests that are cached.
+        :param tokens: A token table shared with other converters, e.g. by the sessions of a SessionManager.
+        :param numeral_mode: The roman digits galactic digits can be mapped to and how large amounts are written.
+        """
+
+        self.interactive = interactive
+        self._price_format = price_format
+        self._decimal_places = decimal_places
+
+        # Accepted information is appended to the journal, see attach_journal, and passed to the fact listener, e.g.
+        # of a SharedConverter publishing it to other converters. Both receive the information as input lines.
+        self.journal: Optional[journal.FactJournal] = None
+        self.fact_listener: Optional[Callable[[str], None]] = None
+
+        # Read-only and shared by all instances with the same numeral mode
+        self.numeral_mode = numeral_mode
+        self.numeral_system = roman_numerals.NUMERAL_SYSTEMS[numeral_mode]
+        self.roman_digit_to_dec_value = roman_numerals.ROMAN_DIGIT_TO_DEC_VALUE \
+            if numeral_mode is NumeralMode.STANDARD else self.numeral_system.digit_values
+
+        # Validation of roman numerals in the numeral mode, selected once such that the standard mode calls the
+        # shared transition table without any further dispatch. The instrumentation wraps is_valid_roman_numeral,
+        # which calls this, so both modes are timed alike.
+        self._validate_roman_numeral: Callable[[str], bool] = roman_numerals.is_valid_roman_numeral \
+            if numeral_mode is NumeralMode.STANDARD else self._is_canonical_roman_numeral
+
+        self.galactic_digit_to_roman: MutableMapping[str, str] = {}
+
+        # Roman digit -> shortest galactic digit mapped to it, None once the mapping changed,
+        # see _galactic_digit_index
+        self._roman_to_galactic: Optional[dict[str, str]] = None
+
+        # Material -> exact value of a single unit in Credits
+        self.material_values: MutableMapping[str, Price] = {}
+
+        # Exchange rates between all materials, built on the first exchange request and then updated with every
+        # changed material value, see exchange_rates
+        self._exchange_rates: Optional[exchange.ExchangeRates] = None
+        self._exchange_rates_enabled = True
+
+        # Galactic digits and materials are interned, the keys of the dictionaries above are the interned strings
+        self.tokens = tokens if tokens is not None else grammar.TokenTable()
+
+        # Materials, and galactic digits in case their number is limited, are not interned in the token table once
+        # their memory is limited, see limit_material_memory
+        self._intern_material: Callable[[str], str] = self.tokens.intern
+        self._intern_galactic_digit: Callable[[str], str] = self.tokens.intern
+
+        # Kind of an input line -> method processing it
+        self._line_handlers = self._default_line_handlers()
+
+        # Stage of the processing, replaced by a timed wrapper on lines sampled by the instrumentation
+        self._format_credits = pricing.format_credits
+
+        # Call counts and durations per stage, None while disabled, see enable_instrumentation
+        self.instrumentation: Optional[Instrumentation] = None
+        self._instrumentation_dump: Optional[Callable[[], None]] = None
+
+        # Incremented on every change of the galactic digits or material values
+        self.knowledge_base_version = 0
+
+        # Tuple of galactic digits -> decimal value, entries depend on the mapping of the digits they contain
+        self.conversion_cache = DependencyLRUCache(conversion_cache_size)
+
+        # (Tuple of galactic digits, material) -> answer to a "how many Credits is ... ?" request as
+        # (kind, text, value), entries depend on the digits they contain and on the value of the material
+        self.credits_cache = DependencyLRUCache(credits_cache_size)
+
+        # Non-interactive mode: missing galactic digit -> deferred input lines as (line number, input line)
+        self.pending_lines: dict[str, list[tuple[int, str]]] = {}
+
+        # Number of input lines processed so far and the line currently processed
+        self.line_number = 0
+        self._current_line_number = 0
+
+        # Material -> information which defined its current value
+        self.material_facts: MutableMapping[str, MaterialFact] = {}
+
+        # Galactic digit -> materials whose value was calculated from an amount containing the digit. Kept in the
+        # spill file while the memory of the materials is limited, so redefining a digit never reads all spilled
+        # materials.
+        self.material_dependencies: Union[DependencyIndex, 'spill.SpillIndex'] = DependencyIndex()
+
+        # Stores holding the material values, information, dependencies and galactic digits and the path of their
+        # spill file, see limit_material_memory
+        self._spill_stores: list[Union['spill.SpillStore', 'spill.SpillIndex']] = []
+        self._spill_path: Optional[str] = None
+
+        # Snapshot file whose material information is only read once it is needed, see load_snapshot
+        self._unloaded_material_facts = None
+
+        # Responses to the input line currently processed
+        self._responses: list[Response] = []
+
+        # Whether responses carry the terms and values of their input line, e.g. for the record output formats.
+        # While enabled, the kind and the terms of the line currently processed are kept.
+        self.detailed_responses = False
+        self._current_request: Optional[tuple[grammar.LineKind, list[str]]] = None
+
+        # Lines deferred while processing the current input line as (line number, input line, missing galactic digit)
+        self._deferred_lines: list[tuple[int, str, str]] = []
+
+    def _default_line_handlers(self) -> dict[grammar.LineKind, Callable[[list[str]], None]]:
+        return {
+            grammar.LineKind.GALACTIC_NUMERAL_INFO: self.handle_galactic_numeral_info,
+            grammar.LineKind.MATERIAL_INFO: self.handle_material_info,
+            grammar.LineKind.AMOUNT_REQUEST: self.handle_amount_request,
+            grammar.LineKind.CREDITS_REQUEST: self.handle_credits_request,
+            grammar.LineKind.UNKNOWN_REQUEST: self.handle_unknown_request,
+            grammar.LineKind.STATS_REQUEST: self.handle_stats_request,
+            grammar.LineKind.GALACTIC_REQUEST: self.handle_galactic_request,
+            grammar.LineKind.EXCHANGE_REQUEST: self.handle_exchange_request,
+            grammar.LineKind.INVALID: self.handle_invalid_input,
         }
 
-        self.galactic_digit_to_roman = {}
-        self.material_values = {}
+    def enable_instrumentation(self, dump_path: Union[str, os.PathLike, None] = None,
+                               window_size: int = DEFAULT_WINDOW_SIZE,
+                               sample_every: int = DEFAULT_SAMPLE_EVERY) -> Instrumentation:
+        """
+        Starts to record call counts and durations of the stages of the processing. Every sample_every-th input line
+        is timed as a whole ('line') and split into 'parse' (splitting and classification) and 'handle_<line kind>'
+        (the handler of its kind). The inner stages 'validate' (roman numerals of galactic digit definitions),
+        'convert' (galactic amounts to decimals) and 'format' (values in Credits) are timed on the same lines, by
+        replacing them with timed wrappers on this instance for the duration of that line, so the counts of all
+        stages are the ones of the sampled lines. The kinds of lines, responses and invalid inputs are counted on
+        every line. Lines that are not sampled take no timestamps, but counting them still adds to the processing,
+        `python -m benchmarks.instrumentation` measures the overhead per sampling.
+        The converter runs without any overhead while the instrumentation is disabled.
+        :param dump_path: If given, the statistics are written to this JSON file when the process exits.
+        :param window_size: Number of most recent durations per stage from which percentiles are calculated.
+        :param sample_every: Every how many lines the inner stages are timed, 1 times them on every line.
+        :return: The instrumentation, its statistics are also answered to "stats ?".
+        :raises ValueError: In case sample_every is less than 1.
+        """
+
+        import time
+
+        if sample_every < 1:
+            raise ValueError('sample_every must be at least 1')
+
+        self.disable_instrumentation()
+        instrumentation = self.instrumentation = Instrumentation(window_size, sample_every)
+        perf_counter = time.perf_counter
+
+        add_line = instrumentation.stage('line').add
+        add_parse = instrumentation.stage('parse').add
+        add_handler = {line_kind: instrumentation.stage(f'handle_{name}').add
+                       for line_kind, name in _REQUEST_NAMES.items()}
+        line_counts = instrumentation.counter('lines')
+        response_counts = instrumentation.counter('responses')
+        invalid_input_counts = instrumentation.counter('invalid_inputs')
+
+        # Timed wrappers of the inner stages, which are attributes of this instance during sampled lines only
+        sampled_stages = {
+            'is_valid_roman_numeral': instrumentation.timed('validate', self.is_valid_roman_numeral),
+            'convert_galactic_to_decimal': instrumentation.timed('convert', self.convert_galactic_to_decimal),
+            '_format_credits': instrumentation.timed('format', pricing.format_credits),
+        }
+
+        # The kind of the line currently processed, to count the kinds of invalid inputs, the number of lines so far
+        # and whether the inner stages are timed, also while deferred lines are processed within a sampled line
+        current_line_kind = [grammar.LineKind.INVALID]
+        line_count = [0]
+        sampling = [False]
+
+        def dispatch_input_line(input_line: str) -> None:
+            sample = not sampling[0] and line_count[0] % sample_every == 0
+            line_count[0] += 1
+
+            # Like _dispatch_input_line, lines that are not sampled are only counted and never timed
+            if not sample:
+                line_kind, parts = grammar.parse_line(input_line)
+                current_line_kind[0] = line_kind
+                line_name = _REQUEST_NAMES[line_kind]
+                line_counts[line_name] = line_counts.get(line_name, 0) + 1
+                if self.detailed_responses:
+                    self._current_request = line_kind, parts
+
+                self._line_handlers[line_kind](parts)
+                return
+
+            sampling[0] = True
+            vars(self).update(sampled_stages)
+
+            # A single timer for all stages of the line
+            start = perf_counter()
+            line_kind, parts = grammar.parse_line(input_line)
+            parsed = perf_counter()
+
+            current_line_kind[0] = line_kind
+            line_name = _REQUEST_NAMES[line_kind]
+            line_counts[line_name] = line_counts.get(line_name, 0) + 1
+            if self.detailed_responses:
+                self._current_request = line_kind, parts
+
+            try:
+                self._line_handlers[line_kind](parts)
+            finally:
+                end = perf_counter()
+                add_parse(parsed - start)
+                add_handler[line_kind](end - parsed)
+                add_line(end - start)
+
+                del self.is_valid_roman_numeral, self.convert_galactic_to_decimal
+                self._format_credits = pricing.format_credits
+                sampling[0] = False
+
+        respond = self._respond
+
+        def counting_respond(kind: ResponseKind, text: str, value: Optional[Union[int, float]] = None) -> None:
+            response_counts[kind.value] = response_counts.get(kind.value, 0) + 1
+            if kind is ResponseKind.INVALID_INPUT:
+                line_name = _REQUEST_NAMES[current_line_kind[0]]
+                invalid_input_counts[line_name] = invalid_input_counts.get(line_name, 0) + 1
+            respond(kind, text, value)
+
+        self._respond = counting_respond
+        self._dispatch_input_line = dispatch_input_line
+
+        if dump_path is not None:
+            self._instrumentation_dump = lambda: instrumentation.dump(dump_path)
+            atexit.register(self._instrumentation_dump)
+
+        return instrumentation
+
+    def disable_instrumentation(self) -> None:
+        """
+        Stops recording and restores the original stages of the processing.
+        :return: None
+        """
+
+        if self.instrumentation is None:
+            return
+
+        # Remove the wrappers, such that the methods of the class are used again
+        for name in ('_respond', '_dispatch_input_line', 'is_valid_roman_numeral', 'convert_galactic_to_decimal'):
+            self.__dict__.pop(name, None)
+        self._format_credits = pricing.format_credits
+
+        if self._instrumentation_dump is not None:
+            atexit.unregister(self._instrumentation_dump)
+            self._instrumentation_dump = None
+
+        self.instrumentation = None
+
+    @property
+    def price_format(self) -> PriceFormat:
+        return self._price_format
+
+    @price_format.setter
+    def price_format(self, price_format: PriceFormat) -> None:
+        # Cached answers are formatted already
+        self._price_format = price_format
+        self.credits_cache.clear()
+
+    @property
+    def decimal_places(self) -> int:
+        return self._decimal_places
+
+    @decimal_places.setter
+    def decimal_places(self, decimal_places: int) -> None:
+        self._decimal_places = decimal_places
+        self.credits_cache.clear()
 
     def convert(self) -> None:
         """
@@ -27,43 +378,323 @@ class GalacticUnitConverter:
         :return: None
         """
 
+        for response in self.process_lines(self._read_user_input_lines(), stop_on_empty_line=True):
+            print(response.text)
+
+    @staticmethod
+    def _read_user_input_lines() -> Iterator[str]:
+        """
+        :return: An iterator over the lines of user input, which ends on termination.
+        """
+
         while True:
             try:
-                input_line = input()
+                yield input()
             except (KeyboardInterrupt, EOFError):
                 # Clean exit on termination
-                break
+                return
 
-            # Besides ctrl + c, an empty input also terminates the program
-            if input_line == '':
-                break
-            else:
-                self.process_input_line(input_line)
+    def convert_batch(self, source: Union[str, os.PathLike, BinaryIO, None] = None, output: Optional[TextIO] = None,
+                      chunk_size: int = stream_io.DEFAULT_CHUNK_SIZE, use_mmap: bool = True,
+                      buffer_size: int = stream_io.DEFAULT_BUFFER_SIZE,
+                      output_format: Optional['records.OutputFormat'] = None) -> None:
+        """
+        Processes a whole file or stream at once, e.g. to replay large logs of information and requests.
+        The input is read in large chunks and the answers are written in large blocks. Apart from that, the input is
+        processed exactly like in convert(), i.e. also missing information is read from the input.
+        :param source: The path of a file, a binary stream or None to read from the standard input.
+        :param output: A text stream the answers are written to, the standard output by default.
+        :param chunk_size: The number of bytes read from the input at once.
+        :param use_mmap: Whether a file given as path should be memory mapped instead of read.
+        :param buffer_size: The number of characters collected before the text output is written.
+        :param output_format: The text of the responses by default, otherwise a record per response as JSON Lines
+            or CSV, see records.OutputRecord.
+        :return: None
+        """
+
+        if source is None:
+            source = sys.stdin.buffer
+        if output is None:
+            output = sys.stdout
+
+        if isinstance(source, (str, os.PathLike)):
+            lines = stream_io.iter_file_lines(source, chunk_size, use_mmap)
+        else:
+            lines = stream_io.iter_lines(source, chunk_size)
+
+        if output_format is not None:
+            from assignment import records
+            if output_format != records.OutputFormat.TEXT:
+                with closing(lines), records.RecordWriter(output, output_format) as record_writer:
+                    for record in records.iter_records(self, lines, stop_on_empty_line=True):
+                        record_writer.write_record(record)
+                return
+
+        with closing(lines), stream_io.BufferedLineWriter(output, buffer_size) as writer:
+            for response in self.process_lines(lines, stop_on_empty_line=True):
+                writer.write_line(response.text)
+
+    def process_lines(self, input_lines: Iterable[str], stop_on_empty_line: bool = False) -> Iterator[Response]:
+        """
+        Lazily processes lines of input and yields the responses to them, without any other input or output.
+        The next line is only read once all responses to the previous one have been consumed.
+        In the interactive mode, missing galactic digits are read from the following lines of input, like in convert().
+        Deferred inputs that can't be resolved are reported at the end of the input.
+        :param input_lines: Any iterable of input lines.
+        :param stop_on_empty_line: Whether an empty line ends the input, like in convert().
+        :return: An iterator over the responses.
+        """
+
+        input_lines = iter(input_lines)
+
+        def read_answer() -> str:
+            # Behave like input() at the end of the input
+            try:
+                answer = next(input_lines)
+            except StopIteration:
+                raise EOFError from None
+
+            self.line_number += 1
+            return answer
+
+        try:
+            for input_line in input_lines:
+                if stop_on_empty_line and input_line == '':
+                    break
+
+                self.line_number += 1
+                yield from self._process_line(self.line_number, input_line, read_answer)
+        except EOFError:
+            # Input ended while asking for missing information
+            pass
+
+        for line_number, input_line, galactic_digit in self.unresolved_lines():
+            yield Response(ResponseKind.UNRESOLVED,
+                           f'missing information / invalid input: How much is {galactic_digit} ? '
+                           f'Input ignored: {input_line}', None, line_number,
+                           self._missing_digit_details(input_line, galactic_digit))
 
     def process_input_line(self, input_line: str) -> None:
         """
         Receives a single line of user input, executes basic checks and forwards the input based on its type.
+        The responses are printed, missing galactic digits are requested from the user.
         :param input_line: A single line of input as a string.
         :return: None
         """
 
-        # Split the input line into single terms separated by a space
-        parts = input_line.strip().split(' ')
+        self.line_number += 1
+        for response in self._process_line(self.line_number, input_line, input):
+            print(response.text)
 
-        # Basic check for the number of terms such that out of range errors are avoided.
-        if len(parts) < 3:
-            print('invalid input. Input ignored.')
-            return
+    def process_line(self, input_line: str) -> list[Response]:
+        """
+        Processes a single line of input without any other input or output, e.g. for a service.
+        Since missing galactic digits can't be asked for, lines containing them are always deferred. This is reported
+        with a MISSING_INFORMATION response, such that the caller can request the digit from its user.
+        :param input_line: A single line of input as a string.
+        :return: The responses to the line, including the ones to deferred lines that could be resolved now.
+        """
 
-        # Pass the list of terms in the input line to a specific sub method based on the input type.
-        if parts[-1] == '?':
-            self.handle_request(parts)
-        elif parts[-1] == 'Credits':
-            self.handle_material_info(parts)
-        elif parts[1] == 'is' and self.is_valid_roman_numeral(parts[-1]):
-            self.handle_galactic_numeral_info(parts)
+        self.line_number += 1
+        try:
+            self._process_deferrable_line(self.line_number, input_line)
+
+            responses = self._responses
+            for line_number, deferred_line, galactic_digit in self._deferred_lines:
+                details = self._missing_digit_details(deferred_line, galactic_digit)
+                responses.append(Response(ResponseKind.MISSING_INFORMATION,
+                                          f'missing information / invalid input: How much is {galactic_digit} ?',
+                                          None, line_number, details))
+        finally:
+            # Also in case of an error, such that the responses of this line are not returned for the next one
+            self._responses = []
+            self._deferred_lines.clear()
+
+        return responses
+
+    def _process_line(self, line_number: int, input_line: str, read_answer: Callable[[], str]) -> Iterator[Response]:
+        """
+        Processes a single line of input and yields the responses to it.
+        In case a galactic digit is missing, it is requested and read with read_answer in the interactive mode.
+        Otherwise, the line is deferred.
+        :param line_number: The number of the input line.
+        :param input_line: A single line of input as a string.
+        :param read_answer: Used to read the answer in case a galactic digit is requested.
+        :return: An iterator over the responses.
+        """
+
+        if not self.interactive:
+            self._process_deferrable_line(line_number, input_line)
         else:
-            print('invalid input. Input ignored.')
+            while True:
+                try:
+                    self._process_numbered_line(line_number, input_line)
+                    break
+                except MissingGalacticDigitError as missing:
+                    # The line is processed again once the digit is known
+                    yield from self._request_galactic_digit(missing.galactic_digit, line_number, input_line,
+                                                            read_answer)
+
+        responses, self._responses = self._responses, []
+        self._deferred_lines.clear()
+        yield from responses
+
+    def _request_galactic_digit(self, galactic_digit: str, line_number: int, input_line: str,
+                                read_answer: Callable[[], str]) -> Iterator[Response]:
+        """
+        Asks the user for the roman digit of a galactic digit until a valid answer is given.
+        :param galactic_digit: The missing galactic digit.
+        :param line_number: The number of the input line which contains the missing digit.
+        :param input_line: The input line which contains the missing digit.
+        :param read_answer: Used to read the answer of the user.
+        :return: An iterator over the requests to the user.
+        """
+
+        while galactic_digit not in self.galactic_digit_to_roman.keys():
+            yield Response(ResponseKind.MISSING_INFORMATION,
+                           f'missing information / invalid input: How much is {galactic_digit} ?', None, line_number,
+                           self._missing_digit_details(input_line, galactic_digit))
+
+            # Expected input format is equal to the standard input, e.g.: glob is X
+            user_in = read_answer().strip().split(' ')
+
+            # Ask again if the input does not match the expected format
+            if len(user_in) != 3: continue
+
+            # Check if the galactic digit in the input matches the one requested and whether
+            # a valid roman digit was provided
+            # In case the correct format was provided, store the information like in the non-missing case
+            galactic_digit_new, _, roman_digit_new = user_in
+            if galactic_digit == galactic_digit_new and roman_digit_new in self.roman_digit_to_dec_value.keys():
+                self.store_galactic_digit(galactic_digit, roman_digit_new)
+
+    def _process_deferrable_line(self, line_number: int, input_line: str) -> None:
+        """
+        Processes a single line of input. The line is deferred in case a galactic digit is missing.
+        :param line_number: The number of the input line, used to preserve the order of information.
+        :param input_line: A single line of input as a string.
+        :return: None
+        """
+
+        try:
+            self._process_numbered_line(line_number, input_line)
+        except MissingGalacticDigitError as missing:
+            self.pending_lines.setdefault(missing.galactic_digit, []).append((line_number, input_line))
+            self._deferred_lines.append((line_number, input_line, missing.galactic_digit))
+
+    def _process_numbered_line(self, line_number: int, input_line: str) -> None:
+        """
+        Processes a single line of input with the number of the line as context.
+        :param line_number: The number of the input line, used to preserve the order of information.
+        :param input_line: A single line of input as a string.
+        :return: None
+        """
+
+        previous_line_number, self._current_line_number = self._current_line_number, line_number
+        previous_request = self._current_request
+
+        try:
+            self._dispatch_input_line(input_line)
+        finally:
+            self._current_line_number = previous_line_number
+            self._current_request = previous_request
+
+    def _respond(self, kind: ResponseKind, text: str, value: Optional[Union[int, float]] = None) -> None:
+        """
+        Adds a response to the input line currently processed.
+        :param kind: The kind of the response.
+        :param text: The text as shown to the user.
+        :param value: A numeric value contained in the response.
+        :return: None
+        """
+
+        details = self._response_details(kind, value, *self._current_request) if self.detailed_responses else None
+        self._responses.append(Response(kind, text, value, self._current_line_number, details))
+
+    def _response_details(self, kind: ResponseKind, value: Optional[Union[int, float]], line_kind: grammar.LineKind,
+                          parts: list[str]) -> ResponseDetails:
+        """
+        Takes the terms of an input line from the same positions as its handler.
+        :param kind: The kind of the response.
+        :param value: The numeric value contained in the response.
+        :param line_kind: The kind of the input line the response refers to.
+        :param parts: A list of terms (strings) in the input line.
+        :return: The ResponseDetails.
+        """
+
+        galactic_amount = decimal_amount = material = credits = target_material = target_amount = None
+
+        if line_kind is grammar.LineKind.CREDITS_REQUEST or line_kind is grammar.LineKind.EXCHANGE_REQUEST:
+            galactic_amount, material = parts[4:-2], parts[-2]
+            if kind is ResponseKind.CREDITS or kind is ResponseKind.EXCHANGE:
+                # Answers to credits requests are cached without their amount. Its conversion is usually still cached,
+                # which is read without affecting the statistics or the order of eviction of the cache.
+                decimal_amount = self.conversion_cache.peek(tuple(galactic_amount), _NOT_CACHED) \
+                    if galactic_amount else 1
+                if decimal_amount is _NOT_CACHED:
+                    decimal_amount = self._galactic_to_decimal(galactic_amount)
+            if line_kind is grammar.LineKind.EXCHANGE_REQUEST:
+                target_material = parts[2]
+                target_amount = value
+            else:
+                credits = value
+        elif line_kind is grammar.LineKind.AMOUNT_REQUEST:
+            galactic_amount = parts[3:-1]
+            if kind is ResponseKind.AMOUNT:
+                decimal_amount = value
+        elif line_kind is grammar.LineKind.MATERIAL_INFO:
+            galactic_amount, material = parts[:-4], parts[-4]
+            credits = _parse_int(parts[-2])
+        elif line_kind is grammar.LineKind.GALACTIC_REQUEST:
+            if kind is ResponseKind.GALACTIC:
+                galactic_amount = self.convert_decimal_to_galactic(value)
+                decimal_amount = value
+                if len(parts) == 7:
+                    # what is 68 Credits in galactic ?
+                    credits = value
+        elif line_kind is grammar.LineKind.GALACTIC_NUMERAL_INFO:
+            galactic_amount = parts[:1]
+
+        return ResponseDetails(_REQUEST_NAMES[line_kind], ' '.join(galactic_amount) if galactic_amount else None,
+                               decimal_amount, material, credits, target_material, target_amount)
+
+    def _missing_digit_details(self, input_line: str, galactic_digit: str) -> Optional[ResponseDetails]:
+        """
+        :param input_line: An input line that can't be processed without a galactic digit.
+        :param galactic_digit: The missing galactic digit.
+        :return: The ResponseDetails of the request for the digit, None unless detailed_responses is enabled.
+        """
+
+        if not self.detailed_responses:
+            return None
+
+        line_kind, parts = grammar.parse_line(input_line)
+        return self._response_details(ResponseKind.MISSING_INFORMATION, None, line_kind, parts)._replace(
+            missing_digit=galactic_digit)
+
+    def _dispatch_input_line(self, input_line: str) -> None:
+        """
+        Executes basic checks and forwards the input based on its type.
+        :param input_line: A single line of input as a string.
+        :return: None
+        """
+
+        # The line is split into terms and classified in a single pass
+        line_kind, parts = grammar.parse_line(input_line)
+        if self.detailed_responses:
+            self._current_request = line_kind, parts
+
+        # Pass the list of terms in the input line to a specific sub method based on the input type.
+        self._line_handlers[line_kind](parts)
+
+    def handle_invalid_input(self, parts: list[str]) -> None:
+        """
+        Used to answer inputs that can't be interpreted.
+        :param parts: A list of terms (strings) in the input line.
+        :return: None
+        """
+
+        self._respond(ResponseKind.INVALID_INPUT, 'invalid input. Input ignored.')
 
     def handle_galactic_numeral_info(self, parts: list[str]) -> None:
         """
@@ -74,16 +705,314 @@ class GalacticUnitConverter:
         """
 
         if not (len(parts) == 3 and parts[1] == 'is' and self.is_valid_roman_numeral(parts[-1])):
-            print('invalid input. Input ignored.')
+            self._respond(ResponseKind.INVALID_INPUT, 'invalid input. Input ignored.')
         else:
             galactic_digit, roman_digit = parts[0], parts[-1]
 
             # Ensure the last part of the input really is a roman digit
             if roman_digit in self.roman_digit_to_dec_value.keys():
                 # Store the mapping of galactic to the roman numeral
-                self.galactic_digit_to_roman[galactic_digit] = roman_digit
+                self.store_galactic_digit(galactic_digit, roman_digit)
             else:
-                print('invalid input. Input ignored.')
+                self._respond(ResponseKind.INVALID_INPUT, 'invalid input. Input ignored.')
+
+    def store_galactic_digit(self, galactic_digit: str, roman_digit: str) -> None:
+        """
+        Stores the mapping of a galactic to a roman digit, overwriting a previous one.
+        Cached conversions that contain the galactic digit are invalidated in case the mapping changed.
+        :param galactic_digit: The galactic digit.
+        :param roman_digit: The roman digit it represents.
+        :return: None
+        """
+
+        galactic_digit = self._intern_galactic_digit(galactic_digit)
+        previous_roman_digit = self.galactic_digit_to_roman.get(galactic_digit)
+        self.galactic_digit_to_roman[galactic_digit] = roman_digit
+
+        if previous_roman_digit != roman_digit:
+            self.knowledge_base_version += 1
+            self._roman_to_galactic = None
+
+            if self.journal is not None or self.fact_listener is not None:
+                from assignment import journal
+                self._record_fact(journal.galactic_digit_fact(galactic_digit, roman_digit))
+
+            if previous_roman_digit is not None:
+                self.conversion_cache.invalidate(galactic_digit)
+                self.credits_cache.invalidate(galactic_digit)
+                self._reprice_materials(galactic_digit)
+
+        # Inputs which were deferred because of this digit can now be processed (again) in their original order
+        for line_number, input_line in self.pending_lines.pop(galactic_digit, []):
+            self._process_deferrable_line(line_number, input_line)
+
+    def snapshot(self) -> KnowledgeBase:
+        """
+        :return: A copy of the current galactic digits and material values.
+        """
+
+        self._load_material_facts()
+        return KnowledgeBase(self.galactic_digit_to_roman.copy(), self.material_values.copy(),
+                             self.knowledge_base_version, self.material_facts.copy())
+
+    def load_knowledge_base(self, knowledge_base: KnowledgeBase) -> None:
+        """
+        Replaces the galactic digits and material values with the ones of a snapshot.
+        :param knowledge_base: A snapshot, e.g. of another converter.
+        :return: None
+        """
+
+        # The mappings are updated in place, since they might be stores with limited memory
+        self.galactic_digit_to_roman.clear()
+        self.galactic_digit_to_roman.update({
+            self._intern_galactic_digit(galactic_digit): roman_digit
+            for galactic_digit, roman_digit in knowledge_base.galactic_digit_to_roman.items()})
+        self.material_values.clear()
+        self.material_values.update({self._intern_material(material): material_value
+                                     for material, material_value in knowledge_base.material_values.items()})
+        self.knowledge_base_version = knowledge_base.version
+        self._roman_to_galactic = None
+        self._exchange_rates = None
+        self.conversion_cache.clear()
+        self.credits_cache.clear()
+
+        self.material_facts.clear()
+        self.material_dependencies.clear()
+        self._discard_unloaded_material_facts()
+        self._store_loaded_material_facts(knowledge_base.material_facts or {})
+
+    def _store_loaded_material_facts(self, material_facts: dict[str, MaterialFact]) -> None:
+        """
+        Stores the material information of a snapshot while the converter has no material information yet.
+        :param material_facts: Material information of a snapshot.
+        :return: None
+        """
+
+        # Many materials share the same amount, which is only interned once
+        interned_amounts: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+        for material, material_fact in material_facts.items():
+            amount_galactic = interned_amounts.get(material_fact.amount_galactic)
+            if amount_galactic is None:
+                amount_galactic = tuple(map(self._intern_galactic_digit, material_fact.amount_galactic))
+                interned_amounts[amount_galactic] = amount_galactic
+
+            # The information precedes all inputs of this converter, regardless of its line number in the snapshot
+            material = self._intern_material(material)
+            self.material_facts[material] = MaterialFact(amount_galactic, material_fact.credits, 0)
+            for galactic_digit in amount_galactic:
+                self.material_dependencies.add(galactic_digit, material)
+
+    def limit_material_memory(self, spill_path: Union[str, os.PathLike, None] = None,
+                              max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                              max_galactic_digits: Optional[int] = None) -> None:
+        """
+        Keeps the material values and information in stores which hold at most max_entries or max_bytes of entries
+        in memory each and move the least recently used ones to a spill file. Spilled materials are reloaded when a
+        request refers to them. The galactic digits are limited to max_galactic_digits in the same way, if given.
+        The index of the materials depending on a galactic digit is kept in the spill file, so redefining a digit
+        only reloads the materials whose amount contains it. Materials, and galactic digits in case they are limited,
+        are no longer interned in the token table.
+        Exchange requests are answered from the two material values instead of the matrix of all exchange rates.
+        Calling this again with the spill file of the converter only changes the limits, with another spill file the
+        entries are moved to new stores and the previous ones are closed.
+        :param spill_path: The path of the spill file, which must not exist yet unless it is the spill file of this
+            converter. None for a temporary file, which is removed once the stores are closed.
+        :param max_entries: Maximum number of materials in memory, None for no limit.
+        :param max_bytes: Maximum estimated memory of the material values and of the information, None for no limit.
+        :param max_galactic_digits: Maximum number of galactic digits in memory, None for no limit.
+        :return: None
+        :raises FileExistsError: In case the spill file already exists and is not the one of this converter.
+        """
+
+        from assignment import spill
+
+        # The spill file is a cache of this converter, the files of others are never overwritten
+        own_spill_path = os.path.realpath(spill_path) if spill_path is not None else None
+        if own_spill_path is not None and own_spill_path == self._spill_path:
+            self._change_material_memory_limits(max_entries, max_bytes, max_galactic_digits)
+            return
+        if spill_path is not None and os.path.exists(spill_path):
+            raise FileExistsError(f'The spill file {os.fspath(spill_path)} already exists')
+
+        self._load_material_facts()
+        previous_stores = self._spill_stores
+
+        material_values = spill.SpillStore(spill_path, 'material_values', max_entries, max_bytes)
+        material_values.update(self.material_values)
+        material_facts = spill.SpillStore(spill_path, 'material_facts', max_entries, max_bytes)
+        material_facts.update(self.material_facts)
+        material_dependencies = spill.SpillIndex(spill_path, 'material_dependencies')
+        material_dependencies.add_all((galactic_digit, material) for galactic_digit, materials
+                                      in self.material_dependencies.items() for material in materials)
+        self.material_values, self.material_facts = material_values, material_facts
+        self.material_dependencies = material_dependencies
+        self._spill_stores = [material_values, material_facts, material_dependencies]
+        self._spill_path = own_spill_path
+
+        if isinstance(self.galactic_digit_to_roman, spill.SpillStore):
+            # The galactic digits of a previous limit are moved to a new store or no longer limited
+            self.galactic_digit_to_roman = dict(self.galactic_digit_to_roman.items())
+            self._intern_galactic_digit = self.tokens.intern
+        if max_galactic_digits is not None:
+            self._limit_galactic_digits(max_galactic_digits)
+
+        # All entries were copied from the previous stores
+        for store in previous_stores:
+            store.close()
+
+        self._intern_material = sys.intern
+        self._exchange_rates = None
+        self._exchange_rates_enabled = False
+
+    def _change_material_memory_limits(self, max_entries: Optional[int], max_bytes: Optional[int],
+                                       max_galactic_digits: Optional[int]) -> None:
+        """
+        Changes the limits of the stores in the spill file of the converter, see limit_material_memory.
+        :param max_entries: Maximum number of materials in memory, None for no limit.
+        :param max_bytes: Maximum estimated memory of the material values and of the information, None for no limit.
+        :param max_galactic_digits: Maximum number of galactic digits in memory, None for no limit.
+        :return: None
+        """
+
+        from assignment import spill
+
+        self.material_values.set_limits(max_entries, max_bytes)
+        self.material_facts.set_limits(max_entries, max_bytes)
+
+        galactic_digit_to_roman = self.galactic_digit_to_roman
+        limited = isinstance(galactic_digit_to_roman, spill.SpillStore)
+        if max_galactic_digits is not None and limited:
+            galactic_digit_to_roman.set_limits(max_galactic_digits)
+        elif max_galactic_digits is not None:
+            self._limit_galactic_digits(max_galactic_digits)
+        elif limited:
+            # The galactic digits are no longer limited, their table is removed such that they can be limited again
+            self.galactic_digit_to_roman = dict(galactic_digit_to_roman.items())
+            self._intern_galactic_digit = self.tokens.intern
+            self._spill_stores = [store for store in self._spill_stores if store is not galactic_digit_to_roman]
+            galactic_digit_to_roman.drop()
+
+    def _limit_galactic_digits(self, max_galactic_digits: int) -> None:
+        """
+        Moves the galactic digits to a store in the spill file of the material stores.
+        :param max_galactic_digits: Maximum number of galactic digits in memory.
+        :return: None
+        """
+
+        from assignment import spill
+
+        galactic_digit_to_roman = spill.SpillStore(self._spill_path, 'galactic_digits', max_galactic_digits)
+        galactic_digit_to_roman.update(self.galactic_digit_to_roman)
+        self.galactic_digit_to_roman = galactic_digit_to_roman
+        self._spill_stores.append(galactic_digit_to_roman)
+        self._intern_galactic_digit = sys.intern
+
+    def save_snapshot(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Stores the knowledge base in a versioned binary file, see snapshot_file.
+        :param path: The path of the file.
+        :return: None
+        """
+
+        # Imported here since the snapshot file format depends on the classes of this module
+        from assignment import snapshot_file
+
+        snapshot_file.save_snapshot(self.snapshot(), path)
+
+    def load_snapshot(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Replaces the knowledge base with the one stored in a snapshot file.
+        The galactic digits and material values are read right away, the information the material values were
+        calculated from is only read once a galactic digit is redefined or a material is given a new value.
+        :param path: The path of the file.
+        :return: None
+        :raises SnapshotFormatError: In case the file is not a valid snapshot.
+        """
+
+        from assignment import snapshot_file
+
+        loaded_file = snapshot_file.SnapshotFile(path)
+        try:
+            self.load_knowledge_base(KnowledgeBase(loaded_file.galactic_digit_to_roman(),
+                                                   loaded_file.material_values(), loaded_file.version))
+        except BaseException:
+            loaded_file.close()
+            raise
+
+        self._unloaded_material_facts = loaded_file
+
+    def _load_material_facts(self) -> None:
+        """
+        Reads the material information of a snapshot file in case it wasn't needed so far.
+        :return: None
+        """
+
+        loaded_file = self._unloaded_material_facts
+        if loaded_file is not None:
+            self._unloaded_material_facts = None
+            with loaded_file:
+                self._store_loaded_material_facts(loaded_file.material_facts())
+
+    def _discard_unloaded_material_facts(self) -> None:
+        if self._unloaded_material_facts is not None:
+            self._unloaded_material_facts.close()
+            self._unloaded_material_facts = None
+
+    def attach_journal(self, fact_journal: 'journal.FactJournal') -> None:
+        """
+        Restores the information recovered from a journal and appends all information accepted from now on to it.
+        The journal continues the knowledge base loaded before, e.g. with load_snapshot.
+        :param fact_journal: The opened journal.
+        :return: None
+        """
+
+        self.journal = None
+        for fact in fact_journal.recovered_facts:
+            self.process_line(fact)
+
+        self.journal = fact_journal
+
+    def compact_journal(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Stores the knowledge base in a snapshot file and removes all records from the attached journal.
+        After a crash in between, the journal is processed again on top of the snapshot, which leads to the same
+        knowledge base, since it already contains the information of the journal.
+        :param path: The path of the snapshot file.
+        :return: None
+        """
+
+        self.journal.commit()
+        self.save_snapshot(path)
+        self.journal.truncate()
+
+    def discard_pending_lines(self, line_numbers: Collection[int]) -> int:
+        """
+        Removes deferred inputs, e.g. of a client that disconnected, such that they are never processed.
+        :param line_numbers: The line numbers of the deferred inputs.
+        :return: The number of removed inputs.
+        """
+
+        removed = 0
+        for galactic_digit in list(self.pending_lines):
+            lines = self.pending_lines[galactic_digit]
+            remaining = [line for line in lines if line[0] not in line_numbers]
+            removed += len(lines) - len(remaining)
+            if remaining:
+                self.pending_lines[galactic_digit] = remaining
+            else:
+                del self.pending_lines[galactic_digit]
+
+        return removed
+
+    def unresolved_lines(self) -> list[tuple[int, str, str]]:
+        """
+        :return: The deferred inputs as (line number, input line, missing galactic digit) in the order of input.
+        """
+
+        return sorted((line_number, input_line, galactic_digit)
+                      for galactic_digit, lines in self.pending_lines.items()
+                      for line_number, input_line in lines)
 
     def handle_material_info(self, parts: list[str]) -> None:
         """
@@ -94,14 +1023,11 @@ class GalacticUnitConverter:
         """
 
         # The total number of credits should be an integer at the second to last position.
-        try:
-            credits = int(parts[-2])
-        except ValueError:
-            credits = None
+        credits = _parse_int(parts[-2])
 
         # Abort in case no valid credit amount is given or the input ends with an unexpected term
         if parts[-1] != 'Credits' or credits is None:
-            print('invalid input. Input ignored.')
+            self._respond(ResponseKind.INVALID_INPUT, 'invalid input. Input ignored.')
             return
 
         # The material should be the fourth to last term
@@ -110,7 +1036,7 @@ class GalacticUnitConverter:
         # Basic check if the extracted term really is a material
         # Should be start with an upper case letter and not be in the dictionary of known galactic digits
         if material[0].islower() or material in self.galactic_digit_to_roman.keys():
-            print(f'{material} does not seem to be a material. Input ignored.')
+            self._respond(ResponseKind.NOT_A_MATERIAL, f'{material} does not seem to be a material. Input ignored.')
             return
 
         # Everything before the material describes the amount as a galactic number.´
@@ -120,53 +1046,250 @@ class GalacticUnitConverter:
         # amount_roman is None in case amount_galactic can not be converted to
         # a valid roman numeral and thus not to a decimal number
         if amount_decimal is None:
-            print('invalid input. Input ignored.')
-        else:
+            self._respond(ResponseKind.INVALID_INPUT, 'invalid input. Input ignored.')
+        elif material not in self.material_facts or \
+                self.material_facts[material].line_number <= self._current_line_number:
+            # A deferred input must not overwrite the value given by a later input
+
             # Calculate and store the value of a single unit of the material
-            material_value = credits / amount_decimal
+            material = self._intern_material(material)
+            self._set_material_value(material, Price.of(credits, amount_decimal))
+            amount_galactic = tuple(map(self._intern_galactic_digit, amount_galactic))
+            self._store_material_fact(material, MaterialFact(amount_galactic, credits, self._current_line_number))
+            self.knowledge_base_version += 1
+
+            if self.journal is not None or self.fact_listener is not None:
+                from assignment import journal
+                self._record_fact(journal.material_fact(amount_galactic, material, credits))
+
+    def _record_fact(self, fact: str) -> None:
+        """
+        :param fact: The input line of accepted information.
+        :return: None
+        """
+
+        if self.journal is not None:
+            self.journal.append(fact)
+        if self.fact_listener is not None:
+            self.fact_listener(fact)
+
+    def _store_material_fact(self, material: str, material_fact: MaterialFact) -> None:
+        """
+        Replaces the information a material value is calculated from and updates the dependencies on galactic digits.
+        :param material: The material.
+        :param material_fact: The information about its value.
+        :return: None
+        """
+
+        self._load_material_facts()
+
+        previous_fact = self.material_facts.get(material)
+        if previous_fact is not None:
+            for galactic_digit in set(previous_fact.amount_galactic):
+                self.material_dependencies.discard(galactic_digit, material)
+
+        self.material_facts[material] = material_fact
+        for galactic_digit in material_fact.amount_galactic:
+            self.material_dependencies.add(galactic_digit, material)
+
+    def _reprice_materials(self, galactic_digit: str) -> None:
+        """
+        Recalculates the values of the materials whose amount contains a redefined galactic digit.
+        Only these materials are touched, all other values stay as they are.
+        :param galactic_digit: The redefined galactic digit.
+        :return: None
+        """
+
+        self._load_material_facts()
+
+        # Spilled information is only reloaded for the materials that depend on the digit
+        dependent_facts = [(material, self.material_facts[material])
+                           for material in self.material_dependencies.get(galactic_digit, ())]
+
+        for material, material_fact in dependent_facts:
+            amount_decimal = self.convert_galactic_to_decimal(material_fact.amount_galactic)
+
+            # The amount might no longer be a valid numeral, so the information doesn't define a value anymore.
+            # The information is kept nonetheless, since another redefinition could make it valid again.
+            self._set_material_value(material, None if amount_decimal is None
+                                     else Price.of(material_fact.credits, amount_decimal))
+
+    def _set_material_value(self, material: str, material_value: Optional[Price]) -> None:
+        """
+        Stores the value of a material and invalidates the cached answers that contain it.
+        :param material: The material.
+        :param material_value: The value of a single unit, None removes the value.
+        :return: None
+        """
+
+        if material_value is None:
+            self.material_values.pop(material, None)
+        else:
             self.material_values[material] = material_value
 
+        self.credits_cache.invalidate((MATERIAL_DEPENDENCY, material))
+        if self._exchange_rates is not None:
+            self._exchange_rates.set_price(material, material_value)
+
     def convert_galactic_to_decimal(self, galactic_digits: list[str]) -> Optional[int]:
         """
         Converts a list of galactic digits into the decimal numeral if the corresponding roman numeral is valid.
         :param galactic_digits: A list of galactic digits.
         :return: The corresponding decimal number. In case no valid roman numeral exists None is returned.
+        :raises MissingGalacticDigitError: In case the roman digit of a galactic digit is unknown.
         """
 
-        roman_numeral = []
-        for galactic_digit in galactic_digits:
+        cache_key = tuple(galactic_digits)
+        decimal_number = self.conversion_cache.get(cache_key, _NOT_CACHED)
+        if decimal_number is not _NOT_CACHED:
+            return decimal_number
 
-            # Information missing: If there is no known mapping from the galactic to a roman digit
-            # ask the user to provide one.
-            while galactic_digit not in self.galactic_digit_to_roman.keys():
-                print(f'missing information / invalid input: How much is {galactic_digit} ?')
+        decimal_number = self._galactic_to_decimal(galactic_digits)
 
-                # Expected input format is equal to the standard input, e.g.: glob is X
-                user_in = input().strip().split(' ')
+        # The result only stays valid as long as none of the contained galactic digits is redefined
+        self.conversion_cache.put(cache_key, decimal_number, dependencies=cache_key)
+        return decimal_number
 
-                # Ask again if the input does not match the expected format
-                if len(user_in) != 3: continue
+    def _galactic_to_decimal(self, galactic_digits: Sequence[str]) -> Optional[int]:
+        """
+        Variant of convert_galactic_to_decimal without the conversion cache.
+        :param galactic_digits: A list of galactic digits.
+        :return: The corresponding decimal number. In case no valid roman numeral exists None is returned.
+        :raises MissingGalacticDigitError: In case the roman digit of a galactic digit is unknown.
+        """
 
-                # Check if the galactic digit in the input matches the one requested and whether
-                # a valid roman digit was provided
-                # In case the correct format was provided, store the information like in the non-missing case
-                galactic_digit_new, _, roman_digit_new = user_in
-                if galactic_digit == galactic_digit_new and roman_digit_new in self.roman_digit_to_dec_value.keys():
-                    self.galactic_digit_to_roman[galactic_digit] = roman_digit_new
+        roman_numeral = []
+        for galactic_digit in galactic_digits:
 
             roman_digit = self.galactic_digit_to_roman.get(galactic_digit)
-            roman_numeral.append(roman_digit)
 
-        roman_numeral = "".join(roman_numeral)
+            # Information missing: The input line is either deferred or the user is asked for the digit
+            if roman_digit is None:
+                raise MissingGalacticDigitError(galactic_digit)
 
-        if self.is_valid_roman_numeral(roman_numeral):
+            roman_numeral.append(roman_digit)
 
-            # A library function is used to convert the roman numeral into a decimal representation
-            decimal_number = roman.fromRoman(roman_numeral)
-            return decimal_number
+        if self.numeral_mode is NumeralMode.STANDARD:
+            # Validation and conversion are done with a single lookup in the table of all valid roman numerals
+            decimal_number = roman_numerals.roman_to_decimal("".join(roman_numeral))
         else:
+            # Amounts of any length are validated and converted in time linear in their number of digits
+            decimal_number = roman_numerals.decode_digits(roman_numeral, self.numeral_system)
+
+        return decimal_number
+
+    def _galactic_digit_index(self) -> dict[str, str]:
+        """
+        :return: Roman digit -> the galactic digit used to write it, the shortest one (the first in alphabetical
+            order among equally long ones) in case several galactic digits are mapped to the same roman digit.
+            Built once per version of the mapping.
+        """
+
+        if self._roman_to_galactic is None:
+            roman_to_galactic: dict[str, str] = {}
+            for galactic_digit, roman_digit in self.galactic_digit_to_roman.items():
+                chosen = roman_to_galactic.get(roman_digit)
+                if chosen is None or (len(galactic_digit), galactic_digit) < (len(chosen), chosen):
+                    roman_to_galactic[roman_digit] = galactic_digit
+            self._roman_to_galactic = roman_to_galactic
+
+        return self._roman_to_galactic
+
+    def _roman_digits_of(self, number: int) -> Optional[Sequence[str]]:
+        """
+        :param number: A decimal number.
+        :return: The roman digits of the single valid numeral of the number in the numeral mode, None in case the
+            number can't be written, e.g. in the standard mode it is not between 1 and 3999.
+        """
+
+        if self.numeral_mode is NumeralMode.STANDARD:
+            if not 1 <= number <= roman_numerals.MAX_ROMAN_NUMERAL:
+                return None
+            return roman_numerals.roman_numeral_table().to_roman[number]
+
+        return roman_numerals.encode_digits(number, self.numeral_system, roman_numerals.MAX_ENCODED_DIGITS)
+
+    def convert_decimal_to_galactic(self, number: int) -> Optional[tuple[str, ...]]:
+        """
+        Converts a decimal number into the shortest galactic numeral with the current galactic digits.
+        Each number has a single valid roman numeral, which is taken from the precomputed table in the standard mode,
+        and each of its roman digits is replaced by a galactic digit. The result is converted back to the number by
+        convert_galactic_to_decimal.
+        :param number: A decimal number.
+        :return: The galactic digits or None in case the number can't be written in the numeral mode or a roman digit
+            of its roman numeral has no galactic digit.
+        """
+
+        roman_digits = self._roman_digits_of(number)
+        if roman_digits is None:
+            return None
+
+        roman_to_galactic = self._galactic_digit_index()
+        try:
+            return tuple([roman_to_galactic[roman_digit] for roman_digit in roman_digits])
+        except KeyError:
             return None
 
+    def convert_decimals_to_galactic(self, numbers: Iterable[int]) -> list[Optional[tuple[str, ...]]]:
+        """
+        Bulk variant of convert_decimal_to_galactic, e.g. for billing many amounts at once.
+        :param numbers: Decimal numbers.
+        :return: The galactic digits of each number, None for numbers that can't be written.
+        """
+
+        roman_to_galactic = self._galactic_digit_index()
+        roman_digits_of = self._roman_digits_of
+
+        # Each number is converted once, repeated numbers share the same galactic digits
+        converted: dict[int, Optional[tuple[str, ...]]] = {}
+        galactic_numerals = []
+        for number in numbers:
+            galactic_numeral = converted.get(number, _NOT_CACHED)
+            if galactic_numeral is _NOT_CACHED:
+                galactic_numeral = None
+                roman_digits = roman_digits_of(number)
+                if roman_digits is not None:
+                    try:
+                        galactic_numeral = tuple([roman_to_galactic[roman_digit] for roman_digit in roman_digits])
+                    except KeyError:
+                        pass
+                converted[number] = galactic_numeral
+
+            galactic_numerals.append(galactic_numeral)
+
+        return galactic_numerals
+
+    def handle_galactic_request(self, parts: list[str]) -> None:
+        """
+        Answers a request for the galactic numeral of a decimal number, optionally an amount of Credits.
+        Input line examples: what is 42 in galactic ?, what is 68 Credits in galactic ?
+        :param parts: A list of terms (strings) in the input line.
+        :return: None
+        """
+
+        # The number is assumed to be everything between 'is' and 'in'
+        number_terms = parts[2:-3]
+        if not (len(number_terms) == 1 or len(number_terms) == 2 and number_terms[1] == 'Credits') or \
+                not number_terms[0].isdecimal():
+            self._respond(ResponseKind.INVALID_INPUT, 'invalid input. Input ignored.')
+            return
+
+        try:
+            number = int(number_terms[0])
+        except ValueError:
+            # More digits than Python converts to an integer (sys.get_int_max_str_digits), which is far beyond any
+            # number that can be written in galactic
+            self._respond(ResponseKind.INVALID_INPUT, 'invalid input. Input ignored.')
+            return
+
+        unit = ' Credits' if len(number_terms) == 2 else ''
+        galactic_numeral = self.convert_decimal_to_galactic(number)
+
+        if galactic_numeral is None:
+            self._respond(ResponseKind.NOT_REPRESENTABLE, f'{number} can\'t be written with the known galactic digits')
+        else:
+            self._respond(ResponseKind.GALACTIC, f'{number}{unit} is {" ".join(galactic_numeral)}{unit}', number)
+
     def handle_request(self, parts: list[str]) -> None:
         """
         Method the handle inputs containing requests, i.e. ending with a '?'.
@@ -174,66 +1297,181 @@ class GalacticUnitConverter:
         :return: None
         """
 
-        if " ".join(parts[0:3]) == 'how much is':
+        self._line_handlers[grammar.classify_request(parts)](parts)
 
-            # The amount is assumed to be everything between 'is' and '?'
-            amount_galactic = parts[3:-1]
-            amount_decimal = self.convert_galactic_to_decimal(amount_galactic)
+    def handle_amount_request(self, parts: list[str]) -> None:
+        """
+        Answers a request for the decimal value of a galactic amount.
+        Input line example: how much is pish tegj glob glob ?
+        :param parts:  A list of terms (strings) in the input line.
+        :return: None
+        """
 
-            # None is returned in case amount_galactic can't be converted to a valid roman numeral
-            # (and thus not into a decimal)
-            if amount_decimal is None:
-                print('invalid input. Input ignored.')
-            else:
-                print(f'{" ".join(amount_galactic)} is {amount_decimal}')
-            return
+        # The amount is assumed to be everything between 'is' and '?'
+        amount_galactic = parts[3:-1]
+        amount_decimal = self.convert_galactic_to_decimal(amount_galactic)
 
-        elif " ".join(parts[0:4]) == 'how many Credits is':
+        # None is returned in case amount_galactic can't be converted to a valid roman numeral
+        # (and thus not into a decimal)
+        if amount_decimal is None:
+            self._respond(ResponseKind.INVALID_INPUT, 'invalid input. Input ignored.')
+        else:
+            self._respond(ResponseKind.AMOUNT, f'{" ".join(amount_galactic)} is {amount_decimal}', amount_decimal)
 
-            # Extract the elements that describe the requested amount
-            amount_galactic = parts[4:-2]
+    def handle_credits_request(self, parts: list[str]) -> None:
+        """
+        Answers a request for the value of an amount of a material in Credits.
+        Input line example: how many Credits is glob prok Silver ?
+        :param parts:  A list of terms (strings) in the input line.
+        :return: None
+        """
 
-            # No amount is given, e.g.: how many Credits is Iron ?
-            if len(amount_galactic) == 0:
-                amount_decimal = 1
-                amount_galactic_output = ''
-            else:
-                # Covert the amount of material requested into the decimal representation
-                amount_decimal = self.convert_galactic_to_decimal(amount_galactic)
-                amount_galactic_output = " ".join(amount_galactic) + ' '
-
-            # None is returned in case amount_galactic can't be converted to a valid roman numeral
-            # (and thus not into a decimal)
-            if amount_decimal is None:
-                print('invalid input. Input ignored.')
-                return
+        # Extract the elements that describe the requested amount and the material
+        amount_galactic = tuple(parts[4:-2])
+        material = parts[-2]
+
+        # Frequent requests are answered without conversion and formatting
+        cache_key = (amount_galactic, material)
+        answer = self.credits_cache.get(cache_key, _NOT_CACHED)
+        if answer is _NOT_CACHED:
+            answer = self._answer_credits_request(amount_galactic, material)
+
+            # The answer stays valid as long as neither a contained galactic digit nor the material value changes
+            self.credits_cache.put(cache_key, answer, dependencies=(*amount_galactic, (MATERIAL_DEPENDENCY, material)))
+
+        self._respond(*answer)
+
+    def _answer_credits_request(self, amount_galactic: tuple[str, ...],
+                                material: str) -> tuple[ResponseKind, str, Optional[Union[int, float]]]:
+        """
+        :param amount_galactic: The requested amount as galactic digits.
+        :param material: The requested material.
+        :return: The answer as (kind, text, value).
+        :raises MissingGalacticDigitError: In case the roman digit of a galactic digit is unknown.
+        """
+
+        # No amount is given, e.g.: how many Credits is Iron ?
+        if len(amount_galactic) == 0:
+            amount_decimal = 1
+            amount_galactic_output = ''
+        else:
+            # Covert the amount of material requested into the decimal representation
+            amount_decimal = self.convert_galactic_to_decimal(amount_galactic)
+            amount_galactic_output = " ".join(amount_galactic) + ' '
 
-            # Get the material and its price per unit
-            material = parts[-2]
-            if material in self.material_values.keys():
-                material_value = self.material_values.get(material)
-            elif amount_galactic_output == '':
+        # None is returned in case amount_galactic can't be converted to a valid roman numeral
+        # (and thus not into a decimal)
+        if amount_decimal is None:
+            return ResponseKind.INVALID_INPUT, 'invalid input. Input ignored.', None
+
+        # Get the price per unit of the material
+        material_value = self.material_values.get(material)
+        if material_value is None:
+            if amount_galactic_output == '':
                 # In case material and amount are missing
                 # Otherwise would interpret 'is' as material
-                print('invalid input. Input ignored.')
-                return
+                return ResponseKind.INVALID_INPUT, 'invalid input. Input ignored.', None
             else:
-                print(f'unknown material: {material}')
-                return
+                return ResponseKind.UNKNOWN_MATERIAL, f'unknown material: {material}', None
+
+        # Calculated exactly, whole numbers are shown without decimal places
+        overall_value, overall_value_text = self._format_credits(material_value, amount_decimal, self.price_format,
+                                                                 self.decimal_places)
+
+        return ResponseKind.CREDITS, f'{amount_galactic_output}{material} is {overall_value_text} Credits', \
+            overall_value
+
+    def exchange_rates(self) -> Optional['exchange.ExchangeRates']:
+        """
+        The matrix is built from the material values on first use and then kept up to date, e.g. to read the rates
+        of a material to all others at once with ExchangeRates.row or ExchangeRates.column.
+        :return: The exchange rates between all materials with a value, None while the memory of the materials is
+            limited, see limit_material_memory.
+        """
+
+        if self._exchange_rates is None and self._exchange_rates_enabled:
+            from assignment import exchange
+            self._exchange_rates = exchange.ExchangeRates(self.material_values)
+
+        return self._exchange_rates
+
+    def handle_exchange_request(self, parts: list[str]) -> None:
+        """
+        Answers a request for the amount of a material that is worth an amount of another material.
+        Input line example: how many Silver is glob prok Gold ?
+        :param parts:  A list of terms (strings) in the input line.
+        :return: None
+        """
 
-            overall_value = amount_decimal * material_value
+        # Extract the requested material, the amount and the material that is exchanged
+        target = parts[2]
+        amount_galactic = parts[4:-2]
+        source = parts[-2]
 
-            # Cast to integer to avoid decimal places in the output but only if the value is whole number
-            overall_value = int(overall_value) if overall_value.is_integer() else overall_value
+        # No amount is given, e.g.: how many Silver is Gold ?
+        if len(amount_galactic) == 0:
+            amount_decimal = 1
+            amount_galactic_output = ''
+        else:
+            amount_decimal = self.convert_galactic_to_decimal(amount_galactic)
+            amount_galactic_output = " ".join(amount_galactic) + ' '
 
-            print(f'{amount_galactic_output}{material} is {overall_value} Credits')
+        if amount_decimal is None:
+            self._respond(ResponseKind.INVALID_INPUT, 'invalid input. Input ignored.')
             return
 
+        rates = self.exchange_rates()
+        known_materials = rates.slots if rates is not None else self.material_values
+        if source not in known_materials:
+            if amount_galactic_output == '':
+                # In case material and amount are missing, otherwise 'is' would be interpreted as material
+                self._respond(ResponseKind.INVALID_INPUT, 'invalid input. Input ignored.')
+            else:
+                self._respond(ResponseKind.UNKNOWN_MATERIAL, f'unknown material: {source}')
+            return
+
+        if target not in known_materials:
+            self._respond(ResponseKind.UNKNOWN_MATERIAL, f'unknown material: {target}')
+            return
+
+        if rates is not None:
+            rate = rates.rate(source, target)
         else:
-            # This answer is printed in case it is a request (input ending with a ?) that can't be interpreted at all
-            print('I have no idea what you are talking about')
+            from assignment import exchange
+            rate = exchange.exchange_rate(self.material_values[source], self.material_values[target])
+
+        if rate is None:
+            self._respond(ResponseKind.NOT_EXCHANGEABLE, f'{target} is worth nothing, it can\'t be exchanged')
             return
 
+        # The amount of the requested material is calculated exactly like a value in Credits
+        overall_amount, overall_amount_text = self._format_credits(rate, amount_decimal, self.price_format,
+                                                                   self.decimal_places)
+        self._respond(ResponseKind.EXCHANGE, f'{amount_galactic_output}{source} is {overall_amount_text} {target}',
+                      overall_amount)
+
+    def handle_unknown_request(self, parts: list[str]) -> None:
+        """
+        Answers a request that can't be interpreted at all.
+        :param parts:  A list of terms (strings) in the input line.
+        :return: None
+        """
+
+        self._respond(ResponseKind.UNKNOWN_REQUEST, 'I have no idea what you are talking about')
+
+    def handle_stats_request(self, parts: list[str]) -> None:
+        """
+        Answers the statistics of the instrumentation as JSON.
+        Input line: stats ?
+        :param parts: A list of terms (strings) in the input line.
+        :return: None
+        """
+
+        if self.instrumentation is None:
+            self._respond(ResponseKind.STATS, 'instrumentation is disabled')
+        else:
+            self._respond(ResponseKind.STATS, self.instrumentation.to_json())
+
     def get_smaller_roman_digits(self, target_roman_digit: str) -> list[str]:
         """
         :param target_roman_digit: The roman digit as string for which the ones with lower values should be calculated.
@@ -259,86 +1497,32 @@ class GalacticUnitConverter:
         :return: True if second_roman_digit - first_roman_digit is allowed according to the rules, False otherwise.
         """
 
-        # Alternatively to the hard-coded rules for I,X and C, a "subtraction is only allowed from the next
-        # two higher symbols" rule could have been implemented using self.numeral_to_value
-        allowed_to_subtract_from = {
-            'I': ['V', 'X'],
-            'X': ['L', 'C'],
-            'C': ['D', 'M'],
-        }
-
-        if first_roman_digit in ['V', 'L', 'D']:
-            return False
-        elif second_roman_digit not in allowed_to_subtract_from.get(first_roman_digit):
-            return False
-        else:
-            return True
+        return roman_numerals.rule_compliant_subtraction(first_roman_digit, second_roman_digit)
 
     def is_valid_roman_numeral(self, roman_numeral: str) -> bool:
         """
         Checks whether the input string is a valid roman numeral.
         For the purpose of the assignment, the implementation adheres to the given rules,
             even if simpler tests for the correctness of a roman numeral exist.
+        The rules are checked in a single pass using a transition table that is shared by all instances. In the
+            extended numeral modes, the numeral is valid if it is the canonical numeral of its value.
         :param roman_numeral: A string containing a roman numeral.
-        :return: True if roman_numeral is a valid roman numeral, False otherwise.
+        :return: True if roman_numeral is a valid roman numeral of the numeral mode, False otherwise.
         """
 
-        if roman_numeral is None or roman_numeral == '':
-            return False
-
-        # Ensure the passed string only contains valid roman numerals
-        if not all([char in self.roman_digit_to_dec_value.keys() for char in roman_numeral]):
-            return False
-
-        # "D", "L", and "V" can never be repeated. -> occur once at most
-        nbr_occurrences_numerals = Counter(roman_numeral)
-        for roman_digit in ['D', 'L', 'V']:
-            if nbr_occurrences_numerals[roman_digit] > 1:
-                return False
-
-        # At most 3 repetitions (+1  in case of subtraction) check
-        # Assumption: Cases like XXIX (less than 3 receptions followed by a subtraction) are also valid.
-        for roman_digit in ['I', 'X', 'C', 'M']:
+        return self._validate_roman_numeral(roman_numeral)
 
-            smaller_digits = self.get_smaller_roman_digits(roman_digit)
-
-            if len(smaller_digits) > 0:
-                smaller_digits_str = "".join(smaller_digits)
-                # Pattern: More than 4 receptions or more than one repetition after a subtraction
-                pattern = f'([{roman_digit}]{{4,}}|([{roman_digit}]{{1,3}}[{smaller_digits_str}][{roman_digit}]{{2,}}))'
-            else:
-                # Specific pattern for roman_digit, from which nothing can be subtracted, i.e. I
-                # smaller_digits is emtpy -> wrong pattern check
-                pattern = f'[{roman_digit}]{{4,}}'
-
-            # In case the pattern is found a rules is broken and the sanity check fails
-            pattern = re.compile(pattern)
-            if bool(re.search(pattern, roman_numeral)):
-                return False
-
-        for index, current_digit in enumerate(roman_numeral):
-
-            # No subtraction of first numeral possible
-            if index == 0:
-                continue
-
-            prev_digit = roman_numeral[index - 1]
-
-            # Subtraction case
-            if self.roman_digit_to_dec_value.get(prev_digit) < self.roman_digit_to_dec_value.get(current_digit):
-                if not self.rule_compliant_subtraction(prev_digit, current_digit):
-                    return False
-
-                # Starting from the third numeral, a double subtraction error must be checked
-                if index > 1:
+    def _is_canonical_roman_numeral(self, roman_numeral: str) -> bool:
+        """
+        :param roman_numeral: A string containing a roman numeral.
+        :return: True if roman_numeral is the canonical numeral of its value in the extended numeral mode.
+        """
 
-                    # Check if numeral at two positions before the current one also has a lower value
-                    prev_digit_2 = roman_numeral[index - 2]
-                    if self.roman_digit_to_dec_value.get(prev_digit_2) < self.roman_digit_to_dec_value.get(
-                            current_digit):
-                        return False
+        if not roman_numeral:
+            return False
 
-        return True
+        roman_digits = roman_numerals.split_roman_digits(roman_numeral)
+        return roman_numerals.decode_digits(roman_digits, self.numeral_system) is not None
 
 
 if __name__ == '__main__':
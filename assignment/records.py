@@ -0,0 +1,189 @@
+import csv
+import io
+from enum import Enum
+from typing import TYPE_CHECKING, Iterable, Iterator, NamedTuple, Optional, TextIO, Union
+
+from assignment.responses import Response, ResponseDetails, ResponseKind
+
+if TYPE_CHECKING:
+    from assignment.problem_3 import GalacticUnitConverter
+
+# Number of records serialized and written at once
+DEFAULT_BATCH_SIZE = 1024
+
+# Responses that answer their input line, the kinds of all other responses are reported as error code
+SUCCESSFUL_KINDS = frozenset({ResponseKind.AMOUNT, ResponseKind.CREDITS, ResponseKind.GALACTIC, ResponseKind.EXCHANGE,
+                              ResponseKind.STATS})
+
+
+class OutputFormat(Enum):
+    # The text of each response, e.g. glob prok Silver is 68 Credits
+    TEXT = 'text'
+
+    # A JSON object with the fields of OutputRecord per line
+    JSONL = 'jsonl'
+
+    # A header with the fields of OutputRecord, followed by a row per record
+    CSV = 'csv'
+
+
+class OutputRecord(NamedTuple):
+    """
+    Typed variant of a single line of output, such that consumers don't have to parse the text of the response.
+    """
+
+    # The number of the input line the response refers to
+    line_number: int
+
+    # Kind of the input line, e.g. 'credits_request', see grammar.LineKind
+    request: Optional[str]
+
+    galactic_amount: Optional[str]
+    decimal_amount: Optional[int]
+    material: Optional[str]
+
+    # The overall value of the amount in Credits
+    credits: Optional[Union[int, float]]
+
+    # The kind of the response in case it doesn't answer the input line, e.g. 'invalid_input' or 'unknown_material'.
+    # None otherwise.
+    error: Optional[str]
+
+    # The requested material of "how many <material> is ... ?" and the amount of it
+    target_material: Optional[str]
+    target_amount: Optional[Union[int, float]]
+
+    # The galactic digit of 'missing_information' and 'unresolved'
+    missing_digit: Optional[str]
+
+
+# Kind of a response -> the error field of its record
+_ERRORS = {kind: None if kind in SUCCESSFUL_KINDS else kind.value for kind in ResponseKind}
+
+# Names of the fields in the order of the CSV columns
+RECORD_FIELDS = OutputRecord._fields
+
+# A JSON object with all fields, filled with the JSON of the values. Like json.dumps without spaces, but without
+# creating a dictionary per record.
+_JSON_TEMPLATE = '{' + ','.join(f'"{field}":%s' for field in RECORD_FIELDS) + '}\n'
+
+# Details of responses created without them, see GalacticUnitConverter.detailed_responses
+_NO_DETAILS = ResponseDetails(None)
+
+
+def to_record(response: Response) -> OutputRecord:
+    """
+    :param response: A response, with ResponseDetails for all fields to be filled.
+    :return: The OutputRecord of the response.
+    """
+
+    details = response.details or _NO_DETAILS
+    return OutputRecord(response.line_number, details.request, details.galactic_amount, details.decimal_amount,
+                        details.material, details.credits, _ERRORS[response.kind], details.target_material,
+                        details.target_amount, details.missing_digit)
+
+
+def iter_records(converter: 'GalacticUnitConverter', input_lines: Iterable[str],
+                 stop_on_empty_line: bool = False) -> Iterator[OutputRecord]:
+    """
+    Variant of GalacticUnitConverter.process_lines that yields a record per response.
+    :param converter: The converter processing the lines. It creates detailed responses while the records are read.
+    :param input_lines: Any iterable of input lines.
+    :param stop_on_empty_line: Whether an empty line ends the input, like in convert().
+    :return: An iterator over the records.
+    """
+
+    previous_detailed_responses, converter.detailed_responses = converter.detailed_responses, True
+    try:
+        for response in converter.process_lines(input_lines, stop_on_empty_line):
+            yield to_record(response)
+    finally:
+        converter.detailed_responses = previous_detailed_responses
+
+
+class RecordWriter:
+    """
+    Collects records and serializes and writes them in batches, instead of formatting and writing each one on its own.
+    """
+
+    def __init__(self, stream: TextIO, output_format: OutputFormat, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        :param stream: The text stream the records are written to.
+        :param output_format: OutputFormat.JSONL or OutputFormat.CSV.
+        :param batch_size: The number of records after which the collected ones are written.
+        :raises ValueError: In case the format has no records, i.e. OutputFormat.TEXT.
+        """
+
+        if output_format == OutputFormat.JSONL:
+            self._serialize = self._serialize_jsonl
+        elif output_format == OutputFormat.CSV:
+            self._serialize = self._serialize_csv
+        else:
+            raise ValueError(f'{output_format} has no records')
+
+        self.stream = stream
+        self.output_format = output_format
+        self.batch_size = batch_size
+
+        self._records: list[OutputRecord] = []
+
+        # The header of the CSV format is written with the first batch, even if it is empty
+        self._header_written = output_format != OutputFormat.CSV
+
+    @staticmethod
+    def _serialize_jsonl(records: list[OutputRecord]) -> str:
+        # The values are strings, integers, finite floats or None, whose JSON is the same as their repr apart from
+        # strings and None
+        from json.encoder import encode_basestring_ascii as encode_string
+
+        template = _JSON_TEMPLATE
+        return ''.join([template % tuple(['null' if value is None else
+                                          encode_string(value) if value.__class__ is str else repr(value)
+                                          for value in record])
+                        for record in records])
+
+    @staticmethod
+    def _serialize_csv(records: list[OutputRecord]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(records)
+        return buffer.getvalue()
+
+    def write_record(self, record: OutputRecord) -> None:
+        """
+        :param record: The next record.
+        :return: None
+        """
+
+        self._records.append(record)
+        if len(self._records) >= self.batch_size:
+            self.flush()
+
+    def write_response(self, response: Response) -> None:
+        """
+        :param response: A response, with ResponseDetails for all fields to be filled.
+        :return: None
+        """
+
+        self.write_record(to_record(response))
+
+    def flush(self) -> None:
+        """
+        Serializes and writes all collected records.
+        :return: None
+        """
+
+        if not self._header_written:
+            self.stream.write(','.join(RECORD_FIELDS) + '\n')
+            self._header_written = True
+
+        if self._records:
+            self.stream.write(self._serialize(self._records))
+            self._records.clear()
+
+        self.stream.flush()
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.flush()
@@ -0,0 +1,90 @@
+from enum import Enum
+from typing import NamedTuple, Optional, Union
+
+
+class ResponseKind(Enum):
+    # Answer to "how much is ... ?"
+    AMOUNT = 'amount'
+
+    # Answer to "how many Credits is ... ?"
+    CREDITS = 'credits'
+
+    # Answer to "what is ... in galactic ?"
+    GALACTIC = 'galactic'
+
+    # Answer to "how many <material> is ... ?"
+    EXCHANGE = 'exchange'
+
+    # A requested material is worth nothing, so no amount of it is worth anything else
+    NOT_EXCHANGEABLE = 'not_exchangeable'
+
+    # A requested number can't be written with the known galactic digits
+    NOT_REPRESENTABLE = 'not_representable'
+
+    # A requested material has no known value
+    UNKNOWN_MATERIAL = 'unknown_material'
+
+    # The term in place of the material in an information about a material is not a material
+    NOT_A_MATERIAL = 'not_a_material'
+
+    # The input can't be interpreted or contains an invalid numeral
+    INVALID_INPUT = 'invalid_input'
+
+    # A request that can't be interpreted at all
+    UNKNOWN_REQUEST = 'unknown_request'
+
+    # The user is asked for a missing galactic digit
+    MISSING_INFORMATION = 'missing_information'
+
+    # A deferred input that could not be processed until the end of the input
+    UNRESOLVED = 'unresolved'
+
+    # Answer to "stats ?" with the statistics of the instrumentation as JSON
+    STATS = 'stats'
+
+
+class ResponseDetails(NamedTuple):
+    """
+    The terms of the input line a response refers to and the values calculated from them, which are otherwise only
+    part of the text, see records. Fields that don't apply to the kind of the input line or response are None.
+    """
+
+    # Kind of the input line, e.g. 'credits_request', see grammar.LineKind
+    request: Optional[str]
+
+    # e.g. 'glob prok'
+    galactic_amount: Optional[str] = None
+    decimal_amount: Optional[int] = None
+    material: Optional[str] = None
+
+    # The overall value of the amount in Credits
+    credits: Optional[Union[int, float]] = None
+
+    # The requested material of "how many <material> is ... ?" and the amount of it
+    target_material: Optional[str] = None
+    target_amount: Optional[Union[int, float]] = None
+
+    # The galactic digit of MISSING_INFORMATION and UNRESOLVED
+    missing_digit: Optional[str] = None
+
+
+class Response(NamedTuple):
+    """
+    A single line of output of the converter together with structured information about it.
+    """
+
+    kind: ResponseKind
+
+    # The text as shown to the user
+    text: str
+
+    # The decimal amount for AMOUNT and GALACTIC, the overall value in Credits for CREDITS and the amount of the
+    # requested material for EXCHANGE, None otherwise. Values that are not whole numbers and beyond the range of floats
+    # are None as well.
+    value: Optional[Union[int, float]] = None
+
+    # The number of the input line the response refers to
+    line_number: int = 0
+
+    # Only while the converter creates detailed responses, see GalacticUnitConverter.detailed_responses
+    details: Optional[ResponseDetails] = None
@@ -0,0 +1,381 @@
+from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional, Sequence
+
+# Read-only, such that all converter instances can share the same mapping
+ROMAN_DIGIT_TO_DEC_VALUE = MappingProxyType({
+    'I': 1,
+    'V': 5,
+    'X': 10,
+    'L': 50,
+    'C': 100,
+    'D': 500,
+    'M': 1000
+})
+
+# "I" can be subtracted from "V" and "X" only, "X" from "L" and "C" only, "C" from "D" and "M" only
+ALLOWED_TO_SUBTRACT_FROM = MappingProxyType({
+    'I': ('V', 'X'),
+    'X': ('L', 'C'),
+    'C': ('D', 'M'),
+})
+
+# "D", "L", and "V" can never be repeated. -> occur once at most
+NON_REPEATABLE_DIGITS = frozenset('DLV')
+
+# Largest number that can be represented without repeating M more than three times
+MAX_ROMAN_NUMERAL = 3999
+
+# Number of numerals converted directly before the lookup table of all numerals is built. Short runs, e.g. of a
+# converter started for a handful of lines, never pay for building the table.
+TABLE_THRESHOLD = 256
+
+# Set once the lookup table is built, see roman_numeral_table
+_to_decimal: Optional[Mapping[str, int]] = None
+_direct_conversions = 0
+
+# Maximum number of roman digits of a numeral written for a decimal number in the extended numeral modes, such that
+# a request for a huge number doesn't exhaust the memory
+MAX_ENCODED_DIGITS = 1_000_000
+
+# Combining overline, a digit followed by it is worth a thousand times as much, e.g. V̅ is 5000
+VINCULUM = '\u0305'
+
+# Values that are written with a symbol (pair), in descending order
+_SYMBOL_VALUES = (
+    ('M', 1000), ('CM', 900), ('D', 500), ('CD', 400),
+    ('C', 100), ('XC', 90), ('L', 50), ('XL', 40),
+    ('X', 10), ('IX', 9), ('V', 5), ('IV', 4), ('I', 1),
+)
+
+
+class NumeralMode(Enum):
+    # I to M, numbers up to MAX_ROMAN_NUMERAL
+    STANDARD = 'standard'
+
+    # M can be repeated any number of times, e.g. MMMMMCM is 5900
+    REPEATED_M = 'repeated-m'
+
+    # Additionally V̅ to M̅ for 5000 to 1000000, M̅ can be repeated any number of times, e.g. MV̅ is 4000
+    VINCULUM = 'vinculum'
+
+
+class NumeralSystem(NamedTuple):
+    """
+    Digits of a numeral mode and the symbols its numbers are written with.
+    A number has a single valid numeral, the one written greedily with the largest symbols first.
+    """
+
+    # Roman digit -> decimal value
+    digit_values: Mapping[str, int]
+
+    # Values that are written with a symbol (pair) as (value, roman digits), in descending order
+    symbols: tuple[tuple[int, tuple[str, ...]], ...]
+
+    # Largest number that can be written, None if there is no limit
+    max_number: Optional[int]
+
+
+class RomanNumeralTable(NamedTuple):
+    """
+    Immutable lookup tables between all valid roman numerals and their decimal values.
+    """
+
+    # Roman numeral -> decimal value
+    to_decimal: Mapping[str, int]
+
+    # Decimal value -> roman numeral, index 0 is unused and contains an empty string
+    to_roman: tuple[str, ...]
+
+
+def rule_compliant_subtraction(first_roman_digit: str, second_roman_digit: str) -> bool:
+    """
+    Checks whether second_numeral - first_numeral is allowed according to the rules.
+    :param first_roman_digit: A for a roman numeral (sub)string "AB"
+    :param second_roman_digit: B for a roman numeral (sub)string "AB"
+    :return: True if second_roman_digit - first_roman_digit is allowed according to the rules, False otherwise.
+    """
+
+    return second_roman_digit in ALLOWED_TO_SUBTRACT_FROM.get(first_roman_digit, ())
+
+
+def _next_state(window: str, seen: str, roman_digit: str) -> Optional[tuple[str, str]]:
+    """
+    Applies the rules to a single additional digit.
+    All rules only concern the last four digits, apart from the non-repeatable digits, which are tracked separately.
+    :param window: Up to three digits preceding roman_digit.
+    :param seen: The non-repeatable digits that already occurred.
+    :param roman_digit: The next roman digit of the numeral.
+    :return: The state after roman_digit as (window, seen) or None in case a rule is broken.
+    """
+
+    if roman_digit in seen:
+        return None
+
+    value = ROMAN_DIGIT_TO_DEC_VALUE[roman_digit]
+
+    if len(window) == 3:
+        # More than 3 repetitions
+        if window == roman_digit * 3:
+            return None
+
+        # More than one repetition after a subtraction, e.g. XIXX
+        if window[0] == window[2] == roman_digit and ROMAN_DIGIT_TO_DEC_VALUE[window[1]] < value:
+            return None
+
+    # Subtraction case
+    if window and ROMAN_DIGIT_TO_DEC_VALUE[window[-1]] < value:
+        if not rule_compliant_subtraction(window[-1], roman_digit):
+            return None
+
+        # Only one small-value symbol may be subtracted from any large-value symbol
+        if len(window) > 1 and ROMAN_DIGIT_TO_DEC_VALUE[window[-2]] < value:
+            return None
+
+    if roman_digit in NON_REPEATABLE_DIGITS:
+        seen = seen + roman_digit
+
+    return (window + roman_digit)[-3:], seen
+
+
+@lru_cache(maxsize=None)
+def _transition_table() -> tuple[dict[str, int], ...]:
+    """
+    Builds the transition table of a finite automaton that accepts exactly the rule compliant roman numerals.
+    Built once on first use, state 0 is the start state.
+    :return: A tuple of transitions (roman digit -> next state) indexed by the current state.
+    """
+
+    state_ids = {('', ''): 0}
+    transitions = [{}]
+    queue = [('', '')]
+
+    for window, seen in queue:
+        current_transitions = transitions[state_ids[(window, seen)]]
+
+        for roman_digit in ROMAN_DIGIT_TO_DEC_VALUE:
+            next_state = _next_state(window, seen, roman_digit)
+            if next_state is None:
+                continue
+
+            if next_state not in state_ids:
+                state_ids[next_state] = len(transitions)
+                transitions.append({})
+                queue.append(next_state)
+
+            current_transitions[roman_digit] = state_ids[next_state]
+
+    return tuple(transitions)
+
+
+def is_valid_roman_numeral(roman_numeral: Optional[str]) -> bool:
+    """
+    Checks whether the input string is a valid roman numeral according to the rules of the assignment
+    in a single pass over the string.
+    :param roman_numeral: A string containing a roman numeral.
+    :return: True if roman_numeral is a valid roman numeral, False otherwise.
+    """
+
+    if not roman_numeral:
+        return False
+
+    transitions = _transition_table()
+    state = 0
+    for char in roman_numeral:
+        state = transitions[state].get(char)
+        if state is None:
+            return False
+
+    return True
+
+
+def _encode_roman_numeral(number: int) -> str:
+    """
+    Greedy conversion of a decimal number into its (canonical) roman numeral.
+    :param number: A number between 1 and MAX_ROMAN_NUMERAL.
+    :return: The roman numeral as string.
+    """
+
+    roman_numeral = []
+    for symbol, value in _SYMBOL_VALUES:
+        count, number = divmod(number, value)
+        roman_numeral.append(symbol * count)
+
+    return ''.join(roman_numeral)
+
+
+@lru_cache(maxsize=None)
+def roman_numeral_table() -> RomanNumeralTable:
+    """
+    Builds the lookup tables once per process on first use, such that they are shared by all converters.
+    Numerals that comply with the rules but can't be converted to a number in the usual way, e.g. XIXII,
+        are not contained and thus treated as invalid.
+    :return: The RomanNumeralTable for all numbers between 1 and MAX_ROMAN_NUMERAL.
+    """
+
+    global _to_decimal
+
+    to_roman = [''] + [_encode_roman_numeral(number) for number in range(1, MAX_ROMAN_NUMERAL + 1)]
+    to_decimal = {roman_numeral: number for number, roman_numeral in enumerate(to_roman)
+                  if is_valid_roman_numeral(roman_numeral)}
+
+    table = RomanNumeralTable(MappingProxyType(to_decimal), tuple(to_roman))
+    _to_decimal = table.to_decimal
+    return table
+
+
+def _decode_roman_numeral(roman_numeral: str) -> Optional[int]:
+    """
+    Converts a roman numeral without the lookup table, with the same result as a lookup.
+    :param roman_numeral: A string containing a roman numeral.
+    :return: The corresponding decimal number or None in case roman_numeral is not a valid roman numeral.
+    """
+
+    if not is_valid_roman_numeral(roman_numeral):
+        return None
+
+    # A digit is subtracted if a larger one follows
+    number = 0
+    previous_value = 0
+    for roman_digit in reversed(roman_numeral):
+        value = ROMAN_DIGIT_TO_DEC_VALUE[roman_digit]
+        if value < previous_value:
+            number -= value
+        else:
+            number += value
+            previous_value = value
+
+    # Like the table, only the usual way of writing a number is accepted, e.g. not XIXII
+    if number > MAX_ROMAN_NUMERAL or _encode_roman_numeral(number) != roman_numeral:
+        return None
+
+    return number
+
+
+def roman_to_decimal(roman_numeral: str) -> Optional[int]:
+    """
+    Validates and converts a roman numeral with a single lookup. The first TABLE_THRESHOLD numerals are converted
+    directly, afterwards the lookup table is built.
+    :param roman_numeral: A string containing a roman numeral.
+    :return: The corresponding decimal number or None in case roman_numeral is not a valid roman numeral.
+    """
+
+    global _direct_conversions
+
+    if _to_decimal is not None:
+        return _to_decimal.get(roman_numeral)
+
+    _direct_conversions += 1
+    if _direct_conversions <= TABLE_THRESHOLD:
+        return _decode_roman_numeral(roman_numeral)
+
+    return roman_numeral_table().to_decimal.get(roman_numeral)
+
+
+def make_numeral_system(roman_digits: Sequence[str], unbounded: bool) -> NumeralSystem:
+    """
+    Applies the rules of the assignment to a sequence of digits alternating between powers of ten and their fives,
+    like I, V, X, L, C, D and M: Only powers of ten are subtracted, each from the next five and ten only, and no
+    digit is repeated more than three times, apart from the last one if the system is unbounded.
+    :param roman_digits: The digits in ascending order, starting with the one for 1.
+    :param unbounded: Whether the last digit can be repeated any number of times. Requires a power of ten as last digit.
+    :return: The NumeralSystem.
+    """
+
+    digit_values = {roman_digit: 10 ** (index // 2) * (5 if index % 2 else 1)
+                    for index, roman_digit in enumerate(roman_digits)}
+
+    symbols = [(value, (roman_digit,)) for roman_digit, value in digit_values.items()]
+    for index in range(0, len(roman_digits), 2):
+        for larger_digit in roman_digits[index + 1:index + 3]:
+            symbols.append((digit_values[larger_digit] - digit_values[roman_digits[index]],
+                            (roman_digits[index], larger_digit)))
+
+    # Three repetitions of the last digit and the largest remainder written with the other symbols
+    max_number = None if unbounded else 4 * digit_values[roman_digits[-1]] - 1
+    return NumeralSystem(MappingProxyType(digit_values), tuple(sorted(symbols, reverse=True)), max_number)
+
+
+_ROMAN_DIGITS = tuple(ROMAN_DIGIT_TO_DEC_VALUE)
+
+# Numeral mode -> its NumeralSystem
+NUMERAL_SYSTEMS = MappingProxyType({
+    NumeralMode.STANDARD: make_numeral_system(_ROMAN_DIGITS, unbounded=False),
+    NumeralMode.REPEATED_M: make_numeral_system(_ROMAN_DIGITS, unbounded=True),
+    NumeralMode.VINCULUM: make_numeral_system(_ROMAN_DIGITS + tuple(roman_digit + VINCULUM
+                                                                    for roman_digit in _ROMAN_DIGITS[1:]),
+                                              unbounded=True),
+})
+
+# Digits of all numeral modes
+ROMAN_DIGITS = frozenset(NUMERAL_SYSTEMS[NumeralMode.VINCULUM].digit_values)
+
+
+def split_roman_digits(roman_numeral: str) -> list[str]:
+    """
+    :param roman_numeral: A string containing a roman numeral, possibly with digits of the vinculum mode.
+    :return: The roman digits of the numeral, a vinculum belongs to the digit before it.
+    """
+
+    roman_digits = []
+    for char in roman_numeral:
+        if char == VINCULUM and roman_digits:
+            roman_digits[-1] += char
+        else:
+            roman_digits.append(char)
+
+    return roman_digits
+
+
+def encode_digits(number: int, system: NumeralSystem, max_digits: Optional[int] = None) -> Optional[list[str]]:
+    """
+    Greedy conversion of a decimal number into its (canonical) numeral, in time linear in the number of digits.
+    :param number: A decimal number.
+    :param system: The NumeralSystem the number is written in.
+    :param max_digits: Numbers whose numeral repeats the largest digit more often are not written, None for no limit.
+    :return: The roman digits of the numeral or None in case the number can't be written in the system.
+    """
+
+    if number < 1 or system.max_number is not None and number > system.max_number:
+        return None
+    if max_digits is not None and number // system.symbols[0][0] > max_digits:
+        return None
+
+    roman_digits = []
+    for value, symbol in system.symbols:
+        if number >= value:
+            count, number = divmod(number, value)
+            roman_digits.extend(symbol * count)
+
+    return roman_digits
+
+
+def decode_digits(roman_digits: Sequence[str], system: NumeralSystem) -> Optional[int]:
+    """
+    Validates and converts a numeral of any length in two passes over its digits. Since the canonical numeral is the
+    only one that complies with the rules, the numeral is valid exactly if encoding its value results in it again.
+    :param roman_digits: The roman digits of the numeral.
+    :param system: The NumeralSystem the numeral is written in.
+    :return: The corresponding decimal number or None in case the digits are not a valid numeral of the system.
+    """
+
+    digit_values = system.digit_values
+
+    # A digit is subtracted if a larger one follows
+    number = 0
+    previous_value = 0
+    for roman_digit in reversed(roman_digits):
+        value = digit_values.get(roman_digit)
+        if value is None:
+            return None
+        if value < previous_value:
+            number -= value
+        else:
+            number += value
+            previous_value = value
+
+    if encode_digits(number, system) != list(roman_digits):
+        return None
+
+    return number
@@ -0,0 +1,366 @@
+import argparse
+import asyncio
+import logging
+import time
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from assignment.instrumentation import percentile
+from assignment.problem_3 import GalacticUnitConverter
+from assignment.responses import Response, ResponseKind
+
+# Kind of the line that marks the end of the responses to an input line
+DONE = 'done'
+
+# Default maximum length of an input line in bytes, longer lines are answered with an 'invalid input' response
+MAX_LINE_BYTES = 64 * 1024
+
+# Response to input lines that can't be processed at all
+_INVALID_INPUT_TEXT = 'invalid input. Input ignored.'
+
+# Errors the converter raises for input it can't process, e.g. a value too large for a float. All other errors are
+# bugs, which are logged and close the connection.
+_INPUT_ERRORS = (ValueError, ArithmeticError)
+
+_logger = logging.getLogger(__name__)
+
+
+def encode_response(response: Response) -> bytes:
+    """
+    :param response: A response of the converter.
+    :return: The response as a line of the protocol.
+    """
+
+    return f'{response.line_number}\t{response.kind.value}\t{response.text}\n'.encode('utf-8')
+
+
+class _Session:
+    """
+    State of a single client connection.
+    """
+
+    def __init__(self, converter: GalacticUnitConverter, writer: asyncio.StreamWriter):
+        self.converter = converter
+        self.writer = writer
+
+
+class ConverterServer:
+    """
+    Serves converters to many concurrent clients, either with a separate knowledge base per connection or with one
+    knowledge base shared by all connections.
+
+    Protocol: The client sends one input line per request and may send further lines without waiting for the answers.
+    For every input line, the server sends the responses as "<line number>\\t<kind>\\t<text>" lines in the order of
+    input, followed by a "<line number>\\tdone\\t" line. Instead of asking for a missing galactic digit, the input line
+    is deferred and a response of the kind "missing_information" is sent. As soon as the digit is defined by a regular
+    input line, e.g. "zok is V", the responses to the deferred line are sent with its original line number.
+    Lines that are too long, no valid UTF-8 or can't be processed by the converter are answered with an
+    "invalid_input" response, the connection stays open. The deferred lines of a closed connection are discarded.
+    """
+
+    def __init__(self, shared_knowledge_base: bool = False, max_connections: int = 100,
+                 converter_factory: Callable[[], GalacticUnitConverter] = GalacticUnitConverter,
+                 max_line_bytes: int = MAX_LINE_BYTES):
+        """
+        :param shared_knowledge_base: If True, information given by one client is available to all clients.
+        :param max_connections: Maximum number of connections served at the same time, further ones have to wait.
+        :param converter_factory: Creates the converters, e.g. with a specific cache size.
+        :param max_line_bytes: Maximum length of an input line, the limit of the stream readers.
+        """
+
+        self.converter_factory = converter_factory
+        self.shared_converter = converter_factory() if shared_knowledge_base else None
+        self.max_connections = max_connections
+        self.max_line_bytes = max_line_bytes
+        self._connection_slots: Optional[asyncio.Semaphore] = None
+
+        # Shared knowledge base: line number of a deferred input line -> session the line was received from
+        self._deferred_line_sessions: dict[int, _Session] = {}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Answers the input lines of a single client until it closes the connection.
+        :param reader: The stream of the input lines.
+        :param writer: The stream the responses are written to.
+        :return: None
+        """
+
+        # Created on first use, such that it belongs to the running event loop
+        if self._connection_slots is None:
+            self._connection_slots = asyncio.Semaphore(self.max_connections)
+
+        async with self._connection_slots:
+            converter = self.shared_converter if self.shared_converter is not None else self.converter_factory()
+            session = _Session(converter, writer)
+
+            try:
+                while True:
+                    try:
+                        line = await reader.readuntil(b'\n')
+                    except asyncio.IncompleteReadError as error:
+                        # The last line might not end with a line break
+                        line = error.partial
+                    except asyncio.LimitOverrunError:
+                        await _discard_line(reader)
+                        self.reject_line(session)
+                        await writer.drain()
+                        continue
+
+                    if not line:
+                        break
+
+                    try:
+                        input_line = line.decode('utf-8').rstrip('\r\n')
+                    except UnicodeDecodeError:
+                        self.reject_line(session)
+                    else:
+                        self.process_line(session, input_line)
+
+                    # Pipelined lines are answered without waiting, but a slow client slows down the reading
+                    await writer.drain()
+            except ConnectionError:
+                pass
+            except Exception:
+                _logger.exception('Failed to process an input line, the connection is closed')
+            finally:
+                self._discard_deferred_lines(session)
+                writer.close()
+
+    def process_line(self, session: _Session, input_line: str) -> None:
+        """
+        Processes a single input line and writes the responses to the sessions they belong to.
+        :param session: The session the line was received from.
+        :param input_line: A single line of input as a string.
+        :return: None
+        """
+
+        try:
+            responses = session.converter.process_line(input_line)
+        except _INPUT_ERRORS:
+            # Input the converter can't process is answered like any other invalid input
+            responses = [Response(ResponseKind.INVALID_INPUT, _INVALID_INPUT_TEXT, None, session.converter.line_number)]
+        line_number = session.converter.line_number
+
+        if self.shared_converter is None:
+            session.writer.write(b''.join(map(encode_response, responses)))
+        else:
+            # Deferred lines of other clients might be resolved by the information of this one
+            own_responses = []
+            for response in responses:
+                if response.line_number == line_number:
+                    deferred_session = self._deferred_line_sessions.get(line_number, session)
+                else:
+                    # Responses to deferred lines only go to the client that sent the line, never to another one
+                    deferred_session = self._deferred_line_sessions.get(response.line_number)
+                    if deferred_session is None:
+                        continue
+
+                # Remember which client a deferred line belongs to until it is resolved
+                if response.kind == ResponseKind.MISSING_INFORMATION:
+                    self._deferred_line_sessions[response.line_number] = deferred_session
+                else:
+                    self._deferred_line_sessions.pop(response.line_number, None)
+
+                if deferred_session is session:
+                    own_responses.append(response)
+                elif not deferred_session.writer.is_closing():
+                    deferred_session.writer.write(encode_response(response))
+
+            session.writer.write(b''.join(map(encode_response, own_responses)))
+
+        session.writer.write(f'{line_number}\t{DONE}\t\n'.encode('utf-8'))
+
+    def _discard_deferred_lines(self, session: _Session) -> None:
+        """
+        Forgets the deferred lines of a closed connection, such that the shared converter never answers them.
+        :param session: The session of the closed connection.
+        :return: None
+        """
+
+        line_numbers = {line_number for line_number, deferred_session in self._deferred_line_sessions.items()
+                        if deferred_session is session}
+        if not line_numbers:
+            return
+
+        session.converter.discard_pending_lines(line_numbers)
+        for line_number in line_numbers:
+            del self._deferred_line_sessions[line_number]
+
+    def reject_line(self, session: _Session) -> None:
+        """
+        Answers an input line that can't be passed to the converter, e.g. because it is too long.
+        :param session: The session the line was received from.
+        :return: None
+        """
+
+        session.converter.line_number += 1
+        line_number = session.converter.line_number
+        response = Response(ResponseKind.INVALID_INPUT, _INVALID_INPUT_TEXT, None, line_number)
+        session.writer.write(encode_response(response) + f'{line_number}\t{DONE}\t\n'.encode('utf-8'))
+
+    async def start_tcp(self, host: str = '127.0.0.1', port: int = 0) -> asyncio.AbstractServer:
+        """
+        :param host: The address to listen on.
+        :param port: The port to listen on, 0 selects a free port.
+        :return: The started server.
+        """
+
+        return await asyncio.start_server(self.handle_connection, host, port, limit=self.max_line_bytes)
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        """
+        :param path: The path of the Unix domain socket.
+        :return: The started server.
+        """
+
+        return await asyncio.start_unix_server(self.handle_connection, path, limit=self.max_line_bytes)
+
+
+async def _discard_line(reader: asyncio.StreamReader) -> None:
+    """
+    Skips the rest of an input line that exceeds the limit of the reader, up to and including its line break.
+    :param reader: The stream of the input lines.
+    :return: None
+    """
+
+    while True:
+        try:
+            await reader.readuntil(b'\n')
+            return
+        except asyncio.LimitOverrunError as error:
+            # The buffered part of the line, without the line break in case it was already received
+            await reader.readexactly(error.consumed)
+        except asyncio.IncompleteReadError:
+            return
+
+
+class LoadReport(NamedTuple):
+    requests: int
+    seconds: float
+    requests_per_second: float
+    p50_latency_ms: float
+    p99_latency_ms: float
+
+
+async def _run_client(open_connection: Callable, input_lines: list[str], pipeline_depth: int,
+                      latencies: list[float]) -> None:
+    """
+    Sends all input lines over a single connection, with at most pipeline_depth unanswered lines at a time.
+    :param open_connection: Opens a connection to the server and returns its reader and writer.
+    :param input_lines: The input lines to send.
+    :param pipeline_depth: Maximum number of lines sent without having received the responses.
+    :param latencies: The latency of each line in seconds is appended to this list.
+    :return: None
+    """
+
+    reader, writer = await open_connection()
+    window = asyncio.Semaphore(pipeline_depth)
+    send_times: list[float] = []
+
+    async def send() -> None:
+        for input_line in input_lines:
+            await window.acquire()
+            send_times.append(time.perf_counter())
+            writer.write(input_line.encode('utf-8') + b'\n')
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    answered = 0
+
+    while answered < len(input_lines):
+        line = await reader.readline()
+        if not line:
+            break
+
+        if line.split(b'\t', 2)[1] == DONE.encode('utf-8'):
+            latencies.append(time.perf_counter() - send_times[answered])
+            answered += 1
+            window.release()
+
+    await sender
+    writer.close()
+    await writer.wait_closed()
+
+
+async def generate_load(input_lines: Iterable[str], host: str = '127.0.0.1', port: Optional[int] = None,
+                        unix_path: Optional[str] = None, connections: int = 10,
+                        pipeline_depth: int = 32) -> LoadReport:
+    """
+    Sends the same input lines over several concurrent connections and measures the latency of each line.
+    :param input_lines: The input lines sent over each connection.
+    :param host: The address of the server.
+    :param port: The TCP port of the server.
+    :param unix_path: The path of the Unix domain socket of the server, used instead of host and port.
+    :param connections: Number of concurrent connections.
+    :param pipeline_depth: Maximum number of unanswered lines per connection.
+    :return: The LoadReport.
+    """
+
+    input_lines = list(input_lines)
+
+    if unix_path is not None:
+        def open_connection():
+            return asyncio.open_unix_connection(unix_path)
+    else:
+        def open_connection():
+            return asyncio.open_connection(host, port)
+
+    latencies: list[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(*[_run_client(open_connection, input_lines, pipeline_depth, latencies)
+                           for _ in range(connections)])
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return LoadReport(len(latencies), seconds, len(latencies) / seconds if seconds > 0 else 0.0,
+                      percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000)
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = ConverterServer(args.shared, args.max_connections)
+    if args.unix:
+        async_server = await server.start_unix(args.unix)
+    else:
+        async_server = await server.start_tcp(args.host, args.port)
+
+    async with async_server:
+        await async_server.serve_forever()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Galactic unit converter service and load generator.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help='Run the service.')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8525)
+    serve_parser.add_argument('--unix', help='Path of a Unix domain socket, used instead of host and port.')
+    serve_parser.add_argument('--shared', action='store_true', help='Share the knowledge base between connections.')
+    serve_parser.add_argument('--max-connections', type=int, default=100)
+
+    load_parser = subparsers.add_parser('load', help='Generate load and report latency and throughput.')
+    load_parser.add_argument('input_file', help='File with the input lines sent over each connection.')
+    load_parser.add_argument('--host', default='127.0.0.1')
+    load_parser.add_argument('--port', type=int, default=8525)
+    load_parser.add_argument('--unix', help='Path of a Unix domain socket, used instead of host and port.')
+    load_parser.add_argument('--connections', type=int, default=10)
+    load_parser.add_argument('--pipeline-depth', type=int, default=32)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        try:
+            asyncio.run(_serve(args))
+        except KeyboardInterrupt:
+            pass
+    else:
+        with open(args.input_file) as input_file:
+            input_lines = [line for line in input_file.read().split('\n') if line != '']
+
+        report = asyncio.run(generate_load(input_lines, args.host, args.port, args.unix, args.connections,
+                                           args.pipeline_depth))
+        print(f'{report.requests} requests in {report.seconds:.3f} s: {report.requests_per_second:.0f} requests/s, '
+              f'p50 {report.p50_latency_ms:.3f} ms, p99 {report.p99_latency_ms:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
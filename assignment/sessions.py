@@ -0,0 +1,250 @@
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+from assignment import grammar
+from assignment.pricing import Price
+from assignment.problem_3 import GalacticUnitConverter, KnowledgeBase, MaterialFact
+from assignment.responses import Response
+
+# Kinds of input lines that change the knowledge base
+_FACT_KINDS = frozenset({grammar.LineKind.GALACTIC_NUMERAL_INFO, grammar.LineKind.MATERIAL_INFO})
+
+
+class Session:
+    """
+    The knowledge base of a single tenant, stored as the differences to the base knowledge base of its manager.
+    A session without own information only holds its line number, such that it costs about a hundred bytes.
+    """
+
+    __slots__ = ('manager', 'line_number', 'galactic_digit_to_roman', 'material_facts', 'material_values',
+                 'pending_lines')
+
+    def __init__(self, manager: 'SessionManager'):
+        self.manager = manager
+
+        # Number of input lines processed so far, updated when the converter of the session is released
+        self.line_number = 0
+
+        # The differences to the base are only stored once the converter of the session is released,
+        # None stands for no differences
+
+        # Galactic digits which are not defined in the base or mapped to another roman digit
+        self.galactic_digit_to_roman: Optional[dict[str, str]] = None
+
+        # Material information of the session, the values of these materials are calculated from it
+        self.material_facts: Optional[dict[str, MaterialFact]] = None
+
+        # Values of other materials of the base which differ due to the galactic digits, None for no value
+        self.material_values: Optional[dict[str, Optional[Price]]] = None
+
+        # Deferred input lines of a session whose converter was released, see GalacticUnitConverter.pending_lines
+        self.pending_lines: Optional[dict[str, list[tuple[int, str]]]] = None
+
+    @property
+    def has_own_information(self) -> bool:
+        return self.galactic_digit_to_roman is not None or self.material_facts is not None or \
+            self.material_values is not None
+
+    def process_line(self, input_line: str) -> list[Response]:
+        """
+        :param input_line: A single line of input as a string.
+        :return: The responses to the line, see GalacticUnitConverter.process_line.
+        """
+
+        return self.manager.process_line(self, input_line)
+
+
+class SessionManager:
+    """
+    Hosts the knowledge bases of many tenants in one process. All sessions start with the same base knowledge base.
+
+    Requests of sessions without own information are answered by a single converter holding the base, which is
+    never changed. Once a session receives information, it is processed by a converter of its own, which starts as
+    a copy of the base. At most max_active_sessions of these converters exist at once. When the least recently used
+    one is released, only the differences of its knowledge base to the base are kept in the session.
+
+    All converters share the token table, so every galactic digit and material is stored once, and the read-only
+    tables of roman numerals. All converters are non-interactive, missing galactic digits defer the input line.
+    """
+
+    def __init__(self, base: Optional[KnowledgeBase] = None, max_active_sessions: int = 256,
+                 **converter_options):
+        """
+        :param base: The knowledge base all sessions start with, e.g. a snapshot of a converter.
+        :param max_active_sessions: Maximum number of sessions with a converter of their own at once.
+        :param converter_options: Options of the GalacticUnitConverter of each session, e.g. price_format.
+        """
+
+        if max_active_sessions < 1:
+            raise ValueError('max_active_sessions must be at least 1')
+
+        self.max_active_sessions = max_active_sessions
+        self._converter_options = converter_options
+        self.tokens = grammar.TokenTable()
+
+        self._base_converter = self._new_converter()
+        if base is not None:
+            self._base_converter.load_knowledge_base(base)
+
+        # Copy with interned keys, the loaded material information has line number 0 like in every copy of the base
+        self.base = self._base_converter.snapshot()
+
+        # Tenant -> session
+        self.sessions: dict[Hashable, Session] = {}
+
+        # Amount of material information -> the same tuple, shared by the sessions
+        self._amounts: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+        # Sessions with a converter of their own, in the order they were used
+        self._active: OrderedDict[Session, GalacticUnitConverter] = OrderedDict()
+
+    def _new_converter(self) -> GalacticUnitConverter:
+        return GalacticUnitConverter(interactive=False, tokens=self.tokens, **self._converter_options)
+
+    def session(self, tenant: Hashable) -> Session:
+        """
+        :param tenant: Identifies the tenant, e.g. a customer id.
+        :return: The session of the tenant, created on first use.
+        """
+
+        session = self.sessions.get(tenant)
+        if session is None:
+            session = self.sessions[tenant] = Session(self)
+
+        return session
+
+    def process_line(self, session: Session, input_line: str) -> list[Response]:
+        """
+        :param session: A session of this manager.
+        :param input_line: A single line of input as a string.
+        :return: The responses to the line, see GalacticUnitConverter.process_line.
+        """
+
+        converter = self._active.get(session)
+        if converter is not None:
+            self._active.move_to_end(session)
+        elif not session.has_own_information and session.pending_lines is None and \
+                grammar.parse_line(input_line)[0] not in _FACT_KINDS:
+            return self._process_with_base(session, input_line)
+        else:
+            converter = self._activate(session)
+
+        return converter.process_line(input_line)
+
+    def _process_with_base(self, session: Session, input_line: str) -> list[Response]:
+        """
+        Answers a request of a session without own information with the base converter.
+        :param session: The session.
+        :param input_line: An input line that is not an information.
+        :return: The responses to the line.
+        """
+
+        base_converter = self._base_converter
+        base_converter.line_number = session.line_number
+        responses = base_converter.process_line(input_line)
+        session.line_number = base_converter.line_number
+
+        # A request with a missing galactic digit is deferred in the session, not in the base
+        if base_converter.pending_lines:
+            session.pending_lines, base_converter.pending_lines = base_converter.pending_lines, {}
+
+        return responses
+
+    def _activate(self, session: Session) -> GalacticUnitConverter:
+        """
+        Creates the converter of a session from the base and the differences stored in the session.
+        :param session: A session without converter.
+        :return: The converter of the session.
+        """
+
+        base = self.base
+
+        # The converter copies the dictionaries while loading them, so the ones of the base can be passed directly
+        galactic_digit_to_roman = base.galactic_digit_to_roman
+        if session.galactic_digit_to_roman is not None:
+            galactic_digit_to_roman = {**galactic_digit_to_roman, **session.galactic_digit_to_roman}
+
+        material_values = base.material_values
+        if session.material_values is not None:
+            material_values = dict(material_values)
+            for material, material_value in session.material_values.items():
+                if material_value is None:
+                    del material_values[material]
+                else:
+                    material_values[material] = material_value
+
+        material_facts = base.material_facts
+        if session.material_facts is not None:
+            material_facts = {**material_facts, **session.material_facts}
+
+        converter = self._new_converter()
+        converter.load_knowledge_base(KnowledgeBase(galactic_digit_to_roman, material_values, base.version,
+                                                    material_facts))
+
+        # The values of the materials of the session are calculated like in GalacticUnitConverter.handle_material_info
+        for material, material_fact in (session.material_facts or {}).items():
+            amount_decimal = converter.convert_galactic_to_decimal(material_fact.amount_galactic)
+            if amount_decimal is None:
+                converter.material_values.pop(material, None)
+            else:
+                converter.material_values[material] = Price.of(material_fact.credits, amount_decimal)
+            converter.material_facts[material] = converter.material_facts[material]._replace(
+                line_number=material_fact.line_number)
+
+        session.galactic_digit_to_roman = session.material_facts = session.material_values = None
+
+        converter.line_number = session.line_number
+        if session.pending_lines is not None:
+            converter.pending_lines, session.pending_lines = session.pending_lines, None
+
+        self._active[session] = converter
+        if len(self._active) > self.max_active_sessions:
+            self._release(*self._active.popitem(last=False))
+
+        return converter
+
+    def _release(self, session: Session, converter: GalacticUnitConverter) -> None:
+        """
+        Stores the differences between the knowledge base of a converter and the base in its session.
+        :param session: The session.
+        :param converter: The converter of the session.
+        :return: None
+        """
+
+        base = self.base
+
+        galactic_digit_to_roman = {galactic_digit: roman_digit
+                                   for galactic_digit, roman_digit in converter.galactic_digit_to_roman.items()
+                                   if base.galactic_digit_to_roman.get(galactic_digit) != roman_digit}
+
+        # Information is compared without its line number, which is 0 for the information of the base
+        material_facts: dict[str, MaterialFact] = {}
+        for material, material_fact in converter.material_facts.items():
+            base_fact = base.material_facts.get(material)
+            if base_fact is None or base_fact[:2] != material_fact[:2]:
+                # Many sessions use the same amounts, which are only stored once
+                amount_galactic = self._amounts.setdefault(material_fact.amount_galactic,
+                                                           material_fact.amount_galactic)
+                material_facts[material] = material_fact._replace(amount_galactic=amount_galactic)
+
+        material_values: dict[str, Optional[Price]] = {}
+        for material, base_value in base.material_values.items():
+            material_value = converter.material_values.get(material)
+            if material_value != base_value and material not in material_facts:
+                material_values[material] = material_value
+
+        session.galactic_digit_to_roman = galactic_digit_to_roman or None
+        session.material_facts = material_facts or None
+        session.material_values = material_values or None
+
+        session.line_number = converter.line_number
+        session.pending_lines = converter.pending_lines or None
+
+    def release_all(self) -> None:
+        """
+        Releases the converters of all sessions, e.g. before measuring the memory of the sessions.
+        :return: None
+        """
+
+        while self._active:
+            self._release(*self._active.popitem(last=False))
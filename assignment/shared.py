@@ -0,0 +1,222 @@
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from assignment import grammar
+from assignment.problem_3 import GalacticUnitConverter, KnowledgeBase
+from assignment.responses import Response
+
+# Kinds of input lines that change the knowledge base
+_FACT_KINDS = frozenset({grammar.LineKind.GALACTIC_NUMERAL_INFO, grammar.LineKind.MATERIAL_INFO})
+
+
+class ReadWriteLock:
+    """
+    Lock that is held by any number of readers or by a single writer. Waiting writers are preferred, such that a
+    steady stream of readers can't starve them.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._condition:
+            while self._writing or self._waiting_writers > 0:
+                self._condition.wait()
+            self._readers += 1
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers > 0:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class SharedConverter:
+    """
+    Converter that is shared by many threads, e.g. the workers of a thread pool serving requests.
+
+    Information is applied by one writer at a time to a primary converter. The facts it accepts, in the same form as
+    they are recorded in a journal, are published as a whole per input line, so the knowledge base moves from one
+    consistent version to the next. Every reader thread answers requests with its own converter, which replays the
+    facts published since its last request first. Readers thus never see a partially applied fact and never wait for
+    a writer processing its input, they only wait while published facts are appended to the log.
+
+    Each reader thread holds its own copy of the knowledge base. The log is compacted into a snapshot once it holds
+    compact_after facts, such that readers starting late or lagging far behind load the snapshot instead of
+    replaying all facts.
+    """
+
+    def __init__(self, compact_after: int = 10000, **converter_options):
+        """
+        :param compact_after: Number of published facts after which the log is replaced by a snapshot.
+        :param converter_options: Options of the GalacticUnitConverter of the writer and of each reader, e.g.
+            price_format. All converters are non-interactive.
+        """
+
+        self.compact_after = compact_after
+        self._converter_options = converter_options
+
+        # Serializes the writers, which apply information to the primary converter
+        self._write_mutex = threading.Lock()
+        self._primary = GalacticUnitConverter(interactive=False, **converter_options)
+
+        # Facts accepted by the primary converter are collected until they are published
+        self._accepted_facts: list[str] = []
+        self._primary.fact_listener = self._accepted_facts.append
+
+        # Published knowledge base: a snapshot at base_version followed by the facts of the later versions
+        self._lock = ReadWriteLock()
+        self._base: Optional[KnowledgeBase] = None
+        self._base_version = 0
+        self._facts: list[str] = []
+
+        # Always base_version + len(facts), kept in a single attribute such that readers which are up to date can
+        # check this without acquiring the lock
+        self._published_version = 0
+
+        # Input lines are numbered in the order they arrive, independent of the thread
+        self._line_numbers = itertools.count(1)
+
+        # Converter of the current reader thread and the version of its knowledge base
+        self._reader_state = threading.local()
+
+    @property
+    def version(self) -> int:
+        """
+        :return: The number of facts published so far.
+        """
+
+        return self._published_version
+
+    def process_line(self, input_line: str) -> list[Response]:
+        """
+        Processes a single line of input, can be called from any thread.
+        Information is applied to the shared knowledge base and deferred in case a galactic digit is missing.
+        Requests are answered with the latest published version, a request containing a missing galactic digit is
+        answered with a MISSING_INFORMATION response but not deferred.
+        :param input_line: A single line of input as a string.
+        :return: The responses to the line, for information also the ones to deferred lines that could be resolved.
+        """
+
+        line_number = next(self._line_numbers)
+        if grammar.parse_line(input_line)[0] in _FACT_KINDS:
+            return self._apply(line_number, input_line)
+        else:
+            return self._answer(line_number, input_line)
+
+    def _apply(self, line_number: int, input_line: str) -> list[Response]:
+        """
+        :param line_number: The number of the input line.
+        :param input_line: An input line containing information.
+        :return: The responses of the primary converter.
+        """
+
+        with self._write_mutex:
+            self._primary.line_number = line_number - 1
+            responses = self._primary.process_line(input_line)
+
+            # All facts accepted for the line become visible to the readers at once
+            if self._accepted_facts:
+                with self._lock.write():
+                    self._facts.extend(self._accepted_facts)
+                    self._published_version += len(self._accepted_facts)
+                self._accepted_facts.clear()
+
+                if len(self._facts) >= self.compact_after:
+                    self._compact()
+
+        return responses
+
+    def compact(self) -> None:
+        """
+        Replaces the published facts with a snapshot of the knowledge base.
+        :return: None
+        """
+
+        with self._write_mutex:
+            self._compact()
+
+    def _compact(self) -> None:
+        base = self._primary.snapshot()
+        with self._lock.write():
+            self._base_version += len(self._facts)
+            self._base = base
+            self._facts = []
+
+    def _reader(self) -> GalacticUnitConverter:
+        """
+        :return: The converter of the current thread, holding the latest published version of the knowledge base.
+        """
+
+        state = self._reader_state
+        if not hasattr(state, 'converter'):
+            state.converter = GalacticUnitConverter(interactive=False, **self._converter_options)
+            state.version = 0
+        elif state.version == self._published_version:
+            return state.converter
+
+        with self._lock.read():
+            base = None
+            if state.version < self._base_version:
+                base = self._base
+                new_facts = self._facts[:]
+            else:
+                new_facts = self._facts[state.version - self._base_version:]
+            version = self._base_version + len(self._facts)
+
+        # The facts are replayed outside the lock, the log itself is never changed but only extended or replaced
+        converter = state.converter
+        if base is not None:
+            converter.load_knowledge_base(base)
+        for fact in new_facts:
+            converter.process_line(fact)
+
+        state.version = version
+        return converter
+
+    def _answer(self, line_number: int, input_line: str) -> list[Response]:
+        """
+        :param line_number: The number of the input line.
+        :param input_line: An input line that doesn't change the knowledge base.
+        :return: The responses of the converter of the current thread.
+        """
+
+        converter = self._reader()
+        responses = converter.process_line(input_line)
+
+        # Requests are not deferred, otherwise they would be answered while replaying facts later on
+        if converter.pending_lines:
+            converter.pending_lines.clear()
+
+        return [response._replace(line_number=line_number) for response in responses]
+
+    def snapshot(self) -> KnowledgeBase:
+        """
+        :return: A copy of the latest published version of the knowledge base.
+        """
+
+        return self._reader().snapshot()
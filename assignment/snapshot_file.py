@@ -0,0 +1,302 @@
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Iterable, Union
+
+from assignment.pricing import Price
+from assignment.problem_3 import KnowledgeBase, MaterialFact
+
+# Identifies snapshot files and the version of their format, files of other versions are rejected
+MAGIC = b'GUCSNAP\n'
+FORMAT_VERSION = 3
+
+# Magic, format version, number of sections, checksum of the header and section table, knowledge base version
+_HEADER = struct.Struct('<8sHHIQ')
+
+# Offset, length and checksum of each section
+_SECTION_ENTRY = struct.Struct('<QQI')
+
+# Number of entries and length of the joined strings at the start of a list of strings
+_STRINGS_HEADER = struct.Struct('<II')
+
+# Sections in the order they are stored
+DIGITS_SECTION = 0
+MATERIAL_VALUES_SECTION = 1
+MATERIAL_FACTS_SECTION = 2
+_SECTION_COUNT = 3
+
+# Separates the strings of a list, galactic digits and materials never contain it
+_SEPARATOR = '\0'
+
+
+class SnapshotFormatError(ValueError):
+    """
+    Raised in case a file is not a snapshot, has an unsupported format version or is corrupt.
+    """
+
+
+def _to_little_endian(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, data: Union[bytes, memoryview]) -> list:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tolist()
+
+
+def _pack_strings(strings: Iterable[str]) -> bytes:
+    """
+    :param strings: Strings without the separator.
+    :return: The number of strings and their length, followed by the joined and encoded strings.
+    """
+
+    strings = list(strings)
+    for string in strings:
+        if _SEPARATOR in string:
+            raise ValueError(f'{string!r} can not be stored in a snapshot')
+
+    joined = _SEPARATOR.join(strings).encode('utf-8')
+    return _STRINGS_HEADER.pack(len(strings), len(joined)) + joined
+
+
+def _unpack_strings(data: memoryview, offset: int) -> tuple[list[str], int]:
+    """
+    :param data: The data of a section.
+    :param offset: The position of a list of strings in the section.
+    :return: The strings and the position after them.
+    """
+
+    count, length = _STRINGS_HEADER.unpack_from(data, offset)
+    offset += _STRINGS_HEADER.size
+    strings = str(data[offset:offset + length], 'utf-8').split(_SEPARATOR) if count > 0 else []
+    return strings, offset + length
+
+
+def _encode_sections(knowledge_base: KnowledgeBase) -> list[bytes]:
+    """
+    :param knowledge_base: The knowledge base to store.
+    :return: The data of each section.
+    """
+
+    digits = knowledge_base.galactic_digit_to_roman
+    digits_section = _pack_strings(digits) + _pack_strings(digits.values())
+
+    # Numerators and denominators of prices are stored as decimal strings, since they are not limited in size
+    prices = knowledge_base.material_values.values()
+    material_values_section = b''.join([
+        _pack_strings(knowledge_base.material_values),
+        _pack_strings(str(price.numerator) for price in prices),
+        _pack_strings(str(price.denominator) for price in prices),
+    ])
+
+    # Each distinct amount is stored once as indices of its galactic digits, facts refer to the index of their amount
+    material_facts = knowledge_base.material_facts or {}
+    facts = list(material_facts.values())
+    amount_indices = {}
+    digit_indices = {}
+    for fact in facts:
+        amount_indices.setdefault(fact.amount_galactic, len(amount_indices))
+        for galactic_digit in fact.amount_galactic:
+            digit_indices.setdefault(galactic_digit, len(digit_indices))
+
+    # Credits are stored as decimal strings like the prices, line numbers as 64 bit integers
+    material_facts_section = b''.join([
+        _pack_strings(material_facts),
+        _pack_strings(str(fact.credits) for fact in facts),
+        _to_little_endian(array('q', [fact.line_number for fact in facts])),
+        _to_little_endian(array('I', [amount_indices[fact.amount_galactic] for fact in facts])),
+        _pack_strings(digit_indices),
+        _STRINGS_HEADER.pack(len(amount_indices), sum(map(len, amount_indices))),
+        _to_little_endian(array('I', map(len, amount_indices))),
+        _to_little_endian(array('I', [digit_indices[galactic_digit] for amount in amount_indices
+                                      for galactic_digit in amount])),
+    ])
+
+    return [digits_section, material_values_section, material_facts_section]
+
+
+def save_snapshot(knowledge_base: KnowledgeBase, path: Union[str, os.PathLike]) -> None:
+    """
+    Stores a knowledge base in a file of the snapshot format.
+    The file is replaced atomically, such that a crash never leaves a partially written snapshot behind.
+    :param knowledge_base: The knowledge base to store, e.g. GalacticUnitConverter.snapshot().
+    :param path: The path of the file.
+    :return: None
+    """
+
+    sections = _encode_sections(knowledge_base)
+
+    # The sections follow the header and section table in the order of their indices
+    offset = _HEADER.size + _SECTION_COUNT * _SECTION_ENTRY.size
+    section_table = b''
+    for section in sections:
+        section_table += _SECTION_ENTRY.pack(offset, len(section), zlib.crc32(section))
+        offset += len(section)
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, _SECTION_COUNT, 0, knowledge_base.version)
+    header_checksum = zlib.crc32(header + section_table)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, _SECTION_COUNT, header_checksum, knowledge_base.version)
+
+    temporary_path = f'{os.fspath(path)}.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(header)
+        file.write(section_table)
+        for section in sections:
+            file.write(section)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(temporary_path, path)
+
+
+class SnapshotFile:
+    """
+    A snapshot file mapped into memory. Only the header is read when opening the file, a section is checked against
+    its checksum and decoded whenever it is accessed, such that only the pages of the sections used are read.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        """
+        :param path: The path of the file.
+        :raises SnapshotFormatError: In case the file is not a snapshot of the supported format version.
+        """
+
+        self.path = path
+
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < _HEADER.size:
+                raise SnapshotFormatError(f'{os.fspath(path)} is not a snapshot')
+
+            self._mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._sections = self._read_header(size)
+        except SnapshotFormatError:
+            self.close()
+            raise
+
+    def _read_header(self, size: int) -> list[tuple[int, int, int]]:
+        """
+        :param size: The size of the file.
+        :return: Offset, length and checksum of each section.
+        """
+
+        magic, format_version, section_count, header_checksum, self.version = _HEADER.unpack_from(self._mapped_file)
+        if magic != MAGIC:
+            raise SnapshotFormatError(f'{os.fspath(self.path)} is not a snapshot')
+        if format_version != FORMAT_VERSION:
+            raise SnapshotFormatError(f'Unsupported snapshot format version {format_version}, '
+                                      f'expected {FORMAT_VERSION}')
+
+        table_end = _HEADER.size + section_count * _SECTION_ENTRY.size
+        if section_count != _SECTION_COUNT or table_end > size:
+            raise SnapshotFormatError(f'Corrupt snapshot: {os.fspath(self.path)}')
+
+        # The checksum covers the header with a checksum of 0 and the section table
+        header = _HEADER.pack(magic, format_version, section_count, 0, self.version)
+        if zlib.crc32(self._mapped_file[_HEADER.size:table_end], zlib.crc32(header)) != header_checksum:
+            raise SnapshotFormatError(f'Corrupt snapshot: {os.fspath(self.path)}')
+
+        sections = [_SECTION_ENTRY.unpack_from(self._mapped_file, _HEADER.size + index * _SECTION_ENTRY.size)
+                    for index in range(section_count)]
+        if any(offset + length > size for offset, length, _ in sections):
+            raise SnapshotFormatError(f'Corrupt snapshot: {os.fspath(self.path)}')
+
+        return sections
+
+    def __enter__(self) -> 'SnapshotFile':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mapped_file.close()
+
+    def _section(self, index: int) -> memoryview:
+        """
+        :param index: The index of the section.
+        :return: The data of the section.
+        :raises SnapshotFormatError: In case the data doesn't match the checksum of the section.
+        """
+
+        offset, length, checksum = self._sections[index]
+        data = memoryview(self._mapped_file)[offset:offset + length]
+        if zlib.crc32(data) != checksum:
+            data.release()
+            raise SnapshotFormatError(f'Corrupt snapshot: {os.fspath(self.path)}')
+
+        return data
+
+    def galactic_digit_to_roman(self) -> dict[str, str]:
+        with self._section(DIGITS_SECTION) as data:
+            galactic_digits, offset = _unpack_strings(data, 0)
+            roman_digits, _ = _unpack_strings(data, offset)
+
+        return dict(zip(galactic_digits, roman_digits))
+
+    def material_values(self) -> dict[str, Price]:
+        with self._section(MATERIAL_VALUES_SECTION) as data:
+            materials, offset = _unpack_strings(data, 0)
+            numerators, offset = _unpack_strings(data, offset)
+            denominators, _ = _unpack_strings(data, offset)
+
+        return dict(zip(materials, map(Price, map(int, numerators), map(int, denominators))))
+
+    def material_facts(self) -> dict[str, MaterialFact]:
+        with self._section(MATERIAL_FACTS_SECTION) as data:
+            materials, offset = _unpack_strings(data, 0)
+            count = len(materials)
+            credits, offset = _unpack_strings(data, offset)
+            line_numbers = _from_little_endian('q', data[offset:offset + 8 * count])
+            offset += 8 * count
+            amount_indices = _from_little_endian('I', data[offset:offset + 4 * count])
+            offset += 4 * count
+
+            galactic_digits, offset = _unpack_strings(data, offset)
+            amount_count, digit_count = _STRINGS_HEADER.unpack_from(data, offset)
+            offset += _STRINGS_HEADER.size
+            amount_lengths = _from_little_endian('I', data[offset:offset + 4 * amount_count])
+            offset += 4 * amount_count
+            digit_indices = _from_little_endian('I', data[offset:offset + 4 * digit_count])
+
+        amounts = []
+        start = 0
+        for amount_length in amount_lengths:
+            amounts.append(tuple([galactic_digits[index] for index in digit_indices[start:start + amount_length]]))
+            start += amount_length
+
+        return {material: MaterialFact(amounts[amount_index], fact_credits, line_number)
+                for material, fact_credits, line_number, amount_index
+                in zip(materials, map(int, credits), line_numbers, amount_indices)}
+
+    def knowledge_base(self) -> KnowledgeBase:
+        """
+        :return: The complete knowledge base stored in the file.
+        """
+
+        return KnowledgeBase(self.galactic_digit_to_roman(), self.material_values(), self.version,
+                             self.material_facts())
+
+
+def load_snapshot(path: Union[str, os.PathLike]) -> KnowledgeBase:
+    """
+    Reads and decodes all sections of a snapshot file at once. SnapshotFile reads single sections, and
+    GalacticUnitConverter.load_snapshot only reads the material information once it is needed.
+    :param path: The path of a snapshot file.
+    :return: The knowledge base stored in the file.
+    :raises SnapshotFormatError: In case the file is not a valid snapshot.
+    """
+
+    with SnapshotFile(path) as snapshot_file:
+        return snapshot_file.knowledge_base()
@@ -0,0 +1,347 @@
+import os
+import pickle
+import sqlite3
+import sys
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Iterable, Iterator, NamedTuple, Optional, Union
+
+# Estimated memory of an entry of an OrderedDict apart from its key and value, in bytes
+_ENTRY_OVERHEAD = 100
+
+_MISSING = object()
+
+
+class SpillStats(NamedTuple):
+    # Lookups answered by resident entries
+    hits: int
+
+    # Lookups answered by reloading a spilled entry
+    spill_hits: int
+
+    # Lookups of keys that don't exist
+    misses: int
+
+    evictions: int
+    resident_entries: int
+    resident_bytes: int
+    spilled_entries: int
+
+    @property
+    def spill_hit_rate(self) -> float:
+        """
+        :return: The fraction of the lookups of existing keys that needed to reload a spilled entry.
+        """
+
+        lookups = self.hits + self.spill_hits
+        return self.spill_hits / lookups if lookups > 0 else 0.0
+
+
+def estimate_size(value: Any) -> int:
+    """
+    :param value: A string, number or (named) tuple of these, e.g. a Price or MaterialFact.
+    :return: The estimated memory of the value and the objects it contains, in bytes.
+    """
+
+    size = sys.getsizeof(value)
+    if isinstance(value, tuple):
+        size += sum(estimate_size(item) for item in value)
+
+    return size
+
+
+def _entry_size(key: str, value: Any) -> int:
+    return sys.getsizeof(key) + estimate_size(value) + _ENTRY_OVERHEAD
+
+
+def _create_table(path: Union[str, os.PathLike, None], table: str, columns: str) -> sqlite3.Connection:
+    """
+    :param path: The path of the spill file, created if it doesn't exist. None for a temporary file.
+    :param table: The name of the table, which must not exist yet.
+    :param columns: The definition of the columns and the primary key of the table.
+    :return: A connection to the spill file with the new table.
+    :raises ValueError: In case the table name is invalid or the table already exists in the spill file.
+    """
+
+    if not table.isidentifier():
+        raise ValueError(f'Invalid table name {table}')
+
+    # The spill file is only a cache of this process, so it is neither journaled nor flushed to the disk.
+    # Every statement is committed at once, such that stores sharing the file never wait for each other.
+    connection = sqlite3.connect('' if path is None else path, isolation_level=None)
+    connection.execute('PRAGMA journal_mode = OFF')
+    connection.execute('PRAGMA synchronous = OFF')
+
+    # Existing data is never overwritten, the file might belong to someone else
+    if connection.execute('SELECT 1 FROM sqlite_master WHERE name = ?', (table,)).fetchone() is not None:
+        connection.close()
+        raise ValueError(f'The table {table} already exists in {os.fspath(path)}')
+    connection.execute(f'CREATE TABLE "{table}" ({columns}) WITHOUT ROWID')
+
+    return connection
+
+
+class SpillStore(MutableMapping):
+    """
+    Mapping with string keys that keeps at most max_entries or max_bytes of entries in memory. When a budget is
+    exceeded, the least recently used entries are moved to a table of a SQLite file. Reading a spilled entry with
+    get() or [] moves it back into memory, iterating over the items or copying the store doesn't.
+    Values must be picklable and immutable, since their size is only estimated when they are added or removed.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike, None], table: str, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None):
+        """
+        :param path: The path of the spill file, created if it doesn't exist. Several stores can share a file.
+            None for a temporary file, which SQLite removes once the store is closed.
+        :param table: The name of the table of this store in the spill file, which must not exist yet.
+        :param max_entries: Maximum number of entries in memory, None for no limit.
+        :param max_bytes: Maximum estimated memory of the entries in memory, None for no limit.
+        :raises ValueError: In case the table name is invalid or the table already exists in the spill file.
+        """
+
+        self._connection = _create_table(path, table, 'key TEXT PRIMARY KEY, value BLOB')
+        self._table = table
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # Key -> value, the least recently used entry first. Values are kept as they are, e.g. as named tuples,
+        # which have no instance dictionary, and prices and credits are not limited in size, so they can't be
+        # packed into arrays of fixed width numbers.
+        self._resident: OrderedDict[str, Any] = OrderedDict()
+        self.resident_bytes = 0
+
+        self._select = f'SELECT value FROM "{table}" WHERE key = ?'
+        self._insert = f'INSERT OR REPLACE INTO "{table}" VALUES (?, ?)'
+        self._delete = f'DELETE FROM "{table}" WHERE key = ?'
+        self._select_all = f'SELECT key, value FROM "{table}"'
+        self._delete_all = f'DELETE FROM "{table}"'
+
+        self.spilled_entries = 0
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._resident) + self.spilled_entries
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self._resident)
+        yield from [key for key, _ in self._spilled_items()]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._resident or \
+            self.spilled_entries > 0 and self._connection.execute(self._select, (key,)).fetchone() is not None
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._resident.get(key, _MISSING)
+        if value is not _MISSING:
+            self._resident.move_to_end(key)
+            self.hits += 1
+            return value
+
+        value = self._reload(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+
+        self.spill_hits += 1
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        previous = self._resident.pop(key, _MISSING)
+        if previous is not _MISSING:
+            self.resident_bytes -= _entry_size(key, previous)
+        elif self.spilled_entries > 0 and self._connection.execute(self._delete, (key,)).rowcount > 0:
+            self.spilled_entries -= 1
+
+        self._add_resident(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        previous = self._resident.pop(key, _MISSING)
+        if previous is not _MISSING:
+            self.resident_bytes -= _entry_size(key, previous)
+        elif self.spilled_entries > 0 and self._connection.execute(self._delete, (key,)).rowcount > 0:
+            self.spilled_entries -= 1
+        else:
+            raise KeyError(key)
+
+    def items(self) -> list[tuple[str, Any]]:
+        """
+        :return: All entries, without moving spilled ones back into memory.
+        """
+
+        return list(self._resident.items()) + list(self._spilled_items())
+
+    def copy(self) -> dict[str, Any]:
+        """
+        :return: All entries as dictionary, without moving spilled ones back into memory.
+        """
+
+        return dict(self.items())
+
+    def clear(self) -> None:
+        self._resident.clear()
+        self.resident_bytes = 0
+        self._connection.execute(self._delete_all)
+        self.spilled_entries = 0
+
+    def stats(self) -> SpillStats:
+        return SpillStats(self.hits, self.spill_hits, self.misses, self.evictions, len(self._resident),
+                          self.resident_bytes, self.spilled_entries)
+
+    def set_limits(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """
+        Changes the budgets of the store and spills the least recently used entries exceeding them.
+        :param max_entries: Maximum number of entries in memory, None for no limit.
+        :param max_bytes: Maximum estimated memory of the entries in memory, None for no limit.
+        :return: None
+        """
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def close(self) -> None:
+        """
+        Closes the connection to the spill file, the store must not be used afterwards.
+        :return: None
+        """
+
+        self._connection.close()
+
+    def drop(self) -> None:
+        """
+        Removes the table of the store from the spill file and closes the store.
+        :return: None
+        """
+
+        self._connection.execute(f'DROP TABLE "{self._table}"')
+        self.close()
+
+    def _spilled_items(self) -> Iterator[tuple[str, Any]]:
+        if self.spilled_entries > 0:
+            for key, data in self._connection.execute(self._select_all).fetchall():
+                yield key, pickle.loads(data)
+
+    def _reload(self, key: str) -> Any:
+        """
+        Moves a spilled entry back into memory.
+        :param key: The key.
+        :return: The value or _MISSING in case the key is unknown.
+        """
+
+        if self.spilled_entries == 0:
+            return _MISSING
+
+        row = self._connection.execute(self._select, (key,)).fetchone()
+        if row is None:
+            return _MISSING
+
+        self._connection.execute(self._delete, (key,))
+        self.spilled_entries -= 1
+
+        value = pickle.loads(row[0])
+        self._add_resident(key, value)
+        return value
+
+    def _add_resident(self, key: str, value: Any) -> None:
+        self._resident[key] = value
+        self.resident_bytes += _entry_size(key, value)
+        self._evict()
+
+    def _evict(self) -> None:
+        # The entry just added is never evicted, even if it exceeds the budget on its own
+        while len(self._resident) > 1 and (self.max_entries is not None and len(self._resident) > self.max_entries or
+                                           self.max_bytes is not None and self.resident_bytes > self.max_bytes):
+            evicted_key, evicted_value = self._resident.popitem(last=False)
+            self.resident_bytes -= _entry_size(evicted_key, evicted_value)
+            self._connection.execute(self._insert, (evicted_key, pickle.dumps(evicted_value,
+                                                                               pickle.HIGHEST_PROTOCOL)))
+            self.spilled_entries += 1
+            self.evictions += 1
+
+
+class SpillIndex(Mapping):
+    """
+    Index of sets of strings by string keys, e.g. galactic digit -> materials, which is kept in a table of a SQLite
+    file instead of memory. Reading a key returns a new set of its members, which is not updated by the index.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike, None], table: str):
+        """
+        :param path: The path of the spill file, created if it doesn't exist. Several stores can share a file.
+            None for a temporary file, which SQLite removes once the index is closed.
+        :param table: The name of the table of this index in the spill file, which must not exist yet.
+        :raises ValueError: In case the table name is invalid or the table already exists in the spill file.
+        """
+
+        self._connection = _create_table(path, table, 'key TEXT, member TEXT, PRIMARY KEY (key, member)')
+        self._table = table
+
+        self._select = f'SELECT member FROM "{table}" WHERE key = ?'
+        self._insert = f'INSERT OR IGNORE INTO "{table}" VALUES (?, ?)'
+        self._delete = f'DELETE FROM "{table}" WHERE key = ? AND member = ?'
+        self._select_keys = f'SELECT DISTINCT key FROM "{table}"'
+        self._count_keys = f'SELECT COUNT(DISTINCT key) FROM "{table}"'
+        self._delete_all = f'DELETE FROM "{table}"'
+
+    def __len__(self) -> int:
+        return self._connection.execute(self._count_keys).fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from [key for key, in self._connection.execute(self._select_keys).fetchall()]
+
+    def __getitem__(self, key: str) -> set[str]:
+        members = self.get(key)
+        if not members:
+            raise KeyError(key)
+
+        return members
+
+    def get(self, key: str, default: Any = None) -> Any:
+        members = {member for member, in self._connection.execute(self._select, (key,))}
+        return members if members else default
+
+    def add(self, key: str, member: str) -> None:
+        self._connection.execute(self._insert, (key, member))
+
+    def add_all(self, pairs: Iterable[tuple[str, str]]) -> None:
+        """
+        :param pairs: Keys and members to add, as (key, member).
+        :return: None
+        """
+
+        self._connection.executemany(self._insert, pairs)
+
+    def discard(self, key: str, member: str) -> None:
+        self._connection.execute(self._delete, (key, member))
+
+    def clear(self) -> None:
+        self._connection.execute(self._delete_all)
+
+    def close(self) -> None:
+        """
+        Closes the connection to the spill file, the index must not be used afterwards.
+        :return: None
+        """
+
+        self._connection.close()
+
+    def drop(self) -> None:
+        """
+        Removes the table of the index from the spill file and closes the index.
+        :return: None
+        """
+
+        self._connection.execute(f'DROP TABLE "{self._table}"')
+        self.close()
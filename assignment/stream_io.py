@@ -0,0 +1,109 @@
+import codecs
+import mmap
+import os
+from typing import BinaryIO, Iterator, TextIO, Union
+
+# Amount of bytes read from the input at once
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Amount of characters collected before the output is written
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+def iter_lines(stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = 'utf-8') -> Iterator[str]:
+    """
+    Reads a binary stream in large chunks and splits it into lines.
+    Each chunk is decoded and split at once, instead of reading and decoding the input line by line.
+    :param stream: A binary stream or any object with a read(size) method, e.g. a memory map.
+    :param chunk_size: The number of bytes read at once.
+    :param encoding: The encoding of the input.
+    :return: An iterator over the lines of the input without line terminators.
+    """
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    remainder = ''
+
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+
+        lines = (remainder + decoder.decode(chunk)).split('\n')
+
+        # The last element is an incomplete line which is continued by the next chunk
+        remainder = lines.pop()
+        yield from lines
+
+    remainder += decoder.decode(b'', final=True)
+    if remainder != '':
+        yield remainder
+
+
+def iter_file_lines(path: Union[str, os.PathLike], chunk_size: int = DEFAULT_CHUNK_SIZE, use_mmap: bool = True,
+                    encoding: str = 'utf-8') -> Iterator[str]:
+    """
+    Reads the lines of a file, by default through a memory map such that the file is paged in by the OS.
+    :param path: The path of the file.
+    :param chunk_size: The number of bytes decoded at once.
+    :param use_mmap: Whether the file should be memory mapped instead of read.
+    :param encoding: The encoding of the file.
+    :return: An iterator over the lines of the file without line terminators.
+    """
+
+    with open(path, 'rb') as file:
+        if use_mmap and os.fstat(file.fileno()).st_size > 0:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                yield from iter_lines(mapped_file, chunk_size, encoding)
+        else:
+            yield from iter_lines(file, chunk_size, encoding)
+
+
+class BufferedLineWriter:
+    """
+    Collects output lines and writes them to the underlying stream in large blocks.
+    """
+
+    def __init__(self, stream: TextIO, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        :param stream: The text stream the lines are written to.
+        :param buffer_size: The number of characters after which the collected lines are written.
+        """
+
+        self.stream = stream
+        self.buffer_size = buffer_size
+
+        self._lines: list[str] = []
+        self._buffered_chars = 0
+
+    def write_line(self, line: str) -> None:
+        """
+        Adds a single line of output, like print(line) would.
+        :param line: The line without line terminator.
+        :return: None
+        """
+
+        self._lines.append(line)
+        self._buffered_chars += len(line) + 1
+
+        if self._buffered_chars >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes all collected lines to the stream.
+        :return: None
+        """
+
+        if self._lines:
+            self._lines.append('')
+            self.stream.write('\n'.join(self._lines))
+            self._lines.clear()
+            self._buffered_chars = 0
+
+        self.stream.flush()
+
+    def __enter__(self) -> 'BufferedLineWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.flush()
@@ -0,0 +1,239 @@
+from functools import lru_cache
+from typing import Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+
+from assignment import roman_numerals
+from assignment.pricing import Price
+from assignment.problem_3 import GalacticUnitConverter
+
+# Codes of the roman digits in the digit matrices, followed by the codes for padding and invalid characters
+DIGIT_CODES = {roman_digit: code for code, roman_digit in enumerate(roman_numerals.ROMAN_DIGIT_TO_DEC_VALUE)}
+PADDING_CODE = len(DIGIT_CODES)
+INVALID_CODE = PADDING_CODE + 1
+
+# Padding of the token id matrices of galactic amounts
+PADDING_TOKEN_ID = -1
+
+# Largest integer up to which all integers are exact as float64
+_MAX_EXACT_FLOAT_INTEGER = 2 ** 53
+
+# States of the numeral automaton
+_DEAD_STATE = 0
+_START_STATE = 1
+
+
+@lru_cache(maxsize=None)
+def _numeral_automaton() -> tuple[np.ndarray, np.ndarray]:
+    """
+    Builds a trie of all valid roman numerals, i.e. the keys of the numeral table, as transition table.
+    Walking a numeral through the trie column by column validates and converts whole arrays of numerals at once.
+    :return: The transitions (state, digit code) -> state and the decimal value of each state, -1 for non-numerals.
+    """
+
+    transitions = [[_DEAD_STATE] * (INVALID_CODE + 1), [_DEAD_STATE] * (INVALID_CODE + 1)]
+    values = [-1, -1]
+
+    for roman_numeral, number in roman_numerals.roman_numeral_table().to_decimal.items():
+        state = _START_STATE
+        for roman_digit in roman_numeral:
+            code = DIGIT_CODES[roman_digit]
+            if transitions[state][code] == _DEAD_STATE:
+                transitions[state][code] = len(transitions)
+                transitions.append([_DEAD_STATE] * (INVALID_CODE + 1))
+                values.append(-1)
+            state = transitions[state][code]
+        values[state] = number
+
+    # Padding at the end of a numeral keeps the state
+    for state, state_transitions in enumerate(transitions):
+        state_transitions[PADDING_CODE] = state
+
+    return np.array(transitions, dtype=np.int32), np.array(values, dtype=np.int64)
+
+
+def _convert_digit_codes(digit_codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    :param digit_codes: Matrix with one numeral per row as digit codes, padded at the end.
+    :return: The decimal values as int64 array (0 for invalid numerals) and the validity mask.
+    """
+
+    transitions, state_values = _numeral_automaton()
+
+    states = np.full(digit_codes.shape[0], _START_STATE, dtype=np.int32)
+    for column in digit_codes.T:
+        states = transitions[states, column]
+
+    values = state_values[states]
+    valid = values > 0
+    return np.where(valid, values, 0), valid
+
+
+def roman_to_decimal_array(roman_numeral_strings: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized variant of roman_numerals.roman_to_decimal. Strings containing NUL characters are invalid, except for
+    trailing ones of numpy string arrays, which numpy doesn't distinguish from the padding of the fixed width strings.
+    :param roman_numeral_strings: A sequence or array of roman numerals.
+    :return: The decimal values as int64 array (0 for invalid numerals) and the validity mask.
+    """
+
+    # Numpy drops trailing NUL characters when converting strings, so they are looked for beforehand
+    rows_with_nul = []
+    if not isinstance(roman_numeral_strings, np.ndarray):
+        roman_numeral_strings = list(roman_numeral_strings)
+        if '\0' in ''.join(roman_numeral_strings):
+            rows_with_nul = [row for row, string in enumerate(roman_numeral_strings) if '\0' in string]
+
+    numerals = np.ascontiguousarray(roman_numeral_strings, dtype=np.str_).reshape(-1)
+
+    # Map the unicode code points of the fixed width strings to digit codes, empty positions are padding
+    max_length = max(numerals.dtype.itemsize // 4, 1)
+    code_points = numerals.view(np.uint32).reshape(len(numerals), max_length)
+
+    code_point_to_digit = np.full(128, INVALID_CODE, dtype=np.int32)
+    code_point_to_digit[0] = PADDING_CODE
+    for roman_digit, code in DIGIT_CODES.items():
+        code_point_to_digit[ord(roman_digit)] = code
+
+    digit_codes = code_point_to_digit[np.minimum(code_points, 127)]
+    digit_codes[code_points > 127] = INVALID_CODE
+
+    # Padding is only allowed at the end, a NUL followed by another character makes the numeral invalid
+    padding = code_points == 0
+    digit_codes[rows_with_nul, 0] = INVALID_CODE
+    digit_codes[(padding[:, :-1] & ~padding[:, 1:]).any(axis=1), 0] = INVALID_CODE
+
+    return _convert_digit_codes(digit_codes)
+
+
+def encode_galactic_amounts(amounts: Iterable[Sequence[str]],
+                            vocabulary: Optional[dict[str, int]] = None) -> tuple[np.ndarray, dict[str, int]]:
+    """
+    Converts galactic amounts into a matrix of token ids.
+    :param amounts: The galactic amounts, each as a sequence of galactic digits.
+    :param vocabulary: Galactic digit -> token id, extended by new digits. A new one is created if None.
+    :return: The token ids with one amount per row, padded with PADDING_TOKEN_ID, and the vocabulary.
+    """
+
+    if vocabulary is None:
+        vocabulary = {}
+
+    amounts = [list(amount) for amount in amounts]
+    token_ids = np.full((len(amounts), max(map(len, amounts), default=0)), PADDING_TOKEN_ID, dtype=np.int32)
+
+    for row, amount in enumerate(amounts):
+        token_ids[row, :len(amount)] = [vocabulary.setdefault(galactic_digit, len(vocabulary))
+                                        for galactic_digit in amount]
+
+    return token_ids, vocabulary
+
+
+def galactic_to_decimal_array(converter: GalacticUnitConverter, token_ids: np.ndarray,
+                              vocabulary: Mapping[str, int]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized variant of GalacticUnitConverter.convert_galactic_to_decimal based on the current galactic digits
+    of the converter. Amounts with unknown galactic digits are treated as invalid instead of asking for the digit.
+    :param converter: The converter holding the galactic digits.
+    :param token_ids: Matrix of token ids with one amount per row, see encode_galactic_amounts.
+    :param vocabulary: Galactic digit -> token id.
+    :return: The decimal values as int64 array (0 for invalid amounts) and the validity mask.
+    :raises ValueError: In case the converter is not in the standard numeral mode, whose amounts fit into int64.
+    """
+
+    if converter.numeral_mode is not roman_numerals.NumeralMode.STANDARD:
+        raise ValueError('only amounts of the standard numeral mode can be converted to arrays')
+
+    token_ids = np.asarray(token_ids)
+
+    # Token id -> digit code, the last entry is used for the padding id -1
+    token_to_digit = np.full(len(vocabulary) + 1, INVALID_CODE, dtype=np.int32)
+    token_to_digit[-1] = PADDING_CODE
+    for galactic_digit, token_id in vocabulary.items():
+        roman_digit = converter.galactic_digit_to_roman.get(galactic_digit)
+        if roman_digit is not None:
+            token_to_digit[token_id] = DIGIT_CODES[roman_digit]
+
+    return _convert_digit_codes(token_to_digit[token_ids])
+
+
+def material_price_fractions(converter: GalacticUnitConverter,
+                             materials: Sequence[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    :param converter: The converter holding the material values.
+    :param materials: Names of materials.
+    :return: The numerators and denominators of the value of a single unit of each material as int64 arrays
+        (0/1 for unknown materials) and the mask of known materials.
+    :raises OverflowError: In case a numerator or denominator doesn't fit into int64.
+    """
+
+    prices = [converter.material_values.get(material, Price(0)) for material in materials]
+    numerators = np.array([price.numerator for price in prices], dtype=np.int64)
+    denominators = np.array([price.denominator for price in prices], dtype=np.int64)
+    known = np.array([material in converter.material_values for material in materials], dtype=bool)
+    return numerators, denominators, known
+
+
+def price_amounts(amounts: np.ndarray, material_indices: np.ndarray, numerators: np.ndarray,
+                  denominators: np.ndarray) -> np.ndarray:
+    """
+    Calculates the value of pairs of amounts and materials in Credits, like a "how many Credits is ... ?" request.
+    The exact value is rounded to a float once, like by pricing.format_credits, e.g. 3 units of 1/10 Credits are 0.3
+    instead of 0.30000000000000004.
+    :param amounts: The decimal amounts.
+    :param material_indices: For each amount the index of the material in numerators and denominators.
+    :param numerators: The numerators of the value of a single unit of each material, see material_price_fractions.
+    :param denominators: The denominators of the value of a single unit of each material.
+    :return: The values in Credits as float64 array.
+    :raises OverflowError: In case the product of an amount and a numerator doesn't fit into int64.
+    """
+
+    value_numerators, value_denominators = _multiply_prices(amounts, material_indices, numerators, denominators)
+    values = value_numerators / value_denominators
+
+    # Integers beyond 2 ** 53 are rounded when converted to floats, their quotient is rounded once by Python instead
+    inexact = np.flatnonzero((np.abs(value_numerators) > _MAX_EXACT_FLOAT_INTEGER) |
+                             (value_denominators > _MAX_EXACT_FLOAT_INTEGER))
+    for index in inexact.tolist():
+        values[index] = int(value_numerators[index]) / int(value_denominators[index])
+
+    return values
+
+
+def price_amounts_exact(amounts: np.ndarray, material_indices: np.ndarray, numerators: np.ndarray,
+                        denominators: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Exact variant of price_amounts with integer arithmetic.
+    :param amounts: The decimal amounts.
+    :param material_indices: For each amount the index of the material in numerators and denominators.
+    :param numerators: The numerators of the value of a single unit of each material, see material_price_fractions.
+    :param denominators: The denominators of the value of a single unit of each material.
+    :return: The values in Credits as reduced fractions, given by int64 arrays of numerators and denominators.
+    :raises OverflowError: In case the product of an amount and a numerator doesn't fit into int64.
+    """
+
+    value_numerators, value_denominators = _multiply_prices(amounts, material_indices, numerators, denominators)
+    divisors = np.gcd(value_numerators, value_denominators)
+    divisors[divisors == 0] = 1
+    return value_numerators // divisors, value_denominators // divisors
+
+
+def _multiply_prices(amounts: np.ndarray, material_indices: np.ndarray, numerators: np.ndarray,
+                     denominators: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    :param amounts: The decimal amounts.
+    :param material_indices: For each amount the index of the material in numerators and denominators.
+    :param numerators: The numerators of the value of a single unit of each material.
+    :param denominators: The denominators of the value of a single unit of each material.
+    :return: The numerators and denominators of the values, not reduced.
+    :raises OverflowError: In case the product of an amount and a numerator doesn't fit into int64.
+    """
+
+    material_indices = np.asarray(material_indices)
+    amounts = np.asarray(amounts, dtype=np.int64)
+    price_numerators = np.asarray(numerators)[material_indices]
+
+    # Products of int64 wrap around silently, their magnitude is checked with floats beforehand
+    if len(amounts) and np.max(np.abs(amounts.astype(np.float64) * price_numerators)) >= 2.0 ** 63:
+        raise OverflowError('the value of an amount in Credits does not fit into int64')
+
+    return amounts * price_numerators, np.asarray(denominators)[material_indices]
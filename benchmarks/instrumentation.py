@@ -0,0 +1,75 @@
+import argparse
+import json
+import time
+from typing import NamedTuple, Optional
+
+from assignment.problem_3 import GalacticUnitConverter
+from benchmarks.workload import WorkloadSpec, generate_workload
+
+
+class InstrumentationResult(NamedTuple):
+    # None without instrumentation, otherwise every how many lines the inner stages are timed
+    sample_every: Optional[int]
+    lines: int
+
+    # Fastest of all repetitions
+    ns_per_line: float
+
+    # ns_per_line divided by the one without instrumentation
+    ratio: float
+
+
+def _process(input_lines: list[str], sample_every: Optional[int]) -> float:
+    """
+    :param input_lines: The lines processed by a new converter.
+    :param sample_every: The sampling of the instrumentation, None disables it.
+    :return: The duration in seconds.
+    """
+
+    converter = GalacticUnitConverter(interactive=False)
+    if sample_every is not None:
+        converter.enable_instrumentation(sample_every=sample_every)
+
+    start = time.perf_counter()
+    for _ in converter.process_lines(input_lines):
+        pass
+    return time.perf_counter() - start
+
+
+def measure_instrumentation(input_lines: list[str], samplings: list[Optional[int]],
+                            repetitions: int = 5) -> list[InstrumentationResult]:
+    """
+    Measures the processing of the same lines with each sampling, the runs of the samplings alternate.
+    :param input_lines: The lines processed by each run.
+    :param samplings: The values of sample_every, None for a converter without instrumentation.
+    :param repetitions: Number of runs per sampling, the fastest one is reported.
+    :return: The InstrumentationResult of each sampling.
+    """
+
+    samplings = [None, *(sample_every for sample_every in samplings if sample_every is not None)]
+    best = dict.fromkeys(samplings, float('inf'))
+    for _ in range(repetitions):
+        for sample_every in samplings:
+            best[sample_every] = min(best[sample_every], _process(input_lines, sample_every))
+
+    return [InstrumentationResult(sample_every, len(input_lines), seconds / len(input_lines) * 1e9,
+                                  seconds / best[None]) for sample_every, seconds in best.items()]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Overhead of the instrumentation on the processing of a synthetic '
+                                                 'workload, depending on the sampling of the inner stages.')
+    parser.add_argument('--lines', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--sample-every', type=int, nargs='+', default=[1, 16])
+    parser.add_argument('--repetitions', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    workload = generate_workload(WorkloadSpec(seed=args.seed, lines=args.lines))
+    for result in measure_instrumentation(workload.definitions + workload.lines, args.sample_every,
+                                          args.repetitions):
+        print(json.dumps(result._asdict()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import NamedTuple, Optional
+
+from assignment.journal import Durability, FactJournal
+from assignment.problem_3 import GalacticUnitConverter
+
+# Durability levels as (name, durability, sync_every), None stands for a converter without journal
+DURABILITY_LEVELS = [
+    ('no journal', None, 0),
+    ('write, every record', Durability.WRITE, 1),
+    ('write, groups of 256', Durability.WRITE, 256),
+    ('fsync, every record', Durability.FSYNC, 1),
+    ('fsync, groups of 64', Durability.FSYNC, 64),
+    ('fsync, groups of 1024', Durability.FSYNC, 1024),
+]
+
+
+class IngestResult(NamedTuple):
+    durability: str
+    facts: int
+    seconds: float
+    facts_per_second: float
+
+
+def generate_facts(count: int) -> list[str]:
+    """
+    :param count: Number of facts.
+    :return: Information about galactic digits and materials, mostly the latter.
+    """
+
+    facts = ['glob is I', 'prok is V', 'pish is X', 'tegj is L']
+    amounts = ['glob glob', 'glob prok', 'pish tegj glob glob', 'pish pish', 'tegj']
+    for index in range(count - len(facts)):
+        facts.append(f'{amounts[index % len(amounts)]} Material{index % 1000} is {index + 1} Credits')
+
+    return facts
+
+
+def measure_ingest(facts: list[str], directory: str, name: str, durability: Optional[Durability],
+                   sync_every: int) -> IngestResult:
+    """
+    :param facts: The facts processed by the converter.
+    :param directory: Directory for the journal.
+    :param name: Name of the durability level.
+    :param durability: The durability of the journal, None for no journal.
+    :param sync_every: Maximum number of records per group.
+    :return: The IngestResult.
+    """
+
+    converter = GalacticUnitConverter(interactive=False)
+    journal_path = os.path.join(directory, 'facts.journal')
+    if durability is not None:
+        converter.attach_journal(FactJournal(journal_path, durability, sync_every, sync_interval_ms=10.0))
+
+    start = time.perf_counter()
+    for fact in facts:
+        converter.process_line(fact)
+    if converter.journal is not None:
+        converter.journal.close()
+    seconds = time.perf_counter() - start
+
+    if durability is not None:
+        os.remove(journal_path)
+
+    return IngestResult(name, len(facts), seconds, len(facts) / seconds)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Throughput of processing information at each durability level of '
+                                                 'the fact journal.')
+    parser.add_argument('--facts', type=int, default=20000)
+    parser.add_argument('--directory', help='Directory for the journal, by default a temporary one.')
+    args = parser.parse_args(argv)
+
+    facts = generate_facts(args.facts)
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        for name, durability, sync_every in DURABILITY_LEVELS:
+            print(json.dumps(measure_ingest(facts, directory, name, durability, sync_every)._asdict()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import json
+import time
+from typing import NamedTuple, Optional
+
+from assignment.problem_3 import GalacticUnitConverter
+from assignment.roman_numerals import NumeralMode
+
+
+class LargeNumeralResult(NamedTuple):
+    numeral_mode: str
+
+    # Number of galactic digits of the amount
+    tokens: int
+
+    # Average time of a conversion of the valid amount, of an invalid amount of the same length and of a
+    # "how much is ... ?" request for the valid amount, all without the conversion cache
+    convert_seconds: float
+    reject_seconds: float
+    request_seconds: float
+
+    # convert_seconds per galactic digit, constant for conversions in linear time
+    convert_ns_per_token: float
+
+
+def prepare_converter(numeral_mode: NumeralMode) -> GalacticUnitConverter:
+    """
+    :param numeral_mode: The numeral mode of the converter.
+    :return: A converter with a galactic digit for every roman digit of the mode, e.g. g0 for I and g1 for V.
+    """
+
+    converter = GalacticUnitConverter(interactive=False, numeral_mode=numeral_mode)
+    for index, roman_digit in enumerate(converter.roman_digit_to_dec_value):
+        converter.process_line(f'g{index} is {roman_digit}')
+
+    return converter
+
+
+def _average_seconds(function, repetitions: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        function()
+    return (time.perf_counter() - start) / repetitions
+
+
+def measure_large_numeral(numeral_mode: NumeralMode, tokens: int, repetitions: int = 20) -> LargeNumeralResult:
+    """
+    Measures the conversion of an amount that repeats the largest digit of the mode about as often as given,
+    followed by the largest remainder, e.g. MMM...MCMXCIX.
+    :param numeral_mode: An extended numeral mode.
+    :param tokens: The approximate number of galactic digits of the amount.
+    :param repetitions: Number of conversions of each amount.
+    :return: The LargeNumeralResult.
+    """
+
+    converter = prepare_converter(numeral_mode)
+    largest_value = max(converter.roman_digit_to_dec_value.values())
+    amount = list(converter.convert_decimal_to_galactic(largest_value * (tokens + 1) - 1))
+
+    # Four times I at the end break the repetition rule, which is only noticed after the whole amount was read
+    invalid_amount = amount[:-4] + ['g0'] * 4
+    request = f'how much is {" ".join(amount)} ?'
+
+    def convert(galactic_digits: list[str]):
+        converter.conversion_cache.clear()
+        converter.convert_galactic_to_decimal(galactic_digits)
+
+    def answer_request():
+        converter.conversion_cache.clear()
+        converter.process_line(request)
+
+    convert_seconds = _average_seconds(lambda: convert(amount), repetitions)
+    reject_seconds = _average_seconds(lambda: convert(invalid_amount), repetitions)
+    request_seconds = _average_seconds(answer_request, repetitions)
+
+    return LargeNumeralResult(numeral_mode.value, len(amount), convert_seconds, reject_seconds, request_seconds,
+                              convert_seconds / len(amount) * 1e9)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Conversion time of galactic amounts with many digits in the '
+                                                 'extended numeral modes, which grows linearly with their length.')
+    parser.add_argument('--tokens', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--numeral-modes', nargs='+', default=[NumeralMode.REPEATED_M.value,
+                                                               NumeralMode.VINCULUM.value],
+                        choices=[NumeralMode.REPEATED_M.value, NumeralMode.VINCULUM.value])
+    parser.add_argument('--repetitions', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    for numeral_mode in args.numeral_modes:
+        for tokens in args.tokens:
+            result = measure_large_numeral(NumeralMode(numeral_mode), tokens, args.repetitions)
+            print(json.dumps(result._asdict()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+import argparse
+import csv
+import io
+import json
+import re
+import time
+from typing import Callable, NamedTuple, Optional, Union
+
+from assignment.problem_3 import GalacticUnitConverter
+from assignment.records import OutputFormat
+from benchmarks.workload import WorkloadSpec, generate_workload
+
+# How a downstream consumer extracts the fields of the text output, e.g. of "glob prok Silver is 68 Credits"
+TEXT_PATTERNS = (
+    ('credits', re.compile(r'^(?:(.*) )?(\S+) is ([\d.e+-]+) Credits$')),
+    ('exchange', re.compile(r'^(?:(.*) )?(\S+) is ([\d.e+-]+) (\S+)$')),
+    ('amount', re.compile(r'^(.*) is (\d+)$')),
+    ('unknown_material', re.compile(r'^unknown material: (\S+)$')),
+    ('missing_information', re.compile(r'^missing information / invalid input: How much is (\S+) \?')),
+    ('invalid_input', re.compile(r'^invalid input\. Input ignored\.$|does not seem to be a material')),
+)
+
+
+class OutputFormatResult(NamedTuple):
+    output_format: str
+    responses: int
+
+    # Time of convert_batch from the input stream to the output in the format, the fastest of all repetitions
+    convert_seconds: float
+
+
+class ConsumerResult(NamedTuple):
+    consumer: str
+    output_format: str
+    records: int
+
+    # Whether the consumer gets numbers as int or float, otherwise all fields are strings
+    typed: bool
+
+    # Time to turn the output into fields, the fastest of all repetitions
+    consume_seconds: float
+
+
+def _consume_text(output: str) -> list[tuple]:
+    records = []
+    for line in output.splitlines():
+        for kind, pattern in TEXT_PATTERNS:
+            match = pattern.search(line)
+            if match is not None:
+                records.append((kind, *match.groups()))
+                break
+        else:
+            records.append(('unknown_request',))
+
+    return records
+
+
+def _to_number(text: str) -> Union[int, float]:
+    return int(text) if text.isdigit() else float(text)
+
+
+# Kind of a text response -> indices of the groups of its pattern that are numbers
+_NUMBER_GROUPS = {'credits': (2,), 'exchange': (2,), 'amount': (1,)}
+
+
+def _consume_text_typed(output: str) -> list[tuple]:
+    # Like a consumer of the records, which gets the numbers as int or float
+    records = _consume_text(output)
+    for index, record in enumerate(records):
+        number_groups = _NUMBER_GROUPS.get(record[0])
+        if number_groups is not None:
+            fields = list(record)
+            for group in number_groups:
+                fields[group + 1] = _to_number(fields[group + 1])
+            records[index] = tuple(fields)
+
+    return records
+
+
+def _consume_jsonl(output: str) -> list[dict]:
+    return [json.loads(line) for line in output.splitlines()]
+
+
+def _consume_jsonl_batch(output: str) -> list[dict]:
+    # Line breaks only occur between the objects, since they are escaped within strings, so the whole output can be
+    # decoded as a single array
+    return json.loads('[' + output.rstrip('\n').replace('\n', ',') + ']')
+
+
+def _consume_csv(output: str) -> list[dict]:
+    return list(csv.DictReader(io.StringIO(output)))
+
+
+# Name -> format of the output the consumer reads, whether it gets numbers as int or float and the consumer
+CONSUMERS: dict[str, tuple[OutputFormat, bool, Callable[[str], list]]] = {
+    'text_regex': (OutputFormat.TEXT, False, _consume_text),
+    'text_regex_typed': (OutputFormat.TEXT, True, _consume_text_typed),
+    'jsonl_per_line': (OutputFormat.JSONL, True, _consume_jsonl),
+    'jsonl_batch': (OutputFormat.JSONL, True, _consume_jsonl_batch),
+    'csv_dict_reader': (OutputFormat.CSV, False, _consume_csv),
+}
+
+
+def measure_output_format(stream: bytes, output_format: OutputFormat,
+                          repetitions: int = 5) -> tuple[OutputFormatResult, str]:
+    """
+    :param stream: The input processed by each run, by a new converter.
+    :param output_format: The format of the output.
+    :param repetitions: Number of runs, the fastest one is reported.
+    :return: The OutputFormatResult and the output.
+    """
+
+    convert_seconds = float('inf')
+    output = io.StringIO()
+    for _ in range(repetitions):
+        output = io.StringIO()
+        start = time.perf_counter()
+        GalacticUnitConverter(interactive=False).convert_batch(io.BytesIO(stream), output, output_format=output_format)
+        convert_seconds = min(convert_seconds, time.perf_counter() - start)
+
+    output_text = output.getvalue()
+    responses = output_text.count('\n') - (output_format == OutputFormat.CSV)
+    return OutputFormatResult(output_format.value, responses, convert_seconds), output_text
+
+
+def measure_consumer(consumer: str, output: str, repetitions: int = 5) -> ConsumerResult:
+    """
+    :param consumer: The name of the consumer, see CONSUMERS.
+    :param output: The output in the format the consumer reads.
+    :param repetitions: Number of runs, the fastest one is reported.
+    :return: The ConsumerResult.
+    """
+
+    output_format, typed, consume = CONSUMERS[consumer]
+    consume_seconds = float('inf')
+    records = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        records = consume(output)
+        consume_seconds = min(consume_seconds, time.perf_counter() - start)
+
+    return ConsumerResult(consumer, output_format.value, len(records), typed, consume_seconds)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Compares the output formats on a synthetic workload: the time to '
+                                                 'write the output and the time a consumer needs to read its fields.')
+    parser.add_argument('--lines', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repetitions', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    workload = generate_workload(WorkloadSpec(seed=args.seed, lines=args.lines))
+    stream = '\n'.join(workload.definitions + workload.lines).encode('utf-8') + b'\n'
+
+    outputs = {}
+    for output_format in OutputFormat:
+        result, outputs[output_format] = measure_output_format(stream, output_format, args.repetitions)
+        print(json.dumps(result._asdict()))
+
+    for consumer, (output_format, _, _) in CONSUMERS.items():
+        print(json.dumps(measure_consumer(consumer, outputs[output_format], args.repetitions)._asdict()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import time
+from typing import NamedTuple, Optional
+
+from assignment.parallel import process_lines_parallel
+from assignment.problem_3 import GalacticUnitConverter
+from assignment.roman_numerals import NumeralMode
+from benchmarks.workload import WorkloadSpec, generate_workload
+
+# Beginnings of the requests whose amount follows directly
+_AMOUNT_REQUESTS = ('how much is ', 'how many Credits is ')
+
+
+class ParallelResult(NamedTuple):
+    lines: int
+
+    # Number of galactic digits for M put in front of the amount of every request
+    leading_m: int
+
+    # Number of versions of the knowledge base that requests refer to, i.e. of facts interleaved with requests
+    versions: int
+
+    processors: int
+
+    # Time of the sequential processing, of process_lines_parallel answering the requests in this process, i.e. the
+    # overhead of the two phases, and of process_lines_parallel with the given number of workers on the same input
+    sequential_seconds: float
+    two_phase_seconds: float
+    parallel_seconds: float
+
+
+def prepend_leading_m(input_lines: list[str], leading_m: int) -> list[str]:
+    """
+    Lengthens the amounts of requests, such that answering them takes longer than parsing them.
+    :param input_lines: The definitions of the galactic digits followed by the lines of a workload.
+    :param leading_m: Number of galactic digits for M put in front of the amount of every request.
+    :return: The input lines, whose requests are only valid in NumeralMode.REPEATED_M in case leading_m is positive.
+    """
+
+    if leading_m <= 0:
+        return input_lines
+
+    m_digit = next(input_line.split()[0] for input_line in input_lines if input_line.endswith(' is M'))
+    prefix = f'{m_digit} ' * leading_m
+    lengthened_lines = []
+    for input_line in input_lines:
+        for beginning in _AMOUNT_REQUESTS:
+            if input_line.startswith(beginning):
+                input_line = beginning + prefix + input_line[len(beginning):]
+                break
+        lengthened_lines.append(input_line)
+
+    return lengthened_lines
+
+
+def measure_parallel(spec: WorkloadSpec, max_workers: Optional[int] = 1, chunk_size: int = 2000,
+                     leading_m: int = 0) -> ParallelResult:
+    """
+    :param spec: The workload, whose facts are interleaved with the requests.
+    :param max_workers: Number of worker processes, with 1 the requests are answered in this process.
+    :param chunk_size: Maximum number of requests sent to a worker at once.
+    :param leading_m: Number of galactic digits for M put in front of the amount of every request.
+    :return: The ParallelResult.
+    """
+
+    workload = generate_workload(spec)
+    input_lines = prepend_leading_m(workload.definitions + workload.lines, leading_m)
+    numeral_mode = NumeralMode.REPEATED_M if leading_m > 0 else NumeralMode.STANDARD
+
+    start = time.perf_counter()
+    converter = GalacticUnitConverter(interactive=False, numeral_mode=numeral_mode)
+    sequential_responses = list(converter.process_lines(input_lines))
+    sequential_seconds = time.perf_counter() - start
+    versions = converter.knowledge_base_version
+
+    def measure(workers: int) -> float:
+        start_parallel = time.perf_counter()
+        parallel_responses = list(process_lines_parallel(
+            input_lines, GalacticUnitConverter(interactive=False, numeral_mode=numeral_mode), workers, chunk_size))
+        seconds = time.perf_counter() - start_parallel
+
+        if parallel_responses != sequential_responses:
+            raise AssertionError('The responses differ from the sequential processing')
+        return seconds
+
+    two_phase_seconds = measure(1)
+    parallel_seconds = measure(max_workers) if max_workers != 1 else two_phase_seconds
+
+    return ParallelResult(spec.lines, leading_m, versions, os.cpu_count() or 1, sequential_seconds,
+                          two_phase_seconds, parallel_seconds)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Compares process_lines_parallel with the sequential processing on '
+                                                 'inputs with many versions of the knowledge base.')
+    parser.add_argument('--lines', type=int, nargs='+', default=[5000, 10000, 20000])
+    parser.add_argument('--materials', type=int, default=2000)
+    parser.add_argument('--fact-ratio', type=float, default=0.2)
+    parser.add_argument('--max-workers', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    parser.add_argument('--leading-m', type=int, nargs='+', default=[0],
+                        help='Galactic digits for M put in front of the amount of every request, answering such '
+                             'requests takes longer than parsing them')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    for leading_m in args.leading_m:
+        for lines in args.lines:
+            spec = WorkloadSpec(seed=args.seed, lines=lines, materials=args.materials, fact_ratio=args.fact_ratio)
+            print(json.dumps(measure_parallel(spec, args.max_workers, args.chunk_size, leading_m)._asdict()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Callable, NamedTuple, Optional
+
+from assignment import grammar, roman_numerals
+from assignment.grammar import LineKind, TokenTable
+from assignment.problem_3 import GalacticUnitConverter
+from benchmarks.workload import WorkloadSpec, generate_workload
+
+# Requests of the kinds the workload doesn't generate, mixed into the parsed lines
+OTHER_REQUESTS = ['how many Silver is glob prok Gold ?', 'what is 42 in galactic ?', 'what is this ?', 'stats ?']
+
+# A line of each kind, parsed on its own
+SAMPLE_LINES = {
+    'galactic_numeral_info': 'glob is I',
+    'material_info': 'glob glob Silver is 34 Credits',
+    'amount_request': 'how much is pish tegj glob glob ?',
+    'credits_request': 'how many Credits is glob prok Silver ?',
+    'exchange_request': 'how many Silver is glob prok Gold ?',
+    'galactic_request': 'what is 42 in galactic ?',
+    'unknown_request': 'how much wood could a woodchuck chuck if a woodchuck could chuck wood ?',
+}
+
+
+class ParsingResult(NamedTuple):
+    parser: str
+
+    # 'workload' for the lines of the synthetic workload, otherwise the kind of the sample line, see SAMPLE_LINES
+    input: str
+    lines: int
+
+    # Fastest of all repetitions
+    ns_per_line: float
+
+    # Peak memory allocated while parsing a line, on average. Includes the list of terms, which all parsers create,
+    # and temporary objects, e.g. joined terms.
+    peak_bytes_per_line: float
+
+
+class InterningResult(NamedTuple):
+    interned: bool
+    materials: int
+
+    # Memory of the galactic digits, material values and material information of a converter
+    knowledge_base_bytes: int
+
+
+def split_join_parse_line(input_line: str) -> tuple[LineKind, list[str]]:
+    """
+    Classification of the converter before grammar.parse_line, which joined the first terms of a request again and
+    compared them with each known request, extended by the requests added since then.
+    :param input_line: A single line of input as a string.
+    :return: The kind of the line and the list of terms.
+    """
+
+    parts = input_line.strip().split(' ')
+    if len(parts) < 3:
+        return (LineKind.STATS_REQUEST if parts == grammar.STATS_REQUEST else LineKind.INVALID), parts
+
+    if parts[-1] == '?':
+        if ' '.join(parts[0:3]) == 'how much is':
+            return LineKind.AMOUNT_REQUEST, parts
+        elif ' '.join(parts[0:4]) == 'how many Credits is':
+            return LineKind.CREDITS_REQUEST, parts
+        elif ' '.join(parts[0:2]) == 'how many' and parts[3:4] == ['is'] and parts[2][:1].isupper():
+            return LineKind.EXCHANGE_REQUEST, parts
+        elif ' '.join(parts[0:2]) == 'what is' and ' '.join(parts[-3:]) == 'in galactic ?':
+            return LineKind.GALACTIC_REQUEST, parts
+        return LineKind.UNKNOWN_REQUEST, parts
+    elif parts[-1] == 'Credits':
+        return LineKind.MATERIAL_INFO, parts
+    elif parts[1] == 'is' and (roman_numerals.is_valid_roman_numeral(parts[-1]) or
+                               parts[-1] in roman_numerals.ROMAN_DIGITS):
+        return LineKind.GALACTIC_NUMERAL_INFO, parts
+    return LineKind.INVALID, parts
+
+
+# Name -> parser, all of them classify every line the same way
+PARSERS: dict[str, Callable[[str], tuple[LineKind, list[str]]]] = {
+    'split_join': split_join_parse_line,
+    'prefix_tree': grammar.parse_line,
+}
+
+
+def measure_parsers(name: str, input_lines: list[str], repetitions: int = 15) -> list[ParsingResult]:
+    """
+    Measures all parsers on the same lines. The runs of the parsers alternate, such that both are affected by changes
+    of the load of the machine alike.
+    :param name: The name of the input, see ParsingResult.input.
+    :param input_lines: The lines parsed by each run.
+    :param repetitions: Number of runs of each parser, the fastest one is reported.
+    :return: The ParsingResult of each parser.
+    """
+
+    best = dict.fromkeys(PARSERS, float('inf'))
+    for _ in range(repetitions):
+        for parser, parse_line in PARSERS.items():
+            start = time.perf_counter()
+            for input_line in input_lines:
+                parse_line(input_line)
+            best[parser] = min(best[parser], time.perf_counter() - start)
+
+    results = []
+    for parser, parse_line in PARSERS.items():
+        peak_bytes = 0
+        gc.collect()
+        tracemalloc.start()
+        for input_line in input_lines:
+            tracemalloc.reset_peak()
+            current_bytes = tracemalloc.get_traced_memory()[0]
+            parse_line(input_line)
+            peak_bytes += tracemalloc.get_traced_memory()[1] - current_bytes
+        tracemalloc.stop()
+
+        results.append(ParsingResult(parser, name, len(input_lines), best[parser] / len(input_lines) * 1e9,
+                                     peak_bytes / len(input_lines)))
+
+    return results
+
+
+class _NoInterning(TokenTable):
+    """
+    Token table that returns every token as it is, i.e. the behavior before the tokens were interned.
+    """
+
+    def intern(self, token: str) -> str:
+        return token
+
+
+def measure_interning(interned: bool, spec: WorkloadSpec) -> InterningResult:
+    """
+    :param interned: Whether the converter interns galactic digits and materials.
+    :param spec: The workload whose lines are processed by the converter.
+    :return: The InterningResult.
+    """
+
+    workload = generate_workload(spec)
+
+    gc.collect()
+    tracemalloc.start()
+    converter = GalacticUnitConverter(interactive=False, tokens=None if interned else _NoInterning())
+    for input_line in workload.definitions + workload.lines:
+        converter.process_line(input_line)
+
+    # Everything else the converter holds, e.g. its caches, doesn't depend on the interning
+    converter.conversion_cache.clear()
+    converter.credits_cache.clear()
+    converter.pending_lines.clear()
+    gc.collect()
+    knowledge_base_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return InterningResult(interned, len(converter.material_values), knowledge_base_bytes)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Compares the single pass parser with the split and join based one '
+                                                 'and the memory of a knowledge base with and without interning.')
+    parser.add_argument('--lines', type=int, default=200000)
+    parser.add_argument('--materials', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repetitions', type=int, default=15)
+    args = parser.parse_args(argv)
+
+    spec = WorkloadSpec(seed=args.seed, lines=args.lines, materials=args.materials)
+    workload = generate_workload(spec)
+    input_lines = workload.definitions + workload.lines
+    input_lines += OTHER_REQUESTS * (len(input_lines) // 50)
+
+    if list(map(split_join_parse_line, input_lines)) != list(map(grammar.parse_line, input_lines)):
+        raise AssertionError('The parsers classify the lines differently')
+
+    inputs = {'workload': input_lines, **{kind: [line] * 10000 for kind, line in SAMPLE_LINES.items()}}
+    for name, lines in inputs.items():
+        for result in measure_parsers(name, lines, args.repetitions):
+            print(json.dumps(result._asdict()))
+
+    for interned in [False, True]:
+        print(json.dumps(measure_interning(interned, spec)._asdict()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import json
+import time
+from typing import NamedTuple, Optional
+
+from assignment.problem_3 import GalacticUnitConverter
+
+# Galactic digit redefined by the benchmark and the digits of the amounts of all other materials
+REDEFINED_DIGIT = 'zorg'
+OTHER_DIGITS = {'glob': 'I', 'prok': 'V', 'pish': 'X'}
+
+
+class RepricingResult(NamedTuple):
+    total_facts: int
+    affected_facts: int
+
+    # Average time of a single redefinition of the digit
+    seconds: float
+
+
+def prepare_converter(total_facts: int, affected_facts: int) -> GalacticUnitConverter:
+    """
+    :param total_facts: Number of materials with a known value.
+    :param affected_facts: Number of these materials whose amount contains the redefined digit.
+    :return: A converter holding the materials.
+    """
+
+    converter = GalacticUnitConverter(interactive=False)
+    converter.process_line(f'{REDEFINED_DIGIT} is I')
+    for galactic_digit, roman_digit in OTHER_DIGITS.items():
+        converter.process_line(f'{galactic_digit} is {roman_digit}')
+
+    for index in range(total_facts):
+        amount = f'pish {REDEFINED_DIGIT}' if index < affected_facts else 'pish glob'
+        converter.process_line(f'{amount} Material{index} is {index + 1} Credits')
+
+    return converter
+
+
+def measure_repricing(total_facts: int, affected_facts: int, repetitions: int = 20) -> RepricingResult:
+    """
+    Measures how long redefining a galactic digit takes, including the recalculation of the material values.
+    :param total_facts: Number of materials with a known value.
+    :param affected_facts: Number of these materials whose amount contains the redefined digit.
+    :param repetitions: Number of redefinitions, alternating between two roman digits.
+    :return: The RepricingResult.
+    """
+
+    converter = prepare_converter(total_facts, affected_facts)
+
+    start = time.perf_counter()
+    for repetition in range(repetitions):
+        converter.store_galactic_digit(REDEFINED_DIGIT, 'V' if repetition % 2 == 0 else 'I')
+    seconds = (time.perf_counter() - start) / repetitions
+
+    return RepricingResult(total_facts, affected_facts, seconds)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Cost of redefining a galactic digit depending on the number of '
+                                                 'material values in total and the number of affected ones.')
+    parser.add_argument('--total-facts', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--affected-facts', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repetitions', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    for total_facts in args.total_facts:
+        for affected_facts in args.affected_facts:
+            if affected_facts <= total_facts:
+                result = measure_repricing(total_facts, affected_facts, args.repetitions)
+                print(json.dumps(result._asdict()))
+
+
+if __name__ == '__main__':
+    main()
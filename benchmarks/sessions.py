@@ -0,0 +1,110 @@
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import NamedTuple, Optional
+
+from assignment.problem_3 import GalacticUnitConverter
+from assignment.sessions import SessionManager
+
+# Information all sessions start with
+BASE_LINES = ['glob is I', 'prok is V', 'pish is X', 'tegj is L', 'glob glob Silver is 34 Credits',
+              'glob prok Gold is 57800 Credits', 'pish pish Iron is 3910 Credits']
+
+# Lines of each session, per scenario, {index} is replaced by the number of the session
+SCENARIOS = {
+    'requests only': ['how many Credits is glob prok Silver ?'],
+    'own material': ['pish glob Material{index} is {index} Credits', 'how many Credits is pish Material{index} ?'],
+    'own digit': ['glob is X', 'how many Credits is pish Silver ?'],
+}
+
+
+class SessionMemoryResult(NamedTuple):
+    scenario: str
+    sessions: int
+    seconds: float
+    bytes_per_session: float
+
+
+def measure_sessions(scenario: str, sessions: int, max_active_sessions: int = 256) -> SessionMemoryResult:
+    """
+    Measures the memory allocated for many sessions, after the converters of all sessions were released.
+    The tenant ids are created before the measurement, since they are owned by the caller.
+    :param scenario: The name of the lines processed by each session, see SCENARIOS.
+    :param sessions: The number of sessions.
+    :param max_active_sessions: Maximum number of sessions with a converter of their own at once.
+    :return: The SessionMemoryResult.
+    """
+
+    base = GalacticUnitConverter(interactive=False)
+    for line in BASE_LINES:
+        base.process_line(line)
+
+    manager = SessionManager(base.snapshot(), max_active_sessions)
+    tenants = [f'tenant-{index}' for index in range(sessions)]
+    lines = SCENARIOS[scenario]
+
+    gc.collect()
+    tracemalloc.start()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+
+    for index, tenant in enumerate(tenants):
+        session = manager.session(tenant)
+        for line in lines:
+            session.process_line(line.format(index=index))
+
+    manager.release_all()
+    seconds = time.perf_counter() - start
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0] - start_memory
+    tracemalloc.stop()
+
+    return SessionMemoryResult(scenario, sessions, seconds, memory / sessions)
+
+
+def measure_converters(converters: int) -> SessionMemoryResult:
+    """
+    Measures the memory of independent converters holding the same information, for comparison.
+    :param converters: The number of converters.
+    :return: The SessionMemoryResult.
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+
+    kept = []
+    for _ in range(converters):
+        converter = GalacticUnitConverter(interactive=False)
+        for line in BASE_LINES:
+            converter.process_line(line)
+        kept.append(converter)
+
+    seconds = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0] - start_memory
+    tracemalloc.stop()
+
+    return SessionMemoryResult('converter per tenant', converters, seconds, memory / converters)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Memory per session of a SessionManager, measured with tracemalloc.')
+    parser.add_argument('--sessions', type=int, default=100000)
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument('--max-active-sessions', type=int, default=256)
+    parser.add_argument('--converters', type=int, default=10000,
+                        help='Number of independent converters measured for comparison, 0 to skip')
+    args = parser.parse_args(argv)
+
+    for scenario in args.scenarios:
+        print(json.dumps(measure_sessions(scenario, args.sessions, args.max_active_sessions)._asdict()))
+
+    if args.converters > 0:
+        print(json.dumps(measure_converters(args.converters)._asdict()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+import argparse
+import gc
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import NamedTuple, Optional
+
+from assignment.problem_3 import GalacticUnitConverter
+
+# Galactic digits of the assignment, every material is defined and requested with amounts of these digits
+DEFINITIONS = ['glob is I', 'prok is V', 'pish is X', 'tegj is L']
+AMOUNTS = ['glob', 'glob prok', 'prok', 'pish glob', 'pish pish', 'tegj pish']
+
+
+class SpillResult(NamedTuple):
+    mode: str
+    materials: int
+    requests: int
+    seconds: float
+
+    # Memory allocated by the converter after all lines were processed, measured with tracemalloc
+    resident_bytes: int
+
+    # Fraction of the material lookups that reloaded a spilled material, 0 without limit
+    spill_hit_rate: float
+
+
+def generate_lines(materials: int, requests: int, hot_fraction: float, seed: int) -> tuple[list[str], list[str]]:
+    """
+    :param materials: The number of materials, each defined once.
+    :param requests: The number of credits requests.
+    :param hot_fraction: The fraction of the materials requested most of the time, the others are requested
+        uniformly for the remaining 10 % of the requests.
+    :param seed: Seed of the random generator.
+    :return: The material information and the requests.
+    """
+
+    rng = random.Random(seed)
+    names = [f'Material{index}' for index in range(materials)]
+    facts = [f'{rng.choice(AMOUNTS)} {name} is {rng.randint(1, 100000)} Credits' for name in names]
+
+    hot = names[:max(1, int(materials * hot_fraction))]
+    lines = [f'how many Credits is {rng.choice(AMOUNTS)} {rng.choice(hot if rng.random() < 0.9 else names)} ?'
+             for _ in range(requests)]
+
+    return facts, lines
+
+
+def measure(facts: list[str], requests: list[str], spill_path: Optional[str] = None,
+            max_entries: Optional[int] = None) -> SpillResult:
+    """
+    Processes the information and the requests with a single converter.
+    :param facts: The material information.
+    :param requests: The credits requests.
+    :param spill_path: The spill file of the converter, None for a converter without limit.
+    :param max_entries: Maximum number of materials in memory.
+    :return: The SpillResult.
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+
+    converter = GalacticUnitConverter(interactive=False)
+    for line in DEFINITIONS:
+        converter.process_line(line)
+    if spill_path is not None:
+        converter.limit_material_memory(spill_path, max_entries)
+
+    for line in facts:
+        converter.process_line(line)
+
+    # Only the lookups of the requests are counted
+    if spill_path is not None:
+        converter.material_values.hits = converter.material_values.spill_hits = 0
+
+    for line in requests:
+        converter.process_line(line)
+
+    seconds = time.perf_counter() - start
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0] - start_memory
+    tracemalloc.stop()
+
+    if spill_path is None:
+        return SpillResult('unbounded', len(facts), len(requests), seconds, memory, 0.0)
+
+    spill_hit_rate = converter.material_values.stats().spill_hit_rate
+    converter.material_values.close()
+    converter.material_facts.close()
+    return SpillResult(f'max {max_entries} materials', len(facts), len(requests), seconds, memory, spill_hit_rate)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Memory and spill hit rate of a converter with many materials, '
+                                                 'with and without a limit on the materials in memory.')
+    parser.add_argument('--materials', type=int, default=200000)
+    parser.add_argument('--requests', type=int, default=100000)
+    parser.add_argument('--hot-fraction', type=float, default=0.01,
+                        help='Fraction of the materials receiving 90 %% of the requests')
+    parser.add_argument('--max-entries', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    facts, requests = generate_lines(args.materials, args.requests, args.hot_fraction, args.seed)
+    print(json.dumps(measure(facts, requests)._asdict()))
+
+    with tempfile.TemporaryDirectory() as directory:
+        for max_entries in args.max_entries:
+            spill_path = os.path.join(directory, f'spill-{max_entries}.sqlite')
+            print(json.dumps(measure(facts, requests, spill_path, max_entries)._asdict()))
+
+
+if __name__ == '__main__':
+    main()
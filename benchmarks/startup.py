@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import NamedTuple, Optional
+
+# The input of the assignment, a typical short run
+INPUT_LINES = ['glob is I', 'prok is V', 'pish is X', 'tegj is L', 'glob glob Silver is 34 Credits',
+               'glob prok Gold is 57800 Credits', 'pish pish Iron is 3910 Credits', 'how much is pish tegj glob glob ?',
+               'how many Credits is glob prok Silver ?', 'how many Credits is glob prok Gold ?',
+               'how many Credits is glob prok Iron ?']
+
+# Modules that are only needed for options or features a short run doesn't use, importing them is a regression
+LAZY_MODULES = ('argparse', 'json', 'sqlite3', 'numpy', 'roman', 'asyncio', 'assignment.journal',
+                'assignment.exchange', 'assignment.spill', 'assignment.snapshot_file', 'assignment.vectorized')
+
+# Maximum time to the first answer beyond the start of a bare interpreter that is not reported as regression
+DEFAULT_MAX_OVERHEAD_MS = 30.0
+
+_REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+class StartupResult(NamedTuple):
+    runs: int
+
+    # Time from starting the process to reading the first answer, in milliseconds
+    first_answer_min_ms: float
+    first_answer_median_ms: float
+
+    # Time from starting a bare interpreter to reading its first output line
+    interpreter_median_ms: float
+
+    # first_answer_median_ms - interpreter_median_ms
+    overhead_ms: float
+
+    # Modules of LAZY_MODULES imported by the run
+    eager_imports: list[str]
+
+    # Modules of the package and their import times, the slowest first
+    import_times: list[ImportTime]
+
+
+def _environment() -> dict[str, str]:
+    environment = dict(os.environ)
+
+    # Like in an installed package, the modules are compiled once and then loaded from the bytecode cache
+    environment.pop('PYTHONDONTWRITEBYTECODE', None)
+    environment['PYTHONPATH'] = os.pathsep.join(filter(None, [_REPOSITORY, environment.get('PYTHONPATH')]))
+    return environment
+
+
+def time_to_first_line(command: list[str], environment: dict[str, str]) -> float:
+    """
+    :param command: The command to start.
+    :param environment: The environment of the process.
+    :return: The seconds from starting the process until its first line of output is read.
+    """
+
+    start = time.perf_counter()
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=environment) as process:
+        first_line = process.stdout.readline()
+        seconds = time.perf_counter() - start
+        process.stdout.read()
+
+    if not first_line:
+        raise RuntimeError(f'{" ".join(command)} produced no output')
+
+    return seconds
+
+
+def parse_import_times(output: str) -> list[ImportTime]:
+    """
+    :param output: The standard error of a process started with -X importtime.
+    :return: The import time of every module in the order of the output.
+    """
+
+    import_times = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        import_times.append(ImportTime(module.strip(), int(self_us), int(cumulative_us)))
+
+    return import_times
+
+
+def measure_startup(input_path: str, runs: int = 20, python: str = sys.executable) -> StartupResult:
+    """
+    Starts the console entry point on a short input repeatedly.
+    :param input_path: The input file processed by each run.
+    :param runs: The number of runs of the converter and of the bare interpreter.
+    :param python: The interpreter.
+    :return: The StartupResult.
+    """
+
+    environment = _environment()
+    command = [python, '-m', 'assignment', input_path]
+    interpreter_command = [python, '-c', 'print()']
+
+    # The first run compiles the modules into the bytecode cache
+    time_to_first_line(command, environment)
+
+    first_answer = [time_to_first_line(command, environment) * 1e3 for _ in range(runs)]
+    interpreter = [time_to_first_line(interpreter_command, environment) * 1e3 for _ in range(runs)]
+
+    completed = subprocess.run([python, '-X', 'importtime', *command[1:]], env=environment, capture_output=True,
+                               text=True, check=True)
+    import_times = parse_import_times(completed.stderr)
+    imported = {import_time.module for import_time in import_times}
+
+    first_answer_median = statistics.median(first_answer)
+    interpreter_median = statistics.median(interpreter)
+    return StartupResult(runs, min(first_answer), first_answer_median, interpreter_median,
+                         first_answer_median - interpreter_median,
+                         [module for module in LAZY_MODULES if module in imported],
+                         sorted((import_time for import_time in import_times
+                                 if import_time.module.startswith('assignment')),
+                                key=lambda import_time: import_time.self_us, reverse=True))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Measures the time from starting the console entry point to its first '
+                                                 'answer and the import times of its modules.')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--max-overhead-ms', type=float, default=DEFAULT_MAX_OVERHEAD_MS,
+                        help='Maximum median time to the first answer beyond the start of a bare interpreter')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, 'input.txt')
+        with open(input_path, 'w') as input_file:
+            input_file.write('\n'.join(INPUT_LINES) + '\n')
+
+        result = measure_startup(input_path, args.runs)
+
+    report = result._asdict()
+    report['import_times'] = [import_time._asdict() for import_time in result.import_times]
+    print(json.dumps(report, indent=2))
+
+    regression = False
+    if result.eager_imports:
+        print(f'Regression: imported on startup: {", ".join(result.eager_imports)}', file=sys.stderr)
+        regression = True
+    if result.overhead_ms > args.max_overhead_ms:
+        print(f'Regression: {result.overhead_ms:.1f} ms to the first answer beyond the interpreter start, at most '
+              f'{args.max_overhead_ms:.1f} ms', file=sys.stderr)
+        regression = True
+
+    return 1 if regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
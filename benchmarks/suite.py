@@ -0,0 +1,240 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+from assignment.problem_3 import GalacticUnitConverter
+from benchmarks.workload import Workload, WorkloadSpec, generate_workload
+
+# Maximum relative slowdown against the baseline that is not reported as regression. The calibrated times of runs of
+# the suite on the same machine and code differ by up to about 30 %, the fastest times by up to 70 %.
+DEFAULT_TOLERANCE = 0.4
+
+# Name of the benchmark of a fixed piece of pure Python work, whose time reflects the speed of the machine at the time
+# of the measurement
+CALIBRATION = 'calibration'
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    operations: int
+
+    # Fastest of all rounds
+    seconds: float
+    ns_per_operation: float
+
+    # Median over all rounds of the duration divided by the one of the calibration in the same round, which is much
+    # less affected by other load of the machine than the durations themselves
+    calibrated: float
+
+
+class Regression(NamedTuple):
+    name: str
+    baseline_ns_per_operation: float
+    ns_per_operation: float
+
+    # Calibrated time divided by the one of the baseline, see compare_with_baseline
+    ratio: float
+
+
+def _run_once(run: Callable[[], None], prepare: Optional[Callable[[], None]] = None) -> float:
+    """
+    :param run: Executes the operations.
+    :param prepare: Called before the run, not included in the measured time.
+    :return: The duration of the run in seconds.
+    """
+
+    if prepare is not None:
+        prepare()
+
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def _calibrate() -> None:
+    # Dictionary lookups, string formatting and joining and integer arithmetic like in the processing of lines, but
+    # independent of the code of the converter
+    totals: dict[str, int] = {}
+    for index in range(200000):
+        key = f'key{index % 997}'
+        totals[key] = totals.get(key, 0) + index * 7 % 13
+    ' '.join(totals)
+
+
+def _prepared_converter(workload: Workload) -> GalacticUnitConverter:
+    converter = GalacticUnitConverter(interactive=False)
+    for definition in workload.definitions:
+        converter.process_line(definition)
+
+    return converter
+
+
+def run_benchmarks(workload: Workload, repetitions: int = 9) -> list[BenchmarkResult]:
+    """
+    Measures the validation of roman numerals, the conversion of galactic amounts, the processing of single lines
+    and of a whole stream, as well as the calibration. Converters are non-interactive, lines with missing digits are
+    deferred. The benchmarks are run in rounds, each of which runs every benchmark once, such that a temporary load
+    of the machine affects all of them alike.
+    :param workload: The generated workload.
+    :param repetitions: The number of rounds.
+    :return: The results in the order the benchmarks were run.
+    """
+
+    # Name -> (number of operations, run, prepare)
+    benchmarks: dict[str, tuple[int, Callable[[], None], Optional[Callable[[], None]]]] = {}
+
+    converter = _prepared_converter(workload)
+    roman_numerals = workload.roman_numerals
+
+    def validate() -> None:
+        for roman_numeral in roman_numerals:
+            converter.is_valid_roman_numeral(roman_numeral)
+
+    benchmarks['is_valid_roman_numeral'] = len(roman_numerals), validate, None
+
+    # Every run starts without cached conversions, repeated amounts are answered from the cache
+    galactic_amounts = workload.galactic_amounts
+
+    def convert() -> None:
+        for galactic_amount in galactic_amounts:
+            converter.convert_galactic_to_decimal(galactic_amount)
+
+    benchmarks['convert_galactic_to_decimal'] = len(galactic_amounts), convert, converter.conversion_cache.clear
+
+    # The lines change the knowledge base, so every run starts with a new converter
+    lines = workload.lines
+    converters = []
+
+    def process_input_lines() -> None:
+        line_converter = converters[-1]
+        with contextlib.redirect_stdout(io.StringIO()):
+            for line in lines:
+                line_converter.process_input_line(line)
+
+    benchmarks['process_input_line'] = len(lines), process_input_lines, \
+        lambda: converters.append(_prepared_converter(workload))
+
+    stream = '\n'.join(workload.definitions + lines).encode('utf-8') + b'\n'
+
+    def convert_stream() -> None:
+        GalacticUnitConverter(interactive=False).convert_batch(io.BytesIO(stream), io.StringIO())
+
+    benchmarks['convert_batch'] = len(workload.definitions) + len(lines), convert_stream, None
+    benchmarks[CALIBRATION] = 1, _calibrate, None
+
+    rounds = []
+    for _ in range(repetitions):
+        durations = {name: _run_once(run, prepare) for name, (_, run, prepare) in benchmarks.items()}
+        rounds.append(durations)
+
+    results = []
+    for name, (operations, _, _) in benchmarks.items():
+        seconds = min(durations[name] for durations in rounds)
+        calibrated = statistics.median(durations[name] / durations[CALIBRATION] for durations in rounds)
+        results.append(BenchmarkResult(name, operations, seconds, seconds / max(operations, 1) * 1e9, calibrated))
+
+    return results
+
+
+def report(spec: WorkloadSpec, results: list[BenchmarkResult]) -> dict[str, Any]:
+    """
+    :return: The results and the environment they were measured in as JSON serializable dictionary.
+    """
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'spec': spec._asdict(),
+        'results': {result.name: result._asdict() for result in results},
+    }
+
+
+def compare_with_baseline(current: dict[str, Any], baseline: dict[str, Any],
+                          tolerance: float = DEFAULT_TOLERANCE) -> list[Regression]:
+    """
+    The calibrated times are compared, see BenchmarkResult.calibrated, or the fastest times in case one of the reports
+    has no calibration.
+    :param current: A report of the current results.
+    :param baseline: A report of earlier results for the same workload.
+    :param tolerance: Maximum relative slowdown that is accepted, e.g. 0.4 for 40 %.
+    :return: The benchmarks that are slower than the baseline by more than the tolerance.
+        Benchmarks missing in one of the reports are not compared.
+    :raises ValueError: In case the reports were measured with different workloads.
+    """
+
+    # JSON turns tuples into lists, so the specs are compared after a round trip
+    if json.loads(json.dumps(current['spec'])) != json.loads(json.dumps(baseline['spec'])):
+        raise ValueError('The baseline was measured with a different workload')
+
+    calibrated = CALIBRATION in current['results'] and CALIBRATION in baseline['results']
+
+    regressions = []
+    for name, result in current['results'].items():
+        baseline_result = baseline['results'].get(name)
+        if baseline_result is None or name == CALIBRATION:
+            continue
+
+        if calibrated:
+            ratio = result['calibrated'] / baseline_result['calibrated']
+        else:
+            ratio = result['ns_per_operation'] / baseline_result['ns_per_operation']
+
+        if ratio > 1 + tolerance:
+            regressions.append(Regression(name, baseline_result['ns_per_operation'], result['ns_per_operation'],
+                                          ratio))
+
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    defaults = WorkloadSpec()
+    parser = argparse.ArgumentParser(description='Runs the benchmarks on a seeded synthetic workload and optionally '
+                                                 'compares the results with a stored baseline.')
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+    parser.add_argument('--lines', type=int, default=defaults.lines)
+    parser.add_argument('--galactic-digits', type=int, default=defaults.galactic_digits)
+    parser.add_argument('--materials', type=int, default=defaults.materials)
+    parser.add_argument('--fact-ratio', type=float, default=defaults.fact_ratio)
+    parser.add_argument('--numeral-length-weights', type=float, nargs='+', default=defaults.numeral_length_weights,
+                        help='Relative frequency of the lengths of roman numerals, starting with length 1')
+    parser.add_argument('--invalid-rate', type=float, default=defaults.invalid_rate)
+    parser.add_argument('--missing-digit-rate', type=float, default=defaults.missing_digit_rate)
+    parser.add_argument('--repetitions', type=int, default=9, help='Number of rounds of all benchmarks')
+    parser.add_argument('--output', help='Writes the report to this JSON file')
+    parser.add_argument('--baseline', help='Compares the results with the report in this JSON file')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    spec = WorkloadSpec(args.seed, args.lines, args.galactic_digits, args.materials, args.fact_ratio,
+                        tuple(args.numeral_length_weights), args.invalid_rate, args.missing_digit_rate)
+    current = report(spec, run_benchmarks(generate_workload(spec), args.repetitions))
+    print(json.dumps(current, indent=2))
+
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump(current, file, indent=2)
+            file.write('\n')
+
+    if args.baseline is None:
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+
+    regressions = compare_with_baseline(current, baseline, args.tolerance)
+    for regression in regressions:
+        print(f'Regression in {regression.name}: {regression.ns_per_operation:.0f} ns per operation, baseline '
+              f'{regression.baseline_ns_per_operation:.0f} ns ({regression.ratio:.2f}x)', file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
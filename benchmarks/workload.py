@@ -0,0 +1,148 @@
+import random
+from typing import NamedTuple
+
+from assignment import roman_numerals
+
+# The roman digits in the order the galactic digits are mapped to them, every roman digit needs at least one
+ROMAN_DIGITS = 'IVXLCDM'
+
+# Lines that can't be interpreted, mixed into the workload according to the invalid-input rate
+INVALID_LINES = [
+    'how much wood could a woodchuck chuck if a woodchuck could chuck wood ?',
+    'this is not a valid input',
+    'stats',
+    '{digit} is Y',
+    '{digit} {material} is many Credits',
+]
+
+# Sequences of roman digits that violate the rules, used for invalid numerals
+INVALID_NUMERALS = ['IIII', 'VV', 'VX', 'IL', 'XM', 'DD', 'IIV', 'LC']
+
+_CONSONANTS = 'bdfgklmnprstvz'
+_VOWELS = 'aeiou'
+
+
+class WorkloadSpec(NamedTuple):
+    """
+    Parameters of a synthetic workload, the same parameters always generate the same workload.
+    """
+
+    seed: int = 1
+
+    # Number of lines after the definitions of the galactic digits
+    lines: int = 20000
+
+    # Number of defined galactic digits, at least one per roman digit
+    galactic_digits: int = 14
+
+    # Number of different materials
+    materials: int = 50
+
+    # Fraction of the valid lines that define the value of a material, the others are requests
+    fact_ratio: float = 0.2
+
+    # Relative frequency of the lengths of roman numerals, starting with length 1
+    numeral_length_weights: tuple[float, ...] = (4, 6, 6, 5, 4, 3, 2, 1)
+
+    # Fraction of the lines that can't be interpreted or contain an invalid numeral
+    invalid_rate: float = 0.05
+
+    # Fraction of the amounts that contain a galactic digit which is never defined
+    missing_digit_rate: float = 0.01
+
+
+class Workload(NamedTuple):
+    # Definitions of the galactic digits, processed before the lines
+    definitions: list[str]
+
+    lines: list[str]
+
+    # The roman numerals of all amounts in the lines, including invalid ones
+    roman_numerals: list[str]
+
+    # The amounts of all requests whose galactic digits are defined
+    galactic_amounts: list[tuple[str, ...]]
+
+
+def _unique_names(rng: random.Random, count: int, syllables: int) -> list[str]:
+    names: dict[str, None] = {}
+    while len(names) < count:
+        names[''.join(rng.choice(_CONSONANTS) + rng.choice(_VOWELS) + rng.choice(_CONSONANTS)
+                      for _ in range(syllables))] = None
+
+    return list(names)
+
+
+def generate_workload(spec: WorkloadSpec) -> Workload:
+    """
+    Generates input lines mixing information about materials, requests and invalid inputs.
+    :param spec: The parameters of the workload.
+    :return: The Workload.
+    :raises ValueError: In case there are fewer galactic digits than roman digits or no numeral length has a weight.
+    """
+
+    if spec.galactic_digits < len(ROMAN_DIGITS):
+        raise ValueError(f'At least {len(ROMAN_DIGITS)} galactic digits are needed')
+
+    rng = random.Random(spec.seed)
+
+    # Digit names have one syllable, such that they never collide with the two syllable names of the missing digits
+    galactic_digits = _unique_names(rng, spec.galactic_digits, 1)
+    missing_digits = _unique_names(rng, 5, 2)
+    materials = [name.capitalize() for name in _unique_names(rng, spec.materials, 3)]
+
+    roman_to_galactic: dict[str, list[str]] = {roman_digit: [] for roman_digit in ROMAN_DIGITS}
+    definitions = []
+    for index, galactic_digit in enumerate(galactic_digits):
+        roman_digit = ROMAN_DIGITS[index % len(ROMAN_DIGITS)]
+        roman_to_galactic[roman_digit].append(galactic_digit)
+        definitions.append(f'{galactic_digit} is {roman_digit}')
+
+    # Length -> all valid roman numerals of this length
+    numerals_by_length: dict[int, list[str]] = {}
+    for roman_numeral in roman_numerals.roman_numeral_table().to_roman[1:]:
+        numerals_by_length.setdefault(len(roman_numeral), []).append(roman_numeral)
+
+    lengths = [length for length in range(1, len(spec.numeral_length_weights) + 1) if length in numerals_by_length]
+    weights = [spec.numeral_length_weights[length - 1] for length in lengths]
+    if sum(weights) <= 0:
+        raise ValueError('At least one valid numeral length needs a positive weight')
+
+    workload = Workload(definitions, [], [], [])
+
+    def amount(invalid: bool = False) -> tuple[str, ...]:
+        if invalid:
+            roman_numeral = rng.choice(INVALID_NUMERALS)
+        else:
+            roman_numeral = rng.choice(numerals_by_length[rng.choices(lengths, weights)[0]])
+        workload.roman_numerals.append(roman_numeral)
+
+        galactic_amount = [rng.choice(roman_to_galactic[roman_digit]) for roman_digit in roman_numeral]
+        if rng.random() < spec.missing_digit_rate:
+            galactic_amount[rng.randrange(len(galactic_amount))] = rng.choice(missing_digits)
+
+        return tuple(galactic_amount)
+
+    for _ in range(spec.lines):
+        if rng.random() < spec.invalid_rate:
+            # Half of the invalid inputs are lines that can't be interpreted, the others contain invalid numerals
+            if rng.random() < 0.5:
+                line = rng.choice(INVALID_LINES).format(digit=rng.choice(galactic_digits),
+                                                        material=rng.choice(materials))
+            else:
+                line = f'how much is {" ".join(amount(invalid=True))} ?'
+        elif rng.random() < spec.fact_ratio:
+            line = f'{" ".join(amount())} {rng.choice(materials)} is {rng.randint(1, 100000)} Credits'
+        else:
+            galactic_amount = amount()
+            if all(galactic_digit not in missing_digits for galactic_digit in galactic_amount):
+                workload.galactic_amounts.append(galactic_amount)
+
+            if rng.random() < 0.5:
+                line = f'how much is {" ".join(galactic_amount)} ?'
+            else:
+                line = f'how many Credits is {" ".join(galactic_amount)} {rng.choice(materials)} ?'
+
+        workload.lines.append(line)
+
+    return workload
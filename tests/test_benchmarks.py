@@ -0,0 +1,97 @@
+import pytest
+
+from assignment import grammar
+from assignment.grammar import LineKind
+from assignment.records import OutputFormat
+from benchmarks import output_formats, parallel, parsing, suite
+from benchmarks.workload import WorkloadSpec, generate_workload
+
+
+class TestBenchmarks:
+
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        """
+        Generates a small workload.
+        :return: None
+        """
+
+        self.spec = WorkloadSpec(seed=7, lines=500)
+        self.workload = generate_workload(self.spec)
+
+    def test_workload_is_reproducible(self):
+        assert generate_workload(self.spec) == self.workload
+        assert generate_workload(self.spec._replace(seed=8)).lines != self.workload.lines
+        assert len(self.workload.lines) == 500
+        assert len(self.workload.definitions) == self.spec.galactic_digits
+
+    def test_workload_parameters(self):
+        workload = generate_workload(self.spec._replace(fact_ratio=1.0, invalid_rate=0.0, missing_digit_rate=0.0,
+                                                        numeral_length_weights=(0, 0, 1)))
+        assert {grammar.parse_line(line)[0] for line in workload.lines} == {LineKind.MATERIAL_INFO}
+        assert {len(roman_numeral) for roman_numeral in workload.roman_numerals} == {3}
+
+        workload = generate_workload(self.spec._replace(fact_ratio=0.0, invalid_rate=0.0, missing_digit_rate=0.0))
+        assert len(workload.galactic_amounts) == 500
+
+        with pytest.raises(ValueError):
+            generate_workload(self.spec._replace(galactic_digits=6))
+
+    def test_parallel_with_long_amounts(self):
+        # The requests are only valid with any number of M, the responses are compared with the sequential ones
+        result = parallel.measure_parallel(self.spec, leading_m=20)
+        assert result.leading_m == 20
+        assert result.two_phase_seconds == result.parallel_seconds
+
+        input_lines = parallel.prepend_leading_m(['glob is M', 'how much is glob ?', 'glob Iron is 1 Credits'], 2)
+        assert input_lines == ['glob is M', 'how much is glob glob glob ?', 'glob Iron is 1 Credits']
+
+    def test_parsers_agree(self):
+        # The split and join based reference parser of the parsing benchmark classifies like grammar.parse_line
+        input_lines = self.workload.definitions + self.workload.lines + parsing.OTHER_REQUESTS + \
+            list(parsing.SAMPLE_LINES.values())
+        assert list(map(parsing.split_join_parse_line, input_lines)) == list(map(grammar.parse_line, input_lines))
+
+        [result] = parsing.measure_parsers('workload', input_lines[:50], repetitions=1)[1:]
+        assert result.parser == 'prefix_tree' and result.lines == 50 and result.peak_bytes_per_line > 0
+
+    def test_consumers_agree(self):
+        # Every consumer reads a record per response, and the batch decoding of JSON Lines the same ones as per line
+        stream = '\n'.join(self.workload.definitions + self.workload.lines).encode('utf-8') + b'\n'
+        outputs = {}
+        for output_format in OutputFormat:
+            result, outputs[output_format] = output_formats.measure_output_format(stream, output_format, repetitions=1)
+            assert result.responses == outputs[OutputFormat.TEXT].count('\n')
+
+        consumed = {consumer: consume(outputs[output_format])
+                    for consumer, (output_format, _, consume) in output_formats.CONSUMERS.items()}
+        assert len({len(records) for records in consumed.values()}) == 1
+        assert consumed['jsonl_batch'] == consumed['jsonl_per_line']
+
+    def test_run_and_compare(self):
+        results = suite.run_benchmarks(self.workload, repetitions=1)
+        assert [result.name for result in results] == ['is_valid_roman_numeral', 'convert_galactic_to_decimal',
+                                                       'process_input_line', 'convert_batch', suite.CALIBRATION]
+        assert results[-1].calibrated == 1.0
+
+        baseline = suite.report(self.spec, results)
+        assert suite.compare_with_baseline(baseline, baseline) == []
+
+        # The calibrated times are compared, unaffected by the speed of the machine as a whole
+        slower = suite.report(self.spec, [result._replace(calibrated=result.calibrated * 1.5)
+                                          for result in results[:-1]] + results[-1:])
+        assert [regression.name for regression in suite.compare_with_baseline(slower, baseline, 0.25)] == \
+            [result.name for result in results[:-1]]
+        assert suite.compare_with_baseline(slower, baseline, 0.6) == []
+
+        slower_machine = suite.report(self.spec, [result._replace(ns_per_operation=result.ns_per_operation * 1.5)
+                                                  for result in results])
+        assert suite.compare_with_baseline(slower_machine, baseline, 0.25) == []
+
+        # Reports without calibration are compared by the fastest times
+        uncalibrated = suite.report(self.spec, results[:-1])
+        del slower_machine['results'][suite.CALIBRATION]
+        assert len(suite.compare_with_baseline(slower_machine, uncalibrated, 0.25)) == 4
+
+        with pytest.raises(ValueError):
+            suite.compare_with_baseline(suite.report(self.spec._replace(seed=8), results), baseline)
@@ -0,0 +1,59 @@
+import pytest
+
+from assignment.caching import DependencyLRUCache
+
+
+class TestDependencyLRUCache:
+
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        """
+        Prepares a new, small cache for each test.
+        :return: None
+        """
+
+        self.cache = DependencyLRUCache(max_size=3)
+
+    def test_hits_and_misses(self):
+        assert self.cache.get(('glob',), 'missing') == 'missing'
+        self.cache.put(('glob',), None, dependencies=['glob'])
+
+        # None is a valid value and distinguishable from a miss
+        assert self.cache.get(('glob',), 'missing') is None
+
+        stats = self.cache.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+        assert stats.hit_rate == 0.5
+
+    def test_lru_eviction(self):
+        for key in ['a', 'b', 'c']:
+            self.cache.put(key, key.upper(), dependencies=[key])
+
+        # Using 'a' makes 'b' the least recently used entry
+        assert self.cache.get('a') == 'A'
+        self.cache.put('d', 'D', dependencies=['d'])
+
+        assert 'b' not in self.cache
+        assert 'a' in self.cache and 'd' in self.cache
+        assert self.cache.stats().evictions == 1
+
+        # Evicted entries are also removed from the dependency index
+        assert self.cache.invalidate('b') == 0
+
+    def test_invalidation_by_dependency(self):
+        self.cache.put(('glob', 'prok'), 4, dependencies=['glob', 'prok'])
+        self.cache.put(('pish',), 10, dependencies=['pish'])
+        self.cache.put(('prok',), 5, dependencies=['prok'])
+
+        # Only entries derived from 'glob' are removed
+        assert self.cache.invalidate('glob') == 1
+        assert ('glob', 'prok') not in self.cache
+        assert ('pish',) in self.cache and ('prok',) in self.cache
+        assert self.cache.stats().invalidations == 1
+
+        assert self.cache.invalidate('prok') == 1
+        assert len(self.cache) == 1
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            DependencyLRUCache(max_size=0)
@@ -0,0 +1,92 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from assignment.cli import Options, main, parse_arguments
+from benchmarks.startup import INPUT_LINES, LAZY_MODULES, parse_import_times
+
+
+class TestCli:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path) -> None:
+        """
+        Writes the input of the assignment to a file.
+        :return: None
+        """
+
+        self.input_path = tmp_path / 'input.txt'
+        self.input_path.write_text('\n'.join(INPUT_LINES) + '\n')
+        self.expected_output = ['pish tegj glob glob is 42', 'glob prok Silver is 68 Credits',
+                                'glob prok Gold is 57800 Credits', 'glob prok Iron is 782 Credits']
+
+    def test_parse_arguments(self):
+        assert parse_arguments([]) == Options()
+        assert parse_arguments(['input.txt']) == Options('input.txt')
+        assert parse_arguments(['-']) == Options('-')
+        assert parse_arguments(['-o', 'out.txt', '--price-format', 'fixed', '--non-interactive', 'input.txt']) == \
+            Options('input.txt', 'out.txt', True, 'fixed', 2)
+        assert parse_arguments(['--numeral-mode', 'vinculum', 'input.txt']).numeral_mode == 'vinculum'
+
+        with pytest.raises(SystemExit):
+            parse_arguments(['--price-format', 'roman', 'input.txt'])
+        with pytest.raises(SystemExit):
+            parse_arguments(['-o', 'out.txt'])
+        with pytest.raises(SystemExit):
+            parse_arguments(['--output-format', 'jsonl'])
+
+    def test_batch_mode(self, capsys, tmp_path):
+        assert main([str(self.input_path)]) == 0
+        assert capsys.readouterr().out.splitlines() == self.expected_output
+
+        output_path = tmp_path / 'output.txt'
+        assert main(['--price-format', 'fraction', '-o', str(output_path), str(self.input_path)]) == 0
+        assert output_path.read_text().splitlines() == self.expected_output
+
+    def test_output_format(self, capsys):
+        assert main(['--output-format', 'jsonl', str(self.input_path)]) == 0
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [(record['line_number'], record['material'], record['credits']) for record in records] == \
+            [(8, None, None), (9, 'Silver', 68), (10, 'Gold', 57800), (11, 'Iron', 782)]
+
+        assert main(['--output-format', 'csv', str(self.input_path)]) == 0
+        assert capsys.readouterr().out.splitlines()[:2] == [
+            'line_number,request,galactic_amount,decimal_amount,material,credits,error,target_material,'
+            'target_amount,missing_digit', '8,amount_request,pish tegj glob glob,42,,,,,,']
+
+    def test_numeral_mode(self, capsys, tmp_path):
+        input_path = tmp_path / 'large.txt'
+        input_path.write_text('morg is M\nhow much is morg morg morg morg morg ?\n')
+        assert main(['--numeral-mode', 'repeated-m', str(input_path)]) == 0
+        assert capsys.readouterr().out.splitlines() == ['morg morg morg morg morg is 5000']
+
+    def test_interactive_mode(self, monkeypatch, capsys):
+        user_inputs = iter(['glob is I', 'how much is glob zok ?', 'zok is V', ''])
+        monkeypatch.setattr('builtins.input', lambda: next(user_inputs))
+
+        assert main([]) == 0
+        assert capsys.readouterr().out.splitlines() == ['missing information / invalid input: How much is zok ?',
+                                                        'glob zok is 4']
+
+    def test_lazy_imports(self):
+        # A short run in a new interpreter doesn't import modules needed only for options or other features
+        script = ('import sys; from assignment.cli import main; main(sys.argv[1:]); '
+                  'print(" ".join(sorted(sys.modules)))')
+        repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        completed = subprocess.run([sys.executable, '-c', script, str(self.input_path)], capture_output=True,
+                                   text=True, check=True, cwd=repository)
+
+        output = completed.stdout.splitlines()
+        assert output[:-1] == self.expected_output
+        assert set(LAZY_MODULES).isdisjoint(output[-1].split(' '))
+
+    def test_parse_import_times(self):
+        output = ('import time: self [us] | cumulative | imported package\n'
+                  'import time:       160 |        160 | assignment\n'
+                  'import time:      3069 |       5566 |   assignment.problem_3\n')
+        assert [(import_time.module, import_time.self_us, import_time.cumulative_us)
+                for import_time in parse_import_times(output)] == [('assignment', 160, 160),
+                                                                    ('assignment.problem_3', 3069, 5566)]
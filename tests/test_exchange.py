@@ -0,0 +1,60 @@
+import pytest
+
+from assignment.exchange import ExchangeRates, exchange_rate
+from assignment.pricing import Price
+
+
+class TestExchangeRates:
+
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        """
+        Creates a matrix of the materials of the assignment.
+        :return: None
+        """
+
+        self.material_values = {'Silver': Price(17), 'Gold': Price(14450), 'Iron': Price(391, 2)}
+        self.rates = ExchangeRates(self.material_values)
+
+    def assert_matches_rebuilt_matrix(self):
+        rebuilt = ExchangeRates(self.material_values)
+        for source in self.material_values:
+            assert self.rates.row(source) == rebuilt.row(source)
+            assert self.rates.column(source) == rebuilt.column(source)
+
+    def test_rates(self):
+        assert len(self.rates) == 3
+        assert self.rates.rate('Gold', 'Silver') == Price(850)
+        assert self.rates.rate('Silver', 'Iron') == Price(2, 23)
+        assert self.rates.row('Iron') == {'Silver': Price(23, 2), 'Gold': Price(23, 1700), 'Iron': Price(1)}
+        assert self.rates.column('Silver') == {'Silver': Price(1), 'Gold': Price(850), 'Iron': Price(23, 2)}
+        with pytest.raises(KeyError):
+            self.rates.rate('Gold', 'Copper')
+
+    def test_incremental_updates(self):
+        for material, price in [('Copper', Price(3)), ('Gold', Price(100)), ('Dust', Price(0))]:
+            self.material_values[material] = price
+            self.rates.set_price(material, price)
+            self.assert_matches_rebuilt_matrix()
+
+        # Nothing can be exchanged for a worthless material, while it is worth nothing in every other material
+        assert self.rates.rate('Gold', 'Dust') is None
+        assert self.rates.column('Dust') == {}
+        assert self.rates.row('Dust')['Gold'] == Price(0)
+
+        # The slot of a removed material is reused by the next new one
+        del self.material_values['Silver']
+        self.rates.set_price('Silver', None)
+        self.rates.set_price('Unknown', None)
+        self.assert_matches_rebuilt_matrix()
+        assert 'Silver' not in self.rates.row('Gold')
+
+        self.material_values['Platinum'] = Price(5)
+        self.rates.set_price('Platinum', Price(5))
+        self.assert_matches_rebuilt_matrix()
+        assert len(self.rates.materials) == 5
+
+    def test_exchange_rate(self):
+        assert exchange_rate(Price(-3, 2), Price(3, 4)) == Price(-2)
+        assert exchange_rate(Price(3, 2), Price(-3, 4)) == Price(-2)
+        assert exchange_rate(Price(1), Price(0)) is None
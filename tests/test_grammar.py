@@ -0,0 +1,59 @@
+import pytest
+
+from assignment import grammar
+from assignment.grammar import LineKind, TokenTable
+from assignment.problem_3 import GalacticUnitConverter
+
+
+class TestGrammar:
+
+    @pytest.mark.parametrize('input_line, line_kind', [
+        ('pish is X', LineKind.GALACTIC_NUMERAL_INFO),
+        ('glob glob Silver is 34 Credits', LineKind.MATERIAL_INFO),
+        ('how much is pish tegj glob glob ?', LineKind.AMOUNT_REQUEST),
+        ('how many Credits is glob prok Silver ?', LineKind.CREDITS_REQUEST),
+        ('how many Credits is ?', LineKind.CREDITS_REQUEST),
+        ('how much wood could a woodchuck chuck if a woodchuck could chuck wood ?', LineKind.UNKNOWN_REQUEST),
+        ('how many ?', LineKind.UNKNOWN_REQUEST),
+        ('what is this ?', LineKind.UNKNOWN_REQUEST),
+        ('how much ?', LineKind.UNKNOWN_REQUEST),
+        ('what ?', LineKind.INVALID),
+        ('pish is Y', LineKind.INVALID),
+        ('pish is IX', LineKind.GALACTIC_NUMERAL_INFO),
+        ('pish is V\u0305', LineKind.GALACTIC_NUMERAL_INFO),
+        ('', LineKind.INVALID),
+        ('  how much is glob ?  ', LineKind.AMOUNT_REQUEST),
+        ('stats ?', LineKind.STATS_REQUEST),
+        ('what is 42 in galactic ?', LineKind.GALACTIC_REQUEST),
+        ('what is 42 in roman ?', LineKind.UNKNOWN_REQUEST),
+        ('stats', LineKind.INVALID),
+        ('how many Silver is glob prok Gold ?', LineKind.EXCHANGE_REQUEST),
+        ('how many silver is glob prok Gold ?', LineKind.UNKNOWN_REQUEST),
+        ('how many Silver are there ?', LineKind.UNKNOWN_REQUEST),
+    ])
+    def test_parse_line(self, input_line, line_kind):
+        assert grammar.parse_line(input_line)[0] == line_kind
+
+    def test_parse_line_terms(self):
+        assert grammar.parse_line(' how much is glob prok ? ') == (LineKind.AMOUNT_REQUEST,
+                                                                    ['how', 'much', 'is', 'glob', 'prok', '?'])
+
+    def test_token_table(self):
+        tokens = TokenTable()
+
+        # Equal strings built at runtime are mapped to the same instance
+        glob = tokens.intern(''.join(['gl', 'ob']))
+        assert tokens.intern(''.join(['g', 'lob'])) is glob
+        assert tokens.intern('Silver') == 'Silver'
+        assert list(tokens.tokens) == ['glob', 'Silver']
+        assert len(tokens) == 2
+
+    def test_converter_interns_knowledge_base_keys(self):
+        guc = GalacticUnitConverter(interactive=False)
+        guc.process_line('glob is I')
+        guc.process_line('glob glob Silver is 34 Credits')
+
+        glob, silver = guc.tokens.tokens.values()
+        assert [glob, silver] == ['glob', 'Silver']
+        assert next(iter(guc.galactic_digit_to_roman)) is glob
+        assert next(iter(guc.material_values)) is silver
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from assignment.instrumentation import Instrumentation, StageStats
+from assignment.problem_3 import GalacticUnitConverter
+from assignment.responses import ResponseKind
+
+
+class TestInstrumentation:
+
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        """
+        Creates a converter with some information about galactic digits and materials.
+        :return: None
+        """
+
+        self.guc = GalacticUnitConverter(interactive=False)
+        for line in ['glob is I', 'prok is V', 'glob glob Silver is 34 Credits']:
+            self.guc.process_line(line)
+
+    def test_stage_stats(self):
+        stage_stats = StageStats(window_size=2)
+        for seconds in [0.003, 0.001, 0.002]:
+            stage_stats.add(seconds)
+
+        summary = stage_stats.summary()
+        assert summary['count'] == 3
+        assert summary['total_seconds'] == pytest.approx(0.006)
+        assert summary['max_us'] == pytest.approx(3000)
+
+        # Percentiles are calculated from the most recent durations only
+        assert summary['p99_us'] == pytest.approx(2000)
+
+    def test_timed(self):
+        instrumentation = Instrumentation()
+        double = instrumentation.timed('double', lambda x: 2 * x)
+        assert double(21) == 42
+        assert instrumentation.stages['double'].count == 1
+
+        instrumentation.reset()
+        assert instrumentation.stages['double'].count == 0
+
+    def test_stages_and_counters(self):
+        instrumentation = self.guc.enable_instrumentation(sample_every=1)
+        for line in ['how many Credits is glob prok Silver ?', 'how much is glob glob ?', 'pish is Y',
+                     'how many Credits is glob glob glob glob Silver ?', 'what is this ?']:
+            self.guc.process_line(line)
+
+        stages = instrumentation.stages
+        assert stages['line'].count == 5
+        assert stages['parse'].count == 5
+        assert stages['convert'].count == 3
+        assert stages['format'].count == 1
+        assert stages['handle_credits_request'].count == 2
+
+        assert instrumentation.counters['lines']['credits_request'] == 2
+        assert instrumentation.counters['responses'] == {'credits': 1, 'amount': 1, 'invalid_input': 2,
+                                                          'unknown_request': 1}
+        assert instrumentation.counters['invalid_inputs'] == {'invalid': 1, 'credits_request': 1}
+
+    def test_sampling(self):
+        instrumentation = self.guc.enable_instrumentation(sample_every=2)
+        for _ in range(3):
+            self.guc.process_line('how much is glob glob ?')
+            self.guc.process_line('how many Credits is glob prok Silver ?')
+
+        # All stages are timed on every second line only, while every line is counted
+        stages = instrumentation.stages
+        assert stages['line'].count == stages['parse'].count == 3
+        assert stages['handle_amount_request'].count == 3 and stages['handle_credits_request'].count == 0
+        assert stages['convert'].count == 3 and stages['format'].count == 0
+        assert instrumentation.counters['lines'] == {'amount_request': 3, 'credits_request': 3}
+        assert instrumentation.summary()['sample_every'] == 2
+
+        # The timed wrappers are only attributes of the converter while a sampled line is processed
+        assert 'convert_galactic_to_decimal' not in vars(self.guc)
+
+        with pytest.raises(ValueError):
+            self.guc.enable_instrumentation(sample_every=0)
+
+    def test_stats_request(self):
+        assert self.guc.process_line('stats ?')[0].text == 'instrumentation is disabled'
+
+        self.guc.enable_instrumentation()
+        self.guc.process_line('how much is glob prok ?')
+        response = self.guc.process_line('stats ?')[0]
+        assert response.kind == ResponseKind.STATS
+
+        stats = json.loads(response.text)
+        assert stats['stages']['convert']['count'] == 1
+        assert stats['responses']['amount'] == 1
+
+    def test_disable(self):
+        self.guc.enable_instrumentation()
+        self.guc.disable_instrumentation()
+
+        # The methods of the class are used again
+        assert 'convert_galactic_to_decimal' not in vars(self.guc)
+        assert self.guc.instrumentation is None
+        assert self.guc.process_line('how much is glob prok ?')[0].text == 'glob prok is 4'
+
+    def test_dump(self, tmp_path):
+        path = tmp_path / 'stats.json'
+        instrumentation = self.guc.enable_instrumentation()
+        self.guc.process_line('how much is glob ?')
+        instrumentation.dump(path)
+
+        assert json.loads(path.read_text())['lines'] == {'amount_request': 1}
@@ -0,0 +1,128 @@
+import time
+
+import pytest
+
+from assignment.journal import Durability, FactJournal, JournalFormatError
+from assignment.pricing import Price
+from assignment.problem_3 import GalacticUnitConverter
+
+
+class TestFactJournal:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path) -> None:
+        """
+        Prepares the paths of a journal and a snapshot file.
+        :param tmp_path: A temporary directory provided by pytest.
+        :return: None
+        """
+
+        self.journal_path = tmp_path / 'facts.journal'
+        self.snapshot_path = tmp_path / 'knowledge_base.snapshot'
+
+    def restart(self, **journal_options) -> GalacticUnitConverter:
+        guc = GalacticUnitConverter(interactive=False)
+        if self.snapshot_path.exists():
+            guc.load_snapshot(self.snapshot_path)
+        guc.attach_journal(FactJournal(self.journal_path, **journal_options))
+        return guc
+
+    def test_recovery(self):
+        guc = self.restart()
+        for line in ['glob is I', 'zok glob Silver is 12 Credits', 'how much is glob ?', 'prok is V',
+                     'glob prok Gold is 57800 Credits', 'zok is X', 'glob is X', 'invalid input']:
+            guc.process_line(line)
+        guc.journal.close()
+
+        # The deferred material information is recorded once it was accepted
+        assert FactJournal(self.journal_path).recovered_facts == [
+            'glob is I', 'prok is V', 'glob prok Gold is 57800 Credits', 'zok is X', 'zok glob Silver is 12 Credits',
+            'glob is X',
+        ]
+
+        recovered = self.restart()
+        assert recovered.snapshot()[:2] == guc.snapshot()[:2]
+
+        # Recovered information is not recorded again
+        recovered.journal.close()
+        assert len(FactJournal(self.journal_path).recovered_facts) == 6
+
+    def test_fact_listener(self):
+        # The listener receives the same facts as the journal, both can be used at once
+        guc = self.restart()
+        facts = []
+        guc.fact_listener = facts.append
+        for line in ['glob is I', 'glob is I', 'glob Silver is 17 Credits', 'how much is glob ?']:
+            guc.process_line(line)
+        guc.journal.close()
+
+        assert facts == FactJournal(self.journal_path).recovered_facts == ['glob is I', 'glob Silver is 17 Credits']
+
+    def test_incomplete_record(self):
+        guc = self.restart(sync_every=1)
+        guc.process_line('glob is I')
+        guc.process_line('prok is V')
+        guc.journal.close()
+
+        # A crash while writing the last record leaves it incomplete
+        data = self.journal_path.read_bytes()
+        self.journal_path.write_bytes(data[:-2])
+
+        recovered = self.restart(sync_every=1)
+        assert recovered.galactic_digit_to_roman == {'glob': 'I'}
+        recovered.process_line('pish is X')
+        recovered.journal.close()
+        assert FactJournal(self.journal_path).recovered_facts == ['glob is I', 'pish is X']
+
+    @pytest.mark.parametrize('durability', [Durability.WRITE, Durability.FSYNC])
+    def test_group_commit(self, durability):
+        journal = FactJournal(self.journal_path, durability, sync_every=3, sync_interval_ms=60000)
+        journal.append('glob is I')
+        journal.append('prok is V')
+        assert journal.records_written == 0
+        assert FactJournal(self.journal_path).recovered_facts == []
+
+        journal.append('pish is X')
+        assert (journal.records_written, journal.groups_written) == (3, 1)
+        assert len(FactJournal(self.journal_path).recovered_facts) == 3
+
+        # Records of an incomplete group are written by commit()
+        journal.append('tegj is L')
+        journal.commit()
+        assert len(FactJournal(self.journal_path).recovered_facts) == 4
+
+    def test_idle_tail(self):
+        journal = FactJournal(self.journal_path, Durability.WRITE, sync_every=100, sync_interval_ms=20)
+        journal.append('glob is I')
+        journal.append('prok is V')
+
+        # The group is written once it is due, even though no further record is appended
+        deadline = time.monotonic() + 5
+        while journal.records_written < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert FactJournal(self.journal_path).recovered_facts == ['glob is I', 'prok is V']
+        assert journal.groups_written == 1
+
+        journal.append('pish is X')
+        journal.close()
+        assert FactJournal(self.journal_path).recovered_facts == ['glob is I', 'prok is V', 'pish is X']
+        assert not journal._flusher.is_alive()
+
+    def test_compaction(self):
+        guc = self.restart()
+        for line in ['glob is I', 'glob glob Silver is 34 Credits']:
+            guc.process_line(line)
+
+        guc.compact_journal(self.snapshot_path)
+        guc.process_line('glob is X')
+        guc.journal.close()
+        assert FactJournal(self.journal_path).recovered_facts == ['glob is X']
+
+        recovered = self.restart()
+        assert recovered.galactic_digit_to_roman == {'glob': 'X'}
+        assert recovered.material_values == {'Silver': Price(17, 10)}
+
+    def test_invalid_file(self):
+        self.journal_path.write_bytes(b'not a journal')
+        with pytest.raises(JournalFormatError):
+            FactJournal(self.journal_path)
@@ -0,0 +1,134 @@
+import json
+
+import pytest
+
+from assignment import parallel
+from assignment.parallel import is_read_only_request, process_lines_parallel
+from assignment.pricing import PriceFormat
+from assignment.problem_3 import GalacticUnitConverter
+from assignment.roman_numerals import NumeralMode
+from benchmarks.workload import WorkloadSpec, generate_workload
+
+
+class TestParallel:
+
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        """
+        Prepares input with information interleaved with requests, including redefinitions of galactic digits.
+        :return: None
+        """
+
+        with open('../resources/io_test_data.json') as json_file:
+            self.io_test_sets: dict = json.load(json_file)
+
+        requests = ['how much is pish tegj glob glob ?', 'how many Credits is glob prok Silver ?',
+                    'how many Credits is glob prok Iron ?', 'how many Credits is Gold ?', 'what ?']
+        self.interleaved_lines = [
+            'glob is I', 'prok is V', 'pish is X', 'tegj is L',
+            'glob glob Silver is 34 Credits', 'pish pish Iron is 3910 Credits',
+            *requests * 5,
+            'glob is X', 'prok Gold is 100 Credits',
+            *requests * 5,
+            'how much is zok glob ?', 'zok is V',
+            *requests * 5,
+        ]
+
+    @staticmethod
+    def sequential_responses(input_lines: list[str]) -> list:
+        return list(GalacticUnitConverter().process_lines(input_lines, stop_on_empty_line=True))
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_matches_sequential_processing(self, max_workers):
+        expected = self.sequential_responses(self.interleaved_lines)
+        responses = list(process_lines_parallel(self.interleaved_lines, max_workers=max_workers, chunk_size=4))
+        assert responses == expected
+
+        for test_set in self.io_test_sets.values():
+            user_input = test_set['user_input']
+            responses = process_lines_parallel(user_input, max_workers=max_workers, chunk_size=2,
+                                               stop_on_empty_line=True)
+            assert [response.text for response in responses] == test_set['expected_output']
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_many_versions(self, max_workers):
+        # Facts interleaved with requests, every few requests refer to a new version of the knowledge base
+        workload = generate_workload(WorkloadSpec(seed=3, lines=2000, materials=200, fact_ratio=0.3))
+        input_lines = workload.definitions + workload.lines
+        expected = list(GalacticUnitConverter(interactive=False).process_lines(input_lines))
+        responses = process_lines_parallel(input_lines, GalacticUnitConverter(interactive=False),
+                                           max_workers=max_workers, chunk_size=100)
+        assert list(responses) == expected
+
+    def test_worker_replays_facts(self):
+        converter = GalacticUnitConverter(interactive=False)
+        converter.process_line('glob is I')
+        parallel._init_worker(converter.snapshot(), ['prok is V', 'glob prok Silver is 60 Credits', 'glob is X'])
+
+        # The worker moves forward through the facts and starts over from the base for an older version
+        requests = [(7, 'how much is glob prok ?'), (8, 'how many Credits is glob Silver ?')]
+        assert [[response.text for response in answer] for fact_count in [3, 2, 1]
+                for answer in parallel._answer_requests(fact_count, requests)] == [
+            ['glob prok is 15'], ['glob Silver is 40 Credits'],
+            ['glob prok is 4'], ['glob Silver is 15 Credits'],
+            ['glob prok is 4'], ['unknown material: Silver']]
+        assert parallel._answer_requests(1, requests)[0][0].line_number == 7
+
+    def test_numeral_mode_of_workers(self):
+        # The workers convert amounts in the numeral mode of the converter
+        requests = ['how much is morg morg morg morg glob ?', 'how many Credits is morg morg morg morg Silver ?']
+        input_lines = ['glob is I', 'morg is M', 'morg morg morg morg morg Silver is 10000 Credits', *requests * 4]
+        converter = GalacticUnitConverter(numeral_mode=NumeralMode.REPEATED_M)
+        responses = list(process_lines_parallel(input_lines, converter, max_workers=2, chunk_size=2))
+        assert [response.text for response in responses[-2:]] == ['morg morg morg morg glob is 4001',
+                                                                  'morg morg morg morg Silver is 8000 Credits']
+
+    @pytest.mark.parametrize("price_format", list(PriceFormat))
+    @pytest.mark.parametrize("detailed_responses", [False, True])
+    def test_converter_options_of_workers(self, price_format, detailed_responses):
+
+        def create_converter() -> GalacticUnitConverter:
+            converter = GalacticUnitConverter(interactive=False, price_format=price_format, decimal_places=3)
+            converter.detailed_responses = detailed_responses
+            return converter
+
+        # The workers format prices and describe responses like the converter holding the knowledge base
+        input_lines = ['glob is I', 'prok is V', 'glob glob glob Silver is 10 Credits', 'prok Gold is 17 Credits',
+                       *['how many Credits is glob Silver ?', 'how many Silver is prok Gold ?'] * 4]
+        expected = list(create_converter().process_lines(input_lines))
+        responses = list(process_lines_parallel(input_lines, create_converter(), max_workers=2, chunk_size=2))
+        assert responses == expected
+        assert (responses[-1].details is not None) == detailed_responses
+
+    def test_single_processor_is_sequential(self, monkeypatch):
+
+        def classify(converter, input_line):
+            raise AssertionError('The lines are split into two phases')
+
+        # Without further processors the lines are processed sequentially, unless a number of workers is given
+        monkeypatch.setattr(parallel.os, 'cpu_count', lambda: 1)
+        monkeypatch.setattr(parallel, 'is_read_only_request', classify)
+        assert list(process_lines_parallel(self.interleaved_lines)) == self.sequential_responses(self.interleaved_lines)
+        with pytest.raises(AssertionError):
+            list(process_lines_parallel(self.interleaved_lines, max_workers=1))
+
+    def test_answer_to_missing_information_is_not_a_request(self):
+        # The line after the question for the missing digit is treated as answer even though it is a request
+        input_lines = ['glob is I', 'how much is zok ?', 'how much is glob ?', 'zok is V', 'how much is glob ?']
+        responses = list(process_lines_parallel(input_lines, max_workers=1))
+        assert responses == self.sequential_responses(input_lines)
+
+    def test_is_read_only_request(self):
+        converter = GalacticUnitConverter()
+        converter.process_input_line('glob is I')
+
+        assert is_read_only_request(converter, 'how much is glob glob ?')
+        assert is_read_only_request(converter, 'how many Credits is glob Iron ?')
+        assert is_read_only_request(converter, 'how many Credits is Iron ?')
+        assert is_read_only_request(converter, 'what time is it ?')
+        assert is_read_only_request(converter, 'how many Silver is glob Iron ?')
+
+        assert not is_read_only_request(converter, 'how much is zok ?')
+        assert not is_read_only_request(converter, 'how many Silver is zok Iron ?')
+        assert not is_read_only_request(converter, 'glob is X')
+        assert not is_read_only_request(converter, 'glob Iron is 3 Credits')
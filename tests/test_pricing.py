@@ -0,0 +1,65 @@
+from fractions import Fraction
+
+import pytest
+
+from assignment import pricing
+from assignment.pricing import Price, PriceFormat
+from assignment.problem_3 import GalacticUnitConverter
+
+
+class TestPricing:
+
+    def test_price(self):
+        assert Price.of(34, 20) == Price(17, 10)
+        assert Price.of(57800, 4) == Price(14450)
+        assert Price.of(3, -6) == Price(-1, 2)
+        assert Price.of(0, 7) == Price(0)
+        assert float(Price(17, 10)) == 1.7
+
+    @pytest.mark.parametrize('price, amount, price_format, decimal_places, expected', [
+        (Price(17, 10), 20, PriceFormat.FLOAT, 2, (34, '34')),
+        (Price(17, 10), 20, PriceFormat.FRACTION, 2, (34, '34')),
+        (Price(17, 10), 3, PriceFormat.FLOAT, 2, (5.1, '5.1')),
+        (Price(17, 10), 3, PriceFormat.FRACTION, 2, (5.1, '51/10')),
+        (Price(1, 3), 1, PriceFormat.FLOAT, 2, (1 / 3, '0.3333333333333333')),
+        (Price(1, 3), 2, PriceFormat.FIXED, 2, (2 / 3, '0.67')),
+        (Price(1, 8), 1, PriceFormat.FIXED, 2, (0.125, '0.13')),
+        (Price(-1, 8), 1, PriceFormat.FIXED, 2, (-0.125, '-0.13')),
+        (Price(1, 200), 1, PriceFormat.FIXED, 2, (0.005, '0.01')),
+        (Price(5, 2), 1, PriceFormat.FIXED, 0, (2.5, '3')),
+        (Price(2, 3), 3, PriceFormat.FIXED, 2, (2, '2')),
+    ])
+    def test_format_credits(self, price, amount, price_format, decimal_places, expected):
+        assert pricing.format_credits(price, amount, price_format, decimal_places) == expected
+
+    def test_float_format_is_exact(self):
+        # The quotient is rounded once, instead of rounding the price and the product separately
+        price = Price.of(10, 3)
+        assert pricing.format_credits(price, 3 * 999, PriceFormat.FLOAT)[0] == 9990
+        assert pricing.format_credits(price, 7)[0] == float(Fraction(70, 3))
+
+    def test_values_beyond_floats(self):
+        # Only the text of the float format needs a float, it is calculated exactly beyond the range of floats
+        price = Price(10 ** 400 + 1, 3)
+        assert pricing.format_credits(price, 1, PriceFormat.FLOAT) == (None, '3.3333333333333333e+399')
+        assert pricing.format_credits(price, 2, PriceFormat.FRACTION) == (None, f'{2 * 10 ** 400 + 2}/3')
+        assert pricing.format_credits(price, 1, PriceFormat.FIXED, 1) == (None, f'{(10 ** 400 + 1) // 3}.7')
+        assert pricing.format_credits(Price(-3 * 10 ** 400, 7), 1)[1] == '-4.2857142857142857e+399'
+
+        guc = GalacticUnitConverter(interactive=False, price_format=PriceFormat.FIXED)
+        for line in ['glob is I', 'prok is V', f'glob glob glob Silver is {10 ** 400} Credits']:
+            guc.process_line(line)
+        assert guc.process_line('how many Credits is prok Silver ?')[0].text == \
+               f'prok Silver is {5 * 10 ** 400 // 3}.67 Credits'
+
+    def test_converter_price_format(self):
+        guc = GalacticUnitConverter(interactive=False, price_format=PriceFormat.FIXED, decimal_places=3)
+        for line in ['glob is I', 'prok is V', 'glob prok Silver is 3 Credits']:
+            guc.process_line(line)
+
+        assert guc.process_line('how many Credits is glob glob Silver ?')[0].text == 'glob glob Silver is 1.500 Credits'
+        assert guc.process_line('how many Credits is glob Silver ?')[0].value == 0.75
+        assert guc.process_line('how many Credits is prok Silver ?')[0].text == 'prok Silver is 3.750 Credits'
+
+        guc.price_format = PriceFormat.FRACTION
+        assert guc.process_line('how many Credits is glob Silver ?')[0].text == 'glob Silver is 3/4 Credits'
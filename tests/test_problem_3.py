@@ -1,10 +1,13 @@
 import json
-from io import StringIO
+from io import BytesIO, StringIO
 
 import pytest
 import roman
 
+from assignment.pricing import Price, PriceFormat
 from assignment.problem_3 import GalacticUnitConverter
+from assignment.responses import Response, ResponseKind
+from assignment.roman_numerals import VINCULUM, NumeralMode
 
 
 @pytest.fixture(scope="session")
@@ -149,7 +152,7 @@ class TestGalacticUnitConverter:
         # Checks if the information was extracted and stored correctly
         assert self.guc.galactic_digit_to_roman.get('glob') == 'I'
         assert self.guc.galactic_digit_to_roman.get('pish') == 'X'
-        assert self.guc.material_values.get('Silver') == 17
+        assert self.guc.material_values.get('Silver') == Price(17)
 
     def test_requests_process_input_line(self, capsys):
         user_info_input = [
@@ -173,11 +176,198 @@ class TestGalacticUnitConverter:
         self.guc.process_input_line("how many Credits is glob prok Gold ?")
         assert self.get_output_line(capsys) == "glob prok Gold is 57800 Credits"
 
-        # Re-setting values
+        # Re-setting values: The value of Silver is recalculated, since glob glob Silver is still 34 Credits
         self.guc.process_input_line('glob is X')
         self.guc.process_input_line("how many Credits is glob glob Silver ?")
         assert self.guc.galactic_digit_to_roman.get('glob') == 'X'
-        assert self.get_output_line(capsys) == "glob glob Silver is 340 Credits"
+        assert self.get_output_line(capsys) == "glob glob Silver is 34 Credits"
+        self.guc.process_input_line("how many Credits is pish pish Iron ?")
+        assert self.get_output_line(capsys) == "pish pish Iron is 3910 Credits"
+
+    def test_conversion_cache(self):
+        for line in ['glob is I', 'prok is V', 'pish is X']:
+            self.guc.process_input_line(line)
+
+        assert self.guc.convert_galactic_to_decimal(['glob', 'prok']) == 4
+        assert self.guc.convert_galactic_to_decimal(['glob', 'prok']) == 4
+        assert self.guc.convert_galactic_to_decimal(['pish', 'pish']) == 20
+        stats = self.guc.conversion_cache.stats()
+        assert (stats.hits, stats.misses) == (1, 2)
+
+        # Redefining a digit only invalidates the amounts containing it
+        self.guc.process_input_line('glob is X')
+        assert ('glob', 'prok') not in self.guc.conversion_cache
+        assert ('pish', 'pish') in self.guc.conversion_cache
+        assert self.guc.convert_galactic_to_decimal(['glob', 'prok']) == 15
+
+        # Defining a digit with the same value again keeps the cached amounts
+        self.guc.process_input_line('pish is X')
+        assert ('pish', 'pish') in self.guc.conversion_cache
+
+    def test_credits_cache(self):
+        for line in ['glob is I', 'prok is V', 'pish is X', 'glob glob Silver is 34 Credits', 'pish Gold is 50 Credits']:
+            self.guc.process_line(line)
+
+        def ask(request: str) -> str:
+            return self.guc.process_line(request)[0].text
+
+        assert ask('how many Credits is glob prok Silver ?') == 'glob prok Silver is 68 Credits'
+        assert ask('how many Credits is glob prok Silver ?') == 'glob prok Silver is 68 Credits'
+        assert ask('how many Credits is pish Silver ?') == 'pish Silver is 170 Credits'
+        assert ask('how many Credits is prok Gold ?') == 'prok Gold is 25 Credits'
+        assert ask('how many Credits is prok Copper ?') == 'unknown material: Copper'
+        stats = self.guc.credits_cache.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 4, 4)
+
+        # Redefining glob reprices Silver, which also changes the answer without glob
+        self.guc.process_line('glob is X')
+        assert ('prok', 'Gold') not in self.guc.credits_cache
+        assert (('prok',), 'Gold') in self.guc.credits_cache
+        assert ask('how many Credits is pish Silver ?') == 'pish Silver is 17 Credits'
+
+        # New material values replace the cached answers
+        self.guc.process_line('prok Gold is 10 Credits')
+        self.guc.process_line('prok Copper is 5 Credits')
+        assert ask('how many Credits is prok Gold ?') == 'prok Gold is 10 Credits'
+        assert ask('how many Credits is prok Copper ?') == 'prok Copper is 5 Credits'
+
+        # Cached answers are formatted already, so they are removed when the format changes
+        assert ask('how many Credits is prok Silver ?') == 'prok Silver is 8.5 Credits'
+        self.guc.price_format = PriceFormat.FRACTION
+        assert ask('how many Credits is prok Silver ?') == 'prok Silver is 17/2 Credits'
+
+    def test_decimal_to_galactic_conversion(self):
+        for line in ['glob is I', 'prok is V', 'pish is X', 'tegj is L', 'zorg is C', 'dorg is D', 'morg is M',
+                     'gl is I']:
+            self.guc.process_line(line)
+
+        # The shortest of several galactic digits for the same roman digit is used
+        assert self.guc.convert_decimal_to_galactic(42) == ('pish', 'tegj', 'gl', 'gl')
+        assert self.guc.convert_decimal_to_galactic(0) is None
+        assert self.guc.convert_decimal_to_galactic(4000) is None
+
+        numbers = list(range(1, 4000))
+        galactic_numerals = self.guc.convert_decimals_to_galactic(numbers)
+        assert [self.guc.convert_galactic_to_decimal(galactic_numeral) for galactic_numeral in galactic_numerals] == \
+            numbers
+
+        # The choice of galactic digits follows changes of the mapping
+        self.guc.process_line('gl is V')
+        assert self.guc.convert_decimals_to_galactic([6, 3, 6, -1]) == [('gl', 'glob'), ('glob', 'glob', 'glob'),
+                                                                        ('gl', 'glob'), None]
+
+        def ask(request: str) -> str:
+            return self.guc.process_line(request)[0].text
+
+        assert ask('what is 1944 in galactic ?') == '1944 is morg zorg morg pish tegj glob gl'
+        assert ask('what is 68 Credits in galactic ?') == '68 Credits is tegj pish gl glob glob glob Credits'
+        assert ask('what is 5000 in galactic ?') == "5000 can't be written with the known galactic digits"
+        assert ask('what is many in galactic ?') == 'invalid input. Input ignored.'
+
+        # Before Python 3.11, numbers of any length are converted to integers, otherwise longer ones are rejected
+        large_number = '9' * 5000
+        assert ask(f'what is {large_number} in galactic ?') in [
+            'invalid input. Input ignored.', f"{large_number} can't be written with the known galactic digits"]
+        assert ask('what is this ?') == 'I have no idea what you are talking about'
+
+    def test_extended_numeral_modes(self):
+        digits = ['glob is I', 'prok is V', 'pish is X', 'tegj is L', 'zorg is C', 'dorg is D', 'morg is M']
+
+        def ask(converter: GalacticUnitConverter, request: str) -> str:
+            return converter.process_line(request)[0].text
+
+        # Repeated M: amounts of any size, with the same rules for all other digits
+        guc = GalacticUnitConverter(numeral_mode=NumeralMode.REPEATED_M)
+        for line in digits:
+            guc.process_line(line)
+
+        amount = ' '.join(['morg'] * 20000 + ['zorg', 'morg'])
+        assert ask(guc, f'how much is {amount} ?') == f'{amount} is 20000900'
+        assert ask(guc, 'how much is zorg morg morg ?') == 'invalid input. Input ignored.'
+        guc.process_line(f'{amount} Silver is 40001800 Credits')
+        assert ask(guc, 'how many Credits is morg morg morg morg morg Silver ?') == \
+            'morg morg morg morg morg Silver is 10000 Credits'
+        assert ask(guc, 'what is 7001 in galactic ?') == '7001 is morg morg morg morg morg morg morg glob'
+        assert guc.convert_decimals_to_galactic([5000, 0]) == [('morg',) * 5, None]
+
+        # Vinculum: overlined digits for thousands, which can be mapped to galactic digits
+        guc = GalacticUnitConverter(numeral_mode=NumeralMode.VINCULUM)
+        for line in digits + [f'gorg is V{VINCULUM}', f'borg is M{VINCULUM}']:
+            guc.process_line(line)
+
+        assert ask(guc, 'how much is morg gorg ?') == 'morg gorg is 4000'
+        assert ask(guc, 'how much is borg borg borg borg morg ?') == 'borg borg borg borg morg is 4001000'
+        assert ask(guc, 'how much is morg morg morg morg ?') == 'invalid input. Input ignored.'
+        assert ask(guc, 'what is 5001 in galactic ?') == '5001 is gorg glob'
+        assert ask(guc, 'what is 9000 in galactic ?') == "9000 can't be written with the known galactic digits"
+        assert guc.is_valid_roman_numeral(f'X{VINCULUM}MMCMXCIX')
+        assert not guc.is_valid_roman_numeral('')
+
+        # The standard mode doesn't know the overlined digits
+        assert self.guc.process_line(f'gorg is V{VINCULUM}')[0].kind == ResponseKind.INVALID_INPUT
+        assert not self.guc.is_valid_roman_numeral(f'V{VINCULUM}')
+
+    def test_material_repricing(self):
+        for line in ['glob is I', 'prok is V', 'pish is X', 'glob glob Silver is 34 Credits',
+                     'prok Gold is 50 Credits', 'pish glob Iron is 22 Credits']:
+            self.guc.process_input_line(line)
+
+        assert self.guc.material_dependencies == {'glob': {'Silver', 'Iron'}, 'prok': {'Gold'}, 'pish': {'Iron'}}
+
+        # Only the materials depending on the redefined digit are recalculated
+        self.guc.process_input_line('glob is X')
+        assert self.guc.material_values == {'Silver': Price(17, 10), 'Gold': Price(10), 'Iron': Price(11, 10)}
+
+        # An amount which is no longer a valid numeral doesn't define a value, until it is valid again
+        self.guc.process_input_line('glob is V')
+        assert self.guc.material_values == {'Gold': Price(10), 'Iron': Price(22, 15)}
+        self.guc.process_input_line('glob is X')
+        assert self.guc.material_values['Silver'] == Price(17, 10)
+
+        # A newer information about a material replaces the dependencies of the previous one
+        self.guc.process_input_line('pish pish Silver is 30 Credits')
+        assert self.guc.material_dependencies['glob'] == {'Iron'}
+        self.guc.process_input_line('glob is I')
+        assert self.guc.material_values['Silver'] == Price(3, 2)
+
+        # The information is part of a snapshot, such that a copy reprices its materials as well
+        copy = GalacticUnitConverter()
+        copy.load_knowledge_base(self.guc.snapshot())
+        copy.process_input_line('pish is C')
+        assert copy.material_values['Iron'] == Price(22, 101)
+        assert self.guc.material_values['Iron'] == Price(2)
+
+    def test_exchange_requests(self):
+        for line in ['glob is I', 'prok is V', 'pish is X', 'tegj is L', 'glob glob Silver is 34 Credits',
+                     'glob prok Gold is 57800 Credits', 'pish pish Iron is 3910 Credits']:
+            self.guc.process_line(line)
+
+        def ask(request: str) -> Response:
+            return self.guc.process_line(request)[0]
+
+        assert ask('how many Silver is glob prok Gold ?') == \
+            Response(ResponseKind.EXCHANGE, 'glob prok Gold is 3400 Silver', 3400, 8)
+        assert ask('how many Gold is glob prok Silver ?').text == 'glob prok Silver is 0.004705882352941176 Gold'
+        assert ask('how many Iron is Iron ?').text == 'Iron is 1 Iron'
+        assert ask('how many Silver is glob prok Copper ?').text == 'unknown material: Copper'
+        assert ask('how many Copper is glob prok Gold ?').text == 'unknown material: Copper'
+        assert ask('how many Silver is ?').text == 'invalid input. Input ignored.'
+        assert ask('how many Silver is glob glob glob glob Gold ?').text == 'invalid input. Input ignored.'
+
+        # The matrix follows new and repriced materials without being rebuilt
+        rates = self.guc.exchange_rates()
+        self.guc.process_line('pish Copper is 20 Credits')
+        self.guc.process_line('glob is X')
+        assert self.guc.exchange_rates() is rates
+        assert ask('how many Copper is pish Silver ?').text == 'pish Silver is 8.5 Copper'
+        assert rates.row('Copper') == {'Silver': Price(20, 17), 'Gold': Price(3, 5780), 'Iron': Price(4, 391),
+                                       'Copper': Price(1)}
+        assert rates.column('Copper')['Gold'] == Price(5780, 3)
+
+        # A worthless material can't be bought
+        self.guc.process_line('pish Dust is 0 Credits')
+        assert ask('how many Dust is glob Gold ?').kind == ResponseKind.NOT_EXCHANGEABLE
+        assert ask('how many Gold is pish Dust ?').text == 'pish Dust is 0 Gold'
 
     def test_exceptional_inputs_process_input_line(self, capsys):
 
@@ -324,6 +514,36 @@ class TestGalacticUnitConverter:
         assert converter_output[-2] == 'missing information / invalid input: How much is plok ?'
         assert converter_output[-1] == 'rok plok is 60'
 
+    def test_deferred_missing_info(self, monkeypatch, capsys):
+        self.guc = GalacticUnitConverter(interactive=False)
+
+        user_inputs = [
+            'pok is I',
+            'mok pok pok Iron is 24 Credits',
+            'how many Credits is mok Iron ?',
+            'how much is zok pok ?',
+            # Only the inputs waiting for mok are processed
+            'mok is X',
+            # The deferred material info must not overwrite the later one
+            'rok Gold is 10 Credits',
+            'pok pok Gold is 8 Credits',
+            'rok is V',
+            'how many Credits is pok Gold ?',
+        ]
+
+        converter_output = self.dynamic_input_test(monkeypatch, capsys, user_inputs)
+        assert converter_output == [
+            'mok Iron is 20 Credits',
+            'pok Gold is 4 Credits',
+            'missing information / invalid input: How much is zok ? Input ignored: how much is zok pok ?',
+        ]
+        assert self.guc.unresolved_lines() == [(4, 'how much is zok pok ?', 'zok')]
+
+        # Information given later on resolves the remaining input
+        self.guc.process_input_line('zok is V')
+        assert self.get_output_line(capsys) == 'zok pok is 6'
+        assert self.guc.pending_lines == {}
+
     @pytest.mark.parametrize("io_test_set", ['predefined_test_set', 'alternative_test_set',
                                              'missing_info_test_set', 'error_test_set'], indirect=True)
     def test_convert(self, monkeypatch, capsys, io_test_set):
@@ -340,6 +560,80 @@ class TestGalacticUnitConverter:
         for converter_line, expected_line in zip(converter_output, expected_output):
             assert converter_line == expected_line
 
+    def test_process_lines(self, capsys):
+        input_lines = [
+            'glob is I',
+            'pish is X',
+            'pish pish Iron is 3910 Credits',
+            'how much is pish glob ?',
+            'how many Credits is glob Iron ?',
+            'how many Credits is glob Gold ?',
+            'how many Credits is pok Iron ?',
+            'pok is V',
+            'what ?',
+        ]
+
+        responses = list(self.guc.process_lines(input_lines))
+        assert responses == [
+            Response(ResponseKind.AMOUNT, 'pish glob is 11', 11, 4),
+            Response(ResponseKind.CREDITS, 'glob Iron is 195.5 Credits', 195.5, 5),
+            Response(ResponseKind.UNKNOWN_MATERIAL, 'unknown material: Gold', None, 6),
+            # The missing digit is read from the following line
+            Response(ResponseKind.MISSING_INFORMATION, 'missing information / invalid input: How much is pok ?', None, 7),
+            Response(ResponseKind.CREDITS, 'pok Iron is 977.5 Credits', 977.5, 7),
+            Response(ResponseKind.INVALID_INPUT, 'invalid input. Input ignored.', None, 9),
+        ]
+
+        # Nothing is written to the standard output
+        assert capsys.readouterr() == ('', '')
+
+    def test_process_line(self):
+        assert self.guc.process_line('glob is I') == []
+
+        # Missing digits are never asked for, the line is deferred instead
+        assert self.guc.process_line('how much is zok glob ?') == [
+            Response(ResponseKind.MISSING_INFORMATION, 'missing information / invalid input: How much is zok ?', None, 2)
+        ]
+        assert self.guc.process_line('zok is V') == [Response(ResponseKind.AMOUNT, 'zok glob is 6', 6, 2)]
+
+    def test_process_lines_is_lazy(self):
+        read_lines = []
+
+        def input_lines():
+            for line in ['glob is I', 'how much is glob ?', 'how much is glob glob ?']:
+                read_lines.append(line)
+                yield line
+
+        responses = self.guc.process_lines(input_lines())
+        assert read_lines == []
+
+        # Lines are only read until the next response is available
+        assert next(responses).text == 'glob is 1'
+        assert len(read_lines) == 2
+        assert [response.text for response in responses] == ['glob glob is 2']
+
+    @pytest.mark.parametrize("use_mmap", [True, False])
+    @pytest.mark.parametrize("io_test_set", ['predefined_test_set', 'alternative_test_set',
+                                             'missing_info_test_set', 'error_test_set'], indirect=True)
+    def test_convert_batch(self, monkeypatch, capsys, tmp_path, io_test_set, use_mmap):
+
+        # noinspection PyTypeChecker
+        user_input = io_test_set['user_input']
+
+        # Output of the interactive variant as a single string
+        interactive_output = '\n'.join(self.dynamic_input_test(monkeypatch, capsys, user_input) + [''])
+
+        path = tmp_path / 'input.txt'
+        path.write_text('\n'.join(user_input) + '\n')
+        output = StringIO()
+        GalacticUnitConverter().convert_batch(path, output, chunk_size=16, use_mmap=use_mmap, buffer_size=64)
+        assert output.getvalue() == interactive_output
+
+        # Reading from a stream
+        output = StringIO()
+        GalacticUnitConverter().convert_batch(BytesIO(path.read_bytes()), output)
+        assert output.getvalue() == interactive_output
+
     def test_previous_bugs(self, capsys):
 
         # Correct handling of materials with non-integer values
@@ -356,3 +650,8 @@ class TestGalacticUnitConverter:
         self.guc.process_input_line('lok is X')
         self.guc.process_input_line('how many Credits is lok ?')
         assert self.get_output_line(capsys) == 'invalid input. Input ignored.'
+
+        # Rule compliant roman numeral without a decimal representation, e.g. XIXII
+        self.guc.process_input_line('pok is I')
+        self.guc.process_input_line('how much is lok pok lok pok pok ?')
+        assert self.get_output_line(capsys) == 'invalid input. Input ignored.'
@@ -0,0 +1,129 @@
+import csv
+import json
+from io import BytesIO, StringIO
+
+import pytest
+
+from assignment import records
+from assignment.pricing import PriceFormat
+from assignment.problem_3 import GalacticUnitConverter
+from assignment.records import OutputFormat, OutputRecord, RecordWriter
+from assignment.responses import Response, ResponseKind
+
+
+class TestRecords:
+
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        """
+        Prepares a converter with the galactic digits and materials of the assignment.
+        :return: None
+        """
+
+        self.guc = GalacticUnitConverter(interactive=False)
+        for line in ['glob is I', 'prok is V', 'pish is X', 'tegj is L', 'glob glob Silver is 34 Credits',
+                     'glob prok Gold is 57800 Credits', 'pish pish Iron is 3910 Credits']:
+            self.guc.process_line(line)
+        self.guc.line_number = 0
+
+    def records_of(self, input_lines: list[str]) -> list[OutputRecord]:
+        return list(records.iter_records(self.guc, input_lines))
+
+    def test_requests(self):
+        assert self.records_of(['how much is pish tegj glob glob ?', 'how many Credits is glob prok Silver ?',
+                                'how many Silver is glob Gold ?', 'what is 68 Credits in galactic ?']) == [
+            OutputRecord(1, 'amount_request', 'pish tegj glob glob', 42, None, None, None, None, None, None),
+            OutputRecord(2, 'credits_request', 'glob prok', 4, 'Silver', 68, None, None, None, None),
+            OutputRecord(3, 'exchange_request', 'glob', 1, 'Gold', None, None, 'Silver', 850, None),
+            OutputRecord(4, 'galactic_request', 'tegj pish prok glob glob glob', 68, None, 68, None, None, None,
+                         None)]
+
+        # Values that are not whole numbers and requests without an amount
+        self.guc.price_format = PriceFormat.FRACTION
+        assert self.records_of(['how many Credits is Iron ?']) == [
+            OutputRecord(5, 'credits_request', None, 1, 'Iron', 195.5, None, None, None, None)]
+
+    def test_errors(self):
+        assert [(record.request, record.galactic_amount, record.material, record.error) for record in self.records_of([
+            'how much is glob glob glob glob ?', 'how many Credits is glob Copper ?', 'glob Copper is x Credits',
+            'glob is Y', 'what is 4000 in galactic ?', 'how much wood could a woodchuck chuck ?', 'stats',
+            'how much is zok ?'])] == [
+            ('amount_request', 'glob glob glob glob', None, 'invalid_input'),
+            ('credits_request', 'glob', 'Copper', 'unknown_material'),
+            ('material_info', 'glob', 'Copper', 'invalid_input'),
+            ('invalid', None, None, 'invalid_input'),
+            ('galactic_request', None, None, 'not_representable'),
+            ('unknown_request', None, None, 'unknown_request'),
+            ('invalid', None, None, 'invalid_input'),
+            ('amount_request', 'zok', None, 'unresolved')]
+
+        # Amounts of Credits with more digits than Python converts to integers
+        record = self.records_of([f'glob Copper is {"9" * 5000} Credits'])[0]
+        assert (record.request, record.credits, record.error) == ('material_info', None, 'invalid_input')
+
+        # The missing digit of a deferred line which is reported while processing a single line
+        [response] = self.guc.process_line('how much is zok ?')
+        assert response.details is None
+        self.guc.detailed_responses = True
+        [response] = self.guc.process_line('how many Credits is zok Iron ?')
+        assert records.to_record(response) == OutputRecord(11, 'credits_request', 'zok', None, 'Iron', None,
+                                                           'missing_information', None, None, 'zok')
+
+    def test_responses_are_unchanged(self):
+        # Apart from the details, the responses of a converter creating detailed responses are the same
+        input_lines = ['how many Credits is glob prok Silver ?', 'glob is V', 'how many Credits is glob Silver ?',
+                       'how much is zok ?', 'what ?', 'zok is I', 'how many Gold is glob Silver ?']
+        responses = list(GalacticUnitConverter(interactive=False).process_lines(input_lines))
+
+        detailed_converter = GalacticUnitConverter(interactive=False)
+        detailed_converter.detailed_responses = True
+        detailed_responses = list(detailed_converter.process_lines(input_lines))
+        assert all(response.details is not None for response in detailed_responses)
+        assert [response._replace(details=None) for response in detailed_responses] == responses
+
+        # The details are only created while the records are read
+        assert len(list(records.iter_records(self.guc, input_lines))) == len(responses)
+        assert not self.guc.detailed_responses
+        assert self.guc.process_line('how much is glob ?')[0].details is None
+
+    def test_record_writer(self):
+        record = OutputRecord(1, 'credits_request', 'glob prok', 4, 'Silver', 68.5, None, None, None, None)
+
+        output = StringIO()
+        writer = RecordWriter(output, OutputFormat.JSONL, batch_size=2)
+        writer.write_record(record)
+        assert output.getvalue() == ''
+
+        # Written as a whole once the batch is complete
+        writer.write_response(Response(ResponseKind.INVALID_INPUT, 'invalid input. Input ignored.', None, 2))
+        lines = output.getvalue().splitlines()
+        assert [json.loads(line) for line in lines] == [
+            record._asdict(), {**dict.fromkeys(records.RECORD_FIELDS), 'line_number': 2, 'error': 'invalid_input'}]
+
+        output = StringIO()
+        with RecordWriter(output, OutputFormat.CSV) as writer:
+            writer.write_record(record)
+        assert list(csv.reader(StringIO(output.getvalue()))) == [
+            list(records.RECORD_FIELDS), ['1', 'credits_request', 'glob prok', '4', 'Silver', '68.5', '', '', '', '']]
+
+        # Even without records the CSV header is written
+        output = StringIO()
+        RecordWriter(output, OutputFormat.CSV).flush()
+        assert output.getvalue() == ','.join(records.RECORD_FIELDS) + '\n'
+
+        with pytest.raises(ValueError):
+            RecordWriter(output, OutputFormat.TEXT)
+
+    @pytest.mark.parametrize("output_format", list(OutputFormat))
+    def test_convert_batch(self, output_format):
+        source = b'how much is pish tegj glob glob ?\nhow many Credits is glob prok Gold ?\nwhat ?\n'
+        output = StringIO()
+        self.guc.convert_batch(BytesIO(source), output, output_format=output_format)
+
+        if output_format == OutputFormat.TEXT:
+            assert output.getvalue() == 'pish tegj glob glob is 42\nglob prok Gold is 57800 Credits\n' \
+                                        'invalid input. Input ignored.\n'
+        elif output_format == OutputFormat.JSONL:
+            assert [json.loads(line)['decimal_amount'] for line in output.getvalue().splitlines()] == [42, 4, None]
+        else:
+            assert [row['credits'] for row in csv.DictReader(StringIO(output.getvalue()))] == ['', '57800', '']
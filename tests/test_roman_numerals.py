@@ -0,0 +1,175 @@
+import re
+from collections import Counter
+from itertools import product
+
+import pytest
+import roman
+
+from assignment import roman_numerals
+
+ROMAN_DIGITS = 'IVXLCDM'
+
+
+def reference_is_valid_roman_numeral(roman_numeral: str) -> bool:
+    """
+    The original regex based implementation of the validity check, used as reference for the single pass variant.
+    :param roman_numeral: A string containing a roman numeral.
+    :return: True if roman_numeral is a valid roman numeral, False otherwise.
+    """
+
+    values = roman_numerals.ROMAN_DIGIT_TO_DEC_VALUE
+
+    if roman_numeral is None or roman_numeral == '':
+        return False
+
+    if not all([char in values.keys() for char in roman_numeral]):
+        return False
+
+    nbr_occurrences_numerals = Counter(roman_numeral)
+    for roman_digit in ['D', 'L', 'V']:
+        if nbr_occurrences_numerals[roman_digit] > 1:
+            return False
+
+    for roman_digit in ['I', 'X', 'C', 'M']:
+        smaller_digits = [digit for digit, value in values.items() if value < values.get(roman_digit)]
+
+        if len(smaller_digits) > 0:
+            smaller_digits_str = "".join(smaller_digits)
+            pattern = f'([{roman_digit}]{{4,}}|([{roman_digit}]{{1,3}}[{smaller_digits_str}][{roman_digit}]{{2,}}))'
+        else:
+            pattern = f'[{roman_digit}]{{4,}}'
+
+        if bool(re.search(pattern, roman_numeral)):
+            return False
+
+    allowed_to_subtract_from = {'I': ['V', 'X'], 'X': ['L', 'C'], 'C': ['D', 'M']}
+
+    for index, current_digit in enumerate(roman_numeral):
+        if index == 0:
+            continue
+
+        prev_digit = roman_numeral[index - 1]
+
+        if values.get(prev_digit) < values.get(current_digit):
+            if prev_digit in ['V', 'L', 'D'] or current_digit not in allowed_to_subtract_from.get(prev_digit):
+                return False
+
+            if index > 1 and values.get(roman_numeral[index - 2]) < values.get(current_digit):
+                return False
+
+    return True
+
+
+class TestRomanNumerals:
+
+    @pytest.mark.parametrize("length", range(1, 7))
+    def test_matches_reference_implementation(self, length):
+        # Exhaustive comparison for all strings of the given length over the roman digits
+        for chars in product(ROMAN_DIGITS, repeat=length):
+            roman_numeral = ''.join(chars)
+            assert roman_numerals.is_valid_roman_numeral(roman_numeral) == \
+                   reference_is_valid_roman_numeral(roman_numeral), roman_numeral
+
+    def test_invalid_characters(self):
+        for roman_numeral in [None, '', 'a', 'i', ' XI\n', 'X I', 'MCMXCIV?']:
+            assert not roman_numerals.is_valid_roman_numeral(roman_numeral)
+
+    def test_long_numerals(self):
+        # Numerals longer than the exhaustively tested ones
+        assert roman_numerals.is_valid_roman_numeral('MMMCMXCIX')
+        assert roman_numerals.is_valid_roman_numeral('MMCDXXXIXIII')
+        assert not roman_numerals.is_valid_roman_numeral('MMMCMXCIXD')
+        assert not roman_numerals.is_valid_roman_numeral('MMMDCCCLXXXVIIIV')
+
+    def test_numeral_table(self):
+        table = roman_numerals.roman_numeral_table()
+
+        # The table is only built once and shared
+        assert roman_numerals.roman_numeral_table() is table
+
+        # All numbers that can be represented are contained in both directions
+        assert len(table.to_decimal) == roman_numerals.MAX_ROMAN_NUMERAL
+        for number in range(1, roman_numerals.MAX_ROMAN_NUMERAL + 1):
+            assert table.to_roman[number] == roman.toRoman(number)
+            assert table.to_decimal[roman.toRoman(number)] == number
+
+        # The table can't be modified
+        with pytest.raises(TypeError):
+            table.to_decimal['IIII'] = 4
+
+    def test_roman_to_decimal(self):
+        assert roman_numerals.roman_to_decimal('MMCDXXXIX') == 2439
+        assert roman_numerals.roman_to_decimal('XLII') == 42
+
+        # Invalid according to the rules
+        assert roman_numerals.roman_to_decimal('IIII') is None
+        assert roman_numerals.roman_to_decimal('') is None
+
+        # Valid according to the rules but without a decimal representation
+        assert roman_numerals.is_valid_roman_numeral('XIXII')
+        assert roman_numerals.roman_to_decimal('XIXII') is None
+
+    def test_direct_conversion(self):
+        # Before the table is built, numerals are converted directly with the same results
+        table = roman_numerals.roman_numeral_table()
+        for number in range(1, roman_numerals.MAX_ROMAN_NUMERAL + 1):
+            assert roman_numerals._decode_roman_numeral(table.to_roman[number]) == number
+
+        for roman_numeral in ['', 'IIII', 'XIXII', 'IM', 'VX', 'MMMM', 'CMCM', 'a']:
+            assert roman_numerals._decode_roman_numeral(roman_numeral) is None
+
+    def test_standard_numeral_system(self):
+        # The standard system writes and accepts the same numerals as the table
+        system = roman_numerals.NUMERAL_SYSTEMS[roman_numerals.NumeralMode.STANDARD]
+        table = roman_numerals.roman_numeral_table()
+        assert system.max_number == roman_numerals.MAX_ROMAN_NUMERAL
+        for number in range(1, roman_numerals.MAX_ROMAN_NUMERAL + 1):
+            assert roman_numerals.encode_digits(number, system) == list(table.to_roman[number])
+        assert roman_numerals.encode_digits(4000, system) is None
+
+        for length in range(1, 5):
+            for chars in product(ROMAN_DIGITS, repeat=length):
+                assert roman_numerals.decode_digits(chars, system) == table.to_decimal.get(''.join(chars)), chars
+
+    def test_repeated_m_numerals(self):
+        system = roman_numerals.NUMERAL_SYSTEMS[roman_numerals.NumeralMode.REPEATED_M]
+
+        def decode(roman_numeral: str):
+            return roman_numerals.decode_digits(roman_numeral, system)
+
+        assert decode('MMMMMCM') == 5900
+        assert decode('M' * 50000 + 'CMXCIX') == 50000999
+        assert decode('MMMCMXCIX') == 3999
+
+        # All other rules still apply
+        for roman_numeral in ['', 'IIII', 'CMM', 'MMMMCMM', 'MMMMDD', 'MMMMIM', 'XIXII', 'MMMMa']:
+            assert decode(roman_numeral) is None, roman_numeral
+
+        assert roman_numerals.encode_digits(12000, system) == ['M'] * 12
+        assert roman_numerals.encode_digits(0, system) is None
+        assert roman_numerals.encode_digits(10 ** 12, system, roman_numerals.MAX_ENCODED_DIGITS) is None
+
+    def test_vinculum_numerals(self):
+        system = roman_numerals.NUMERAL_SYSTEMS[roman_numerals.NumeralMode.VINCULUM]
+        v = roman_numerals.VINCULUM
+        assert roman_numerals.split_roman_digits(f'MV{v}X') == ['M', f'V{v}', 'X']
+        assert f'M{v}' in roman_numerals.ROMAN_DIGITS
+
+        def decode(roman_numeral: str):
+            return roman_numerals.decode_digits(roman_numerals.split_roman_digits(roman_numeral), system)
+
+        assert decode(f'MV{v}') == 4000
+        assert decode(f'X{v}MMCMXCIX') == 12999
+        assert decode(f'M{v}M{v}M{v}M{v}C{v}M{v}') == 4900000
+        assert decode(f'M{v}' * 20000) == 20000000000
+
+        # M is repeated at most three times, only M̅ any number of times
+        for roman_numeral in ['MMMM', f'V{v}V{v}', f'IV{v}', f'V{v}MMMMM', f'L{v}X{v}X{v}X{v}X{v}', f'I{v}', v]:
+            assert decode(roman_numeral) is None, roman_numeral
+
+        # Encoding and decoding are inverse, and no digit but the largest one is repeated more than three times
+        for number in [*range(1, 20000), 999999, 1000001, 3999999999]:
+            roman_digits = roman_numerals.encode_digits(number, system)
+            assert roman_numerals.decode_digits(roman_digits, system) == number
+            assert all(roman_digits[index:index + 4] != [roman_digit] * 4
+                       for index, roman_digit in enumerate(roman_digits) if roman_digit != f'M{v}')
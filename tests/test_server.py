@@ -0,0 +1,206 @@
+import asyncio
+
+import pytest
+
+from assignment.grammar import LineKind
+from assignment.problem_3 import GalacticUnitConverter
+from assignment.server import ConverterServer, generate_load, percentile
+
+
+async def send_lines(port: int, input_lines: list[str]) -> list[list[str]]:
+    """
+    Sends all lines at once over a new connection and collects the answers.
+    :param port: The port of the server.
+    :param input_lines: The input lines.
+    :return: For each input line the received lines up to and including the done line, split into their fields.
+    """
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(''.join(f'{line}\n' for line in input_lines).encode('utf-8'))
+    await writer.drain()
+
+    answers = []
+    current = []
+    while len(answers) < len(input_lines):
+        fields = (await reader.readline()).decode('utf-8').rstrip('\n').split('\t')
+        current.append(fields)
+        if fields[1] == 'done':
+            answers.append(current)
+            current = []
+
+    writer.close()
+    await writer.wait_closed()
+    return answers
+
+
+async def _read_all(reader: asyncio.StreamReader) -> list[bytes]:
+    lines = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            return lines
+        lines.append(line)
+
+
+class TestConverterServer:
+
+    @staticmethod
+    def run_with_server(shared_knowledge_base: bool, client, **server_options):
+        """
+        Starts a server on a free port and runs the client coroutine function against it.
+        :param shared_knowledge_base: Whether the knowledge base is shared between connections.
+        :param client: A coroutine function receiving the port.
+        :param server_options: Further options of the ConverterServer.
+        :return: The result of the client.
+        """
+
+        async def run():
+            server = await ConverterServer(shared_knowledge_base, **server_options).start_tcp('127.0.0.1', 0)
+            async with server:
+                return await client(server.sockets[0].getsockname()[1])
+
+        return asyncio.run(run())
+
+    def test_pipelined_session(self):
+        input_lines = ['glob is I', 'pish is X', 'pish pish Iron is 3910 Credits', 'how many Credits is glob Iron ?',
+                       'how much is zok glob ?', 'zok is V', 'what ?']
+
+        answers = self.run_with_server(False, lambda port: send_lines(port, input_lines))
+
+        assert answers[0] == [['1', 'done', '']]
+        assert answers[3] == [['4', 'credits', 'glob Iron is 195.5 Credits'], ['4', 'done', '']]
+
+        # The missing digit is requested from the client instead of waiting for it
+        assert answers[4] == [['5', 'missing_information', 'missing information / invalid input: How much is zok ?'],
+                              ['5', 'done', '']]
+
+        # The deferred line is answered with its line number as soon as the digit is defined
+        assert answers[5] == [['5', 'amount', 'zok glob is 6'], ['6', 'done', '']]
+        assert answers[6] == [['7', 'invalid_input', 'invalid input. Input ignored.'], ['7', 'done', '']]
+
+    @pytest.mark.parametrize("shared_knowledge_base", [False, True])
+    def test_knowledge_base_sharing(self, shared_knowledge_base):
+
+        async def client(port):
+            await send_lines(port, ['glob is I'])
+            return await send_lines(port, ['how much is glob ?'])
+
+        answers = self.run_with_server(shared_knowledge_base, client)
+        if shared_knowledge_base:
+            assert answers[0][0][1:] == ['amount', 'glob is 1']
+        else:
+            assert answers[0][0][1] == 'missing_information'
+
+    def test_shared_deferred_line_is_answered_to_its_client(self):
+
+        async def client(port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'how much is zok ?\n')
+            assert (await reader.readline()).split(b'\t')[1] == b'missing_information'
+            assert (await reader.readline()).split(b'\t')[1] == b'done'
+
+            # Another client defines the digit
+            answers = await send_lines(port, ['zok is X'])
+            line = await reader.readline()
+
+            writer.close()
+            await writer.wait_closed()
+            return answers, line
+
+        answers, line = self.run_with_server(True, client)
+        assert answers == [[['2', 'done', '']]]
+        assert line == b'1\tamount\tzok is 10\n'
+
+    def test_deferred_lines_of_closed_connection_are_discarded(self):
+
+        async def client(port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'how much is zok ?\nzok zok Gold is 20 Credits\n')
+            await writer.drain()
+            for _ in range(4):
+                await reader.readline()
+            writer.close()
+            await writer.wait_closed()
+
+            # Another client defines the digit after the first one disconnected
+            await asyncio.sleep(0.05)
+            return await send_lines(port, ['zok is X', 'how many Credits is zok Gold ?'])
+
+        def converter_factory() -> GalacticUnitConverter:
+            converters.append(GalacticUnitConverter(interactive=False))
+            return converters[-1]
+
+        converters = []
+        answers = self.run_with_server(True, client, converter_factory=converter_factory)
+        assert answers == [[['3', 'done', '']], [['4', 'unknown_material', 'unknown material: Gold'], ['4', 'done', '']]]
+        assert converters[0].pending_lines == {}
+
+    def test_overlong_and_undecodable_lines(self):
+        input_lines = ['glob is I', f'how much is {"glob " * 100}?', 'how much is glob ?',
+                       'how much is \udcff ?', 'how much is glob glob ?']
+
+        async def client(port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(''.join(f'{line}\n' for line in input_lines).encode('utf-8', 'surrogateescape'))
+            await writer.drain()
+            writer.write_eof()
+            lines = [line.decode('utf-8').rstrip('\n').split('\t') for line in await _read_all(reader)]
+            writer.close()
+            await writer.wait_closed()
+            return lines
+
+        # Rejected lines are counted like all others and the connection stays open
+        assert self.run_with_server(False, client, max_line_bytes=64) == [
+            ['1', 'done', ''],
+            ['2', 'invalid_input', 'invalid input. Input ignored.'], ['2', 'done', ''],
+            ['3', 'amount', 'glob is 1'], ['3', 'done', ''],
+            ['4', 'invalid_input', 'invalid input. Input ignored.'], ['4', 'done', ''],
+            ['5', 'amount', 'glob glob is 2'], ['5', 'done', '']]
+
+    @pytest.mark.parametrize("shared_knowledge_base", [False, True])
+    def test_failing_line(self, shared_knowledge_base, caplog):
+
+        def converter_factory() -> GalacticUnitConverter:
+            converter = GalacticUnitConverter(interactive=False)
+
+            def fail(parts):
+                if parts[0] == 'stats':
+                    raise OverflowError('value too large')
+                raise RuntimeError('bug')
+
+            converter._line_handlers[LineKind.STATS_REQUEST] = fail
+            converter._line_handlers[LineKind.UNKNOWN_REQUEST] = fail
+            return converter
+
+        async def client(port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'glob is I\nstats\nhow much is glob ?\nhow much wood ?\nhow much is glob ?\n')
+            await writer.drain()
+            lines = [line.decode('utf-8').rstrip('\n').split('\t') for line in await _read_all(reader)]
+            writer.close()
+            await writer.wait_closed()
+            return lines
+
+        # Input the converter can't process is answered as invalid, a bug closes the connection and is logged
+        assert self.run_with_server(shared_knowledge_base, client, converter_factory=converter_factory) == [
+            ['1', 'done', ''],
+            ['2', 'invalid_input', 'invalid input. Input ignored.'], ['2', 'done', ''],
+            ['3', 'amount', 'glob is 1'], ['3', 'done', '']]
+        assert 'RuntimeError: bug' in caplog.text
+
+    def test_load_generator(self):
+
+        async def client(port):
+            return await generate_load(['glob is I', 'how much is glob glob ?'] * 50, port=port, connections=4,
+                                       pipeline_depth=8)
+
+        report = self.run_with_server(False, client)
+        assert report.requests == 400
+        assert report.requests_per_second > 0
+        assert 0 < report.p50_latency_ms <= report.p99_latency_ms
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 0.5) == 50
+        assert percentile(values, 0.99) == 99
+        assert percentile([], 0.5) == 0.0
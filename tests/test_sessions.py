@@ -0,0 +1,95 @@
+import pytest
+
+from assignment.problem_3 import GalacticUnitConverter
+from assignment.responses import ResponseKind
+from assignment.sessions import SessionManager
+
+
+class TestSessionManager:
+
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        """
+        Creates a manager whose base knows the galactic digits of the assignment and the value of Silver.
+        :return: None
+        """
+
+        base = GalacticUnitConverter(interactive=False)
+        for line in ['glob is I', 'prok is V', 'pish is X', 'tegj is L', 'glob glob Silver is 34 Credits']:
+            base.process_line(line)
+
+        self.manager = SessionManager(base.snapshot(), max_active_sessions=2)
+
+    @staticmethod
+    def ask(session, request: str) -> str:
+        return session.process_line(request)[0].text
+
+    def test_base_requests(self):
+        session = self.manager.session('tenant')
+        assert self.ask(session, 'how many Credits is glob prok Silver ?') == 'glob prok Silver is 68 Credits'
+
+        # Requests alone don't create a converter or differences to the base
+        assert not session.has_own_information
+        assert self.manager.session('tenant') is session
+        assert session.line_number == 1
+
+    def test_isolation(self):
+        first, second = self.manager.session('first'), self.manager.session('second')
+        first.process_line('glob prok Gold is 57800 Credits')
+        second.process_line('glob is X')
+
+        assert self.ask(first, 'how many Credits is glob prok Gold ?') == 'glob prok Gold is 57800 Credits'
+        assert self.ask(second, 'how many Credits is glob prok Gold ?') == 'unknown material: Gold'
+
+        # Redefining a digit of the base reprices the materials of the base in this session only
+        assert self.ask(second, 'how many Credits is pish Silver ?') == 'pish Silver is 17 Credits'
+        assert self.ask(first, 'how many Credits is pish Silver ?') == 'pish Silver is 170 Credits'
+        assert self.ask(self.manager.session('third'), 'how much is glob ?') == 'glob is 1'
+        assert self.manager.base.galactic_digit_to_roman['glob'] == 'I'
+
+    def test_release(self):
+        sessions = [self.manager.session(tenant) for tenant in range(4)]
+        for index, session in enumerate(sessions):
+            session.process_line(f'glob Material{index} is {index + 1} Credits')
+
+        # Only the differences to the base are kept once the converters are released
+        self.manager.release_all()
+        assert list(sessions[0].material_facts) == ['Material0']
+        assert sessions[0].galactic_digit_to_roman is None and sessions[0].material_values is None
+
+        # The sessions share the same amount
+        assert sessions[0].material_facts['Material0'].amount_galactic is \
+            sessions[1].material_facts['Material1'].amount_galactic
+
+        for index, session in enumerate(sessions):
+            assert self.ask(session, f'how many Credits is prok Material{index} ?') == \
+                f'prok Material{index} is {5 * (index + 1)} Credits'
+
+        # A material of the base without value in the session stays without value
+        sessions[0].process_line('glob is V')
+        self.manager.release_all()
+        assert sessions[0].material_values == {'Silver': None}
+        assert self.ask(sessions[0], 'how many Credits is prok Silver ?') == 'unknown material: Silver'
+        sessions[0].process_line('glob is I')
+        assert self.ask(sessions[0], 'how many Credits is prok Silver ?') == 'prok Silver is 85 Credits'
+
+        # Own information about a material of the base replaces it, also after a redefinition of its digits
+        sessions[1].process_line('pish Silver is 40 Credits')
+        sessions[1].process_line('pish is V')
+        self.manager.release_all()
+        assert self.ask(sessions[1], 'how many Credits is pish Silver ?') == 'pish Silver is 40 Credits'
+        assert self.ask(sessions[1], 'how many Credits is glob Silver ?') == 'glob Silver is 8 Credits'
+        assert self.ask(sessions[2], 'how many Credits is glob Silver ?') == 'glob Silver is 17 Credits'
+
+    def test_deferred_lines(self):
+        session = self.manager.session('tenant')
+        response, = session.process_line('how much is zorg glob ?')
+        assert response.kind == ResponseKind.MISSING_INFORMATION
+        assert session.pending_lines is not None
+
+        # Deferred lines are kept in the session while it has no converter
+        for tenant in range(3):
+            self.manager.session(tenant).process_line('prok Iron is 5 Credits')
+
+        responses = session.process_line('zorg is X')
+        assert [(response.text, response.line_number) for response in responses] == [('zorg glob is 11', 1)]
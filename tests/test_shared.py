@@ -0,0 +1,111 @@
+import threading
+
+import pytest
+
+from assignment.pricing import Price
+from assignment.responses import ResponseKind
+from assignment.shared import ReadWriteLock, SharedConverter
+
+
+class TestSharedConverter:
+
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        """
+        Creates a shared converter with some information about galactic digits and materials.
+        :return: None
+        """
+
+        self.shared = SharedConverter(compact_after=50)
+        for line in ['glob is I', 'prok is V', 'pish is X', 'glob Silver is 10 Credits',
+                     'glob prok Gold is 40 Credits']:
+            self.shared.process_line(line)
+
+    def test_requests(self):
+        assert self.shared.version == 5
+        assert [response.text for response in self.shared.process_line('how many Credits is glob prok Gold ?')] == \
+            ['glob prok Gold is 40 Credits']
+
+        # Requests with missing digits are answered but not deferred
+        response, = self.shared.process_line('how much is tegj ?')
+        assert response.kind == ResponseKind.MISSING_INFORMATION
+        assert self.shared.process_line('tegj is L') == []
+
+        # Information with missing digits is deferred by the writer
+        assert self.shared.process_line('zorg Iron is 10 Credits')[0].kind == ResponseKind.MISSING_INFORMATION
+        self.shared.process_line('zorg is V')
+        assert self.shared.snapshot().material_values['Iron'] == Price(2)
+
+    def test_compaction(self):
+        for index in range(120):
+            self.shared.process_line(f'pish Material{index} is {index} Credits')
+
+        # A reader starting after the compaction loads the snapshot and replays the remaining facts
+        answers = []
+        reader = threading.Thread(target=lambda: answers.extend(
+            self.shared.process_line('how many Credits is pish Material119 ?')))
+        reader.start()
+        reader.join()
+        assert [response.text for response in answers] == ['pish Material119 is 119 Credits']
+        assert self.shared.version == 125
+
+    def test_read_write_lock(self):
+        lock = ReadWriteLock()
+        with lock.read(), lock.read():
+            acquired = threading.Event()
+
+            def write() -> None:
+                with lock.write():
+                    acquired.set()
+
+            writer = threading.Thread(target=write)
+            writer.start()
+
+            # The writer waits until all readers released the lock
+            assert not acquired.wait(0.05)
+
+        writer.join()
+        assert acquired.is_set()
+
+    def test_concurrent_readers_and_writers(self):
+        errors = []
+        stop = threading.Event()
+
+        def write(writer_index: int) -> None:
+            for index in range(300):
+                # Redefining glob reprices Silver and Gold, their values for the requested amounts stay the same
+                self.shared.process_line(f'glob is {"IX"[index % 2]}')
+                self.shared.process_line(f'pish Iron{writer_index}x{index} is {index + 1} Credits')
+
+        def read() -> None:
+            last_version = 0
+            while not stop.is_set():
+                version = self.shared.version
+                for request, expected in [('how many Credits is glob Silver ?', 10),
+                                          ('how many Credits is glob prok Gold ?', 40)]:
+                    response, = self.shared.process_line(request)
+                    if response.value != expected:
+                        errors.append(response)
+
+                # A fact is either fully visible or not at all
+                response, = self.shared.process_line('how many Credits is pish Iron0x10 ?')
+                if response.kind not in (ResponseKind.CREDITS, ResponseKind.UNKNOWN_MATERIAL) or \
+                        response.kind == ResponseKind.CREDITS and response.value != 11:
+                    errors.append(response)
+
+                if version < last_version:
+                    errors.append(version)
+                last_version = version
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        writers = [threading.Thread(target=write, args=(index,)) for index in range(3)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+
+        assert errors == []
+        assert self.shared.snapshot()[:3] == self.shared._primary.snapshot()[:3]
@@ -0,0 +1,112 @@
+import struct
+
+import pytest
+
+from assignment import snapshot_file
+from assignment.pricing import Price
+from assignment.problem_3 import GalacticUnitConverter, KnowledgeBase, MaterialFact
+from assignment.snapshot_file import SnapshotFile, SnapshotFormatError
+
+
+class TestSnapshotFile:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path) -> None:
+        """
+        Prepares a converter with some information and the path of a snapshot file.
+        :param tmp_path: A temporary directory provided by pytest.
+        :return: None
+        """
+
+        self.guc = GalacticUnitConverter(interactive=False)
+        for line in ['glob is I', 'prok is V', 'pish is X', 'glob glob Silver is 34 Credits',
+                     'glob prok Gold is 57800 Credits', 'pish pish Iron is 3910 Credits']:
+            self.guc.process_line(line)
+
+        self.path = tmp_path / 'knowledge_base.snapshot'
+
+    def corrupt(self, position: int) -> None:
+        data = bytearray(self.path.read_bytes())
+        data[position] ^= 0xFF
+        self.path.write_bytes(bytes(data))
+
+    def test_round_trip(self):
+        knowledge_base = self.guc.snapshot()
+        snapshot_file.save_snapshot(knowledge_base, self.path)
+        assert snapshot_file.load_snapshot(self.path) == knowledge_base
+
+        # Empty knowledge bases and empty strings are stored as well
+        empty = KnowledgeBase({}, {}, 0, {'Zinc': MaterialFact((), 1, 2), '': MaterialFact(('',), 3, 4)})
+        snapshot_file.save_snapshot(empty, self.path)
+        assert snapshot_file.load_snapshot(self.path) == empty
+
+    def test_huge_credits(self):
+        # Credits are not limited in size, neither in the converter nor in the snapshot
+        huge_credits = 2 ** 64 * 10 ** 20 + 1
+        self.guc.process_line(f'glob Platinum is {huge_credits} Credits')
+        self.guc.process_line(f'glob glob Copper is {2 ** 63} Credits')
+        knowledge_base = self.guc.snapshot()
+        snapshot_file.save_snapshot(knowledge_base, self.path)
+        assert snapshot_file.load_snapshot(self.path) == knowledge_base
+        assert knowledge_base.material_facts['Platinum'].credits == huge_credits
+
+        guc = GalacticUnitConverter(interactive=False)
+        guc.load_snapshot(self.path)
+        guc.process_line('glob is X')
+        assert guc.material_values['Copper'] == Price(2 ** 61, 5)
+
+    def test_converter_warm_start(self):
+        self.guc.save_snapshot(self.path)
+
+        guc = GalacticUnitConverter(interactive=False)
+        guc.load_snapshot(self.path)
+        assert guc.galactic_digit_to_roman == self.guc.galactic_digit_to_roman
+        assert guc.material_values == self.guc.material_values
+        assert guc.knowledge_base_version == self.guc.knowledge_base_version
+        assert [response.text for response in guc.process_line('how many Credits is glob prok Silver ?')] == \
+               ['glob prok Silver is 68 Credits']
+
+        # The material information is only read once it is needed to recalculate the material values
+        assert guc.material_facts == {}
+        guc.process_line('glob is X')
+        assert guc.material_facts['Silver'] == MaterialFact(('glob', 'glob'), 34, 0)
+        assert guc.material_values['Silver'] == Price(17, 10)
+
+        # Information of the snapshot precedes all inputs of the new converter
+        guc.process_line('pish Gold is 20 Credits')
+        assert guc.material_values['Gold'] == Price(2)
+
+    def test_invalid_files(self):
+        self.path.write_bytes(b'')
+        with pytest.raises(SnapshotFormatError):
+            SnapshotFile(self.path)
+
+        self.path.write_bytes(b'not a snapshot of a knowledge base')
+        with pytest.raises(SnapshotFormatError):
+            SnapshotFile(self.path)
+
+        self.guc.save_snapshot(self.path)
+        data = bytearray(self.path.read_bytes())
+        struct.pack_into('<H', data, 8, snapshot_file.FORMAT_VERSION + 1)
+        self.path.write_bytes(bytes(data))
+        with pytest.raises(SnapshotFormatError, match='version'):
+            SnapshotFile(self.path)
+
+    def test_checksums(self):
+        # A corrupt section table is detected when opening the file
+        self.guc.save_snapshot(self.path)
+        self.corrupt(30)
+        with pytest.raises(SnapshotFormatError, match='Corrupt'):
+            SnapshotFile(self.path)
+
+        # A corrupt section is detected once it is read
+        self.guc.save_snapshot(self.path)
+        self.corrupt(len(self.path.read_bytes()) - 1)
+        with SnapshotFile(self.path) as loaded_file:
+            assert loaded_file.material_values() == self.guc.material_values
+            with pytest.raises(SnapshotFormatError, match='Corrupt'):
+                loaded_file.material_facts()
+
+    def test_unsupported_strings(self):
+        with pytest.raises(ValueError):
+            snapshot_file.save_snapshot(KnowledgeBase({'gl\0b': 'I'}, {}), self.path)
@@ -0,0 +1,220 @@
+import sqlite3
+
+import pytest
+
+from assignment.pricing import Price
+from assignment.problem_3 import GalacticUnitConverter
+from assignment.spill import SpillIndex, SpillStore, estimate_size
+
+
+class TestSpillStore:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path) -> None:
+        """
+        Creates a store keeping at most two entries in memory.
+        :return: None
+        """
+
+        self.path = tmp_path / 'spill.sqlite'
+        self.store = SpillStore(self.path, 'values', max_entries=2)
+        yield
+        self.store.close()
+
+    def test_eviction_and_reload(self):
+        for index in range(5):
+            self.store[f'key{index}'] = index
+
+        stats = self.store.stats()
+        assert (stats.resident_entries, stats.spilled_entries, stats.evictions) == (2, 3, 3)
+        assert len(self.store) == 5
+        assert sorted(self.store) == [f'key{index}' for index in range(5)]
+
+        # The least recently used entry was spilled first and is moved back into memory when read
+        assert 'key0' in self.store
+        assert self.store['key0'] == 0
+        assert self.store.get('key4') == 4
+        assert self.store.get('unknown') is None
+        with pytest.raises(KeyError):
+            _ = self.store['unknown']
+
+        stats = self.store.stats()
+        assert (stats.hits, stats.spill_hits, stats.misses) == (1, 1, 2)
+        assert stats.spill_hit_rate == 0.5
+        assert list(self.store._resident) == ['key0', 'key4']
+
+    def test_update_and_delete(self):
+        for index in range(4):
+            self.store[f'key{index}'] = index
+
+        # Overwriting a spilled entry removes its spilled copy
+        self.store['key0'] = 'new'
+        assert len(self.store) == 4
+        assert self.store.copy() == {'key0': 'new', 'key1': 1, 'key2': 2, 'key3': 3}
+
+        del self.store['key1']
+        del self.store['key0']
+        assert len(self.store) == 2
+        with pytest.raises(KeyError):
+            del self.store['key1']
+
+        # Neither items() nor copy() move spilled entries back into memory
+        assert self.store.stats().spill_hits == 0
+
+        self.store.clear()
+        assert len(self.store) == 0
+        assert self.store.stats().resident_bytes == 0
+
+    def test_byte_budget(self):
+        price = Price.of(3910, 20)
+        store = SpillStore(self.path, 'prices', max_bytes=3 * (estimate_size(price) + 200))
+        for index in range(10):
+            store[f'Material{index}'] = price
+
+        stats = store.stats()
+        assert 0 < stats.resident_entries < 10
+        assert stats.resident_bytes <= store.max_bytes
+        assert stats.resident_entries + stats.spilled_entries == 10
+        assert store['Material0'] == price
+        store.close()
+
+    def test_invalid_table(self):
+        with pytest.raises(ValueError):
+            SpillStore(self.path, 'values; DROP TABLE values')
+
+        # The table of another store is never overwritten
+        self.store['key0'] = 0
+        with pytest.raises(ValueError):
+            SpillStore(self.path, 'values')
+        assert self.store['key0'] == 0
+
+    def test_temporary_file(self):
+        store = SpillStore(None, 'values', max_entries=1)
+        store.update({'key0': 0, 'key1': 1})
+        assert store.stats().spilled_entries == 1
+        assert store.copy() == {'key0': 0, 'key1': 1}
+        store.close()
+
+
+class TestSpillIndex:
+
+    def test_index(self, tmp_path):
+        index = SpillIndex(tmp_path / 'spill.sqlite', 'dependencies')
+        index.add_all([('glob', 'Silver'), ('glob', 'Iron'), ('prok', 'Gold')])
+        index.add('glob', 'Silver')
+        assert index == {'glob': {'Silver', 'Iron'}, 'prok': {'Gold'}}
+
+        # Keys without members are removed
+        index.discard('prok', 'Gold')
+        index.discard('glob', 'Gold')
+        assert len(index) == 1 and index.get('prok', ()) == ()
+        with pytest.raises(KeyError):
+            _ = index['prok']
+
+        index.clear()
+        assert len(index) == 0
+        index.close()
+
+
+class TestBoundedConverter:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path) -> None:
+        """
+        Creates a converter knowing the galactic digits of the assignment that keeps two materials in memory.
+        :return: None
+        """
+
+        self.converter = GalacticUnitConverter(interactive=False)
+        for line in ['glob is I', 'prok is V', 'pish is X', 'tegj is L', 'glob glob Silver is 34 Credits']:
+            self.converter.process_line(line)
+
+        self.converter.limit_material_memory(tmp_path / 'spill.sqlite', max_entries=2)
+
+    def ask(self, request: str) -> str:
+        return self.converter.process_line(request)[0].text
+
+    def test_spilled_materials(self):
+        for index in range(10):
+            self.converter.process_line(f'pish glob Material{index} is {(index + 1) * 11} Credits')
+
+        assert self.converter.material_values.stats().spilled_entries == 9
+        assert self.ask('how many Credits is glob prok Silver ?') == 'glob prok Silver is 68 Credits'
+        for index in range(10):
+            assert self.ask(f'how many Credits is pish Material{index} ?') == \
+                f'pish Material{index} is {(index + 1) * 10} Credits'
+
+        assert self.converter.material_values.stats().spill_hits > 0
+        assert len(self.converter.snapshot().material_values) == 11
+
+    def test_repricing(self):
+        for index in range(5):
+            self.converter.process_line(f'prok Material{index} is {(index + 1) * 50} Credits')
+        for index in range(5):
+            self.converter.process_line(f'pish Other{index} is {(index + 1) * 10} Credits')
+
+        # Redefining a digit reprices spilled materials as well, but only reloads the ones depending on it
+        self.converter.process_line('prok is X')
+        assert self.converter.material_facts.stats().spill_hits == 5
+        assert self.ask('how many Credits is glob Material0 ?') == 'glob Material0 is 5 Credits'
+        assert self.ask('how many Credits is glob Silver ?') == 'glob Silver is 17 Credits'
+        assert self.converter.material_dependencies['prok'] == {f'Material{index}' for index in range(5)}
+
+    def test_spill_file(self, tmp_path):
+        other_path = tmp_path / 'other.sqlite'
+        other_path.write_bytes(b'')
+        with pytest.raises(FileExistsError):
+            self.converter.limit_material_memory(other_path, max_entries=2)
+
+        # Limiting the memory again with the own spill file only changes the limits of the stores
+        stores = [self.converter.material_values, self.converter.material_facts]
+        for index in range(5):
+            self.converter.process_line(f'prok Material{index} is {(index + 1) * 50} Credits')
+        self.converter.limit_material_memory(tmp_path / 'spill.sqlite', max_entries=1)
+        assert self.converter.material_values is stores[0] and self.converter.material_facts is stores[1]
+        assert self.converter.material_values.stats().spilled_entries == 5
+
+        # With another spill file the materials are moved to new stores, here in a temporary file
+        self.converter.limit_material_memory(max_entries=3)
+        for store in stores:
+            with pytest.raises(sqlite3.ProgrammingError):
+                store.copy()
+        assert self.converter.material_values.stats().spilled_entries == 3
+        assert self.ask('how many Credits is glob Material4 ?') == 'glob Material4 is 50 Credits'
+        assert self.converter.material_dependencies['prok'] == {f'Material{index}' for index in range(5)}
+
+    def test_changed_galactic_digit_limit(self, tmp_path):
+        spill_path = tmp_path / 'spill.sqlite'
+        self.converter.limit_material_memory(spill_path, max_entries=2, max_galactic_digits=1)
+        assert self.converter.galactic_digit_to_roman.stats().spilled_entries == 3
+
+        # The galactic digits are limited in the own spill file again after their limit was removed
+        self.converter.limit_material_memory(spill_path, max_entries=2)
+        assert self.converter.galactic_digit_to_roman == {'glob': 'I', 'prok': 'V', 'pish': 'X', 'tegj': 'L'}
+        self.converter.limit_material_memory(spill_path, max_entries=2, max_galactic_digits=2)
+        assert self.converter.galactic_digit_to_roman.stats().spilled_entries == 2
+        assert self.ask('how much is pish tegj glob glob ?') == 'pish tegj glob glob is 42'
+
+        # New galactic digits and materials are not kept in the token table while their memory is limited
+        tokens = len(self.converter.tokens)
+        self.converter.process_line('zok is C')
+        self.converter.process_line('zok Copper is 100 Credits')
+        assert len(self.converter.tokens) == tokens
+
+    def test_exchange_requests(self):
+        for index in range(5):
+            self.converter.process_line(f'prok Material{index} is {(index + 1) * 50} Credits')
+
+        # Without the matrix of all exchange rates, the rate is calculated from the two values
+        assert self.ask('how many Silver is prok Material0 ?') == 'prok Material0 is 2.9411764705882355 Silver'
+        assert self.ask('how many Material4 is prok Material1 ?') == 'prok Material1 is 2 Material4'
+        assert self.converter.exchange_rates() is None
+
+    def test_galactic_digits(self, tmp_path):
+        converter = GalacticUnitConverter(interactive=False)
+        converter.limit_material_memory(tmp_path / 'digits.sqlite', max_entries=2, max_galactic_digits=2)
+        for line in ['glob is I', 'prok is V', 'pish is X', 'tegj is L']:
+            converter.process_line(line)
+
+        assert converter.process_line('how much is pish tegj glob glob ?')[0].text == 'pish tegj glob glob is 42'
+        assert converter.galactic_digit_to_roman.stats().spilled_entries == 2
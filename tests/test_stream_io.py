@@ -0,0 +1,45 @@
+from io import BytesIO, StringIO
+
+import pytest
+
+from assignment import stream_io
+
+
+class TestStreamIO:
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 5, 1024])
+    def test_iter_lines(self, chunk_size):
+        # Lines spanning multiple chunks, multi-byte characters and a missing final line terminator
+        data = 'glob is I\n\nhow much is glob ?\nÄrger Iron is 3 Credits'.encode('utf-8')
+        lines = list(stream_io.iter_lines(BytesIO(data), chunk_size))
+        assert lines == ['glob is I', '', 'how much is glob ?', 'Ärger Iron is 3 Credits']
+
+        # A final line terminator does not result in an additional empty line
+        assert list(stream_io.iter_lines(BytesIO(b'a\nb\n'), chunk_size)) == ['a', 'b']
+        assert list(stream_io.iter_lines(BytesIO(b''), chunk_size)) == []
+
+    @pytest.mark.parametrize("use_mmap", [True, False])
+    def test_iter_file_lines(self, tmp_path, use_mmap):
+        path = tmp_path / 'input.txt'
+        path.write_bytes(b'glob is I\nhow much is glob ?\n')
+        assert list(stream_io.iter_file_lines(path, 4, use_mmap)) == ['glob is I', 'how much is glob ?']
+
+        # Empty files can't be memory mapped
+        path.write_bytes(b'')
+        assert list(stream_io.iter_file_lines(path, 4, use_mmap)) == []
+
+    def test_buffered_line_writer(self):
+        output = StringIO()
+        writer = stream_io.BufferedLineWriter(output, buffer_size=10)
+
+        writer.write_line('glob')
+        assert output.getvalue() == ''
+
+        # Written as soon as the buffer size is exceeded
+        writer.write_line('is 1')
+        writer.write_line('prok')
+        assert output.getvalue() == 'glob\nis 1\n'
+
+        with writer:
+            writer.write_line('')
+        assert output.getvalue() == 'glob\nis 1\nprok\n\n'
@@ -0,0 +1,110 @@
+import random
+from fractions import Fraction
+from math import gcd
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from assignment import roman_numerals
+from assignment.problem_3 import GalacticUnitConverter
+from assignment.vectorized import encode_galactic_amounts, galactic_to_decimal_array, material_price_fractions, \
+    price_amounts, price_amounts_exact, roman_to_decimal_array
+
+
+class TestVectorized:
+
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        """
+        Prepares a converter with some galactic digits and materials and a seeded random generator.
+        :return: None
+        """
+
+        self.guc = GalacticUnitConverter()
+        for line in ['glob is I', 'prok is V', 'pish is X', 'tegj is L', 'blub is C', 'klop is M',
+                     'glob glob Silver is 34 Credits', 'glob prok Gold is 57800 Credits',
+                     'pish pish Iron is 3910 Credits', 'blub Copper is 10 Credits']:
+            self.guc.process_input_line(line)
+
+        self.random = random.Random(42)
+
+    def test_roman_to_decimal_array(self):
+        numerals = [roman_numerals.roman_numeral_table().to_roman[number] for number in range(1, 4000)]
+
+        # Random strings, mostly invalid, and some special cases
+        numerals += [''.join(self.random.choices('IVXLCDM', k=self.random.randint(1, 8))) for _ in range(5000)]
+        numerals += ['', 'XIXII', 'IIII', 'x', 'MMMM', 'Ä', 'X I']
+
+        values, valid = roman_to_decimal_array(numerals)
+        assert values.dtype == np.int64
+        for numeral, value, is_valid in zip(numerals, values, valid):
+            expected = roman_numerals.roman_to_decimal(numeral)
+            assert is_valid == (expected is not None), numeral
+            assert value == (expected or 0), numeral
+
+        values, valid = roman_to_decimal_array([])
+        assert len(values) == 0 and len(valid) == 0
+
+    def test_nul_characters(self):
+        # NUL characters are no padding within strings, only trailing ones of numpy arrays can't be told apart from it
+        values, valid = roman_to_decimal_array(['X\0', '\0X', 'X\0I', 'XI'])
+        assert values.tolist() == [0, 0, 0, 11] and valid.tolist() == [False, False, False, True]
+
+        values, valid = roman_to_decimal_array(np.array(['X\0', '\0X', 'X\0I', 'XI']))
+        assert values.tolist() == [10, 0, 0, 11] and valid.tolist() == [True, False, False, True]
+
+    def test_galactic_to_decimal_array(self):
+        galactic_digits = ['glob', 'prok', 'pish', 'tegj', 'blub', 'klop']
+        amounts = [self.random.choices(galactic_digits, k=self.random.randint(1, 6)) for _ in range(3000)]
+        amounts += [[], ['pish', 'tegj', 'glob', 'glob'], ['glob', 'zok']]
+
+        token_ids, vocabulary = encode_galactic_amounts(amounts)
+        values, valid = galactic_to_decimal_array(self.guc, token_ids, vocabulary)
+
+        for amount, value, is_valid in zip(amounts[:-1], values, valid):
+            expected = self.guc.convert_galactic_to_decimal(amount)
+            assert is_valid == (expected is not None), amount
+            assert value == (expected or 0), amount
+
+        # Unknown galactic digits make the amount invalid
+        assert values[-2] == 42 and not valid[-1]
+
+    def test_price_amounts(self):
+        materials = ['Silver', 'Gold', 'Iron', 'Copper', 'Zinc']
+        numerators, denominators, known = material_price_fractions(self.guc, materials)
+        assert known.tolist() == [True, True, True, True, False]
+
+        amounts = [['glob'], ['glob', 'glob', 'glob'], ['glob', 'prok'], ['pish', 'tegj'], ['klop', 'blub', 'klop']]
+        token_ids, vocabulary = encode_galactic_amounts(amounts)
+        values, _ = galactic_to_decimal_array(self.guc, token_ids, vocabulary)
+
+        material_indices = np.array([[0, 1, 2, 3]] * len(amounts)).reshape(-1)
+        credits = price_amounts(np.repeat(values, 4), material_indices, numerators, denominators)
+
+        # The results match the answers of the converter, e.g. 0.3 instead of 0.30000000000000004 for glob glob glob
+        # Copper, since the exact value is rounded once
+        for amount, material_index, credit in zip([amount for amount in amounts for _ in range(4)], material_indices,
+                                                  credits):
+            request = f'how many Credits is {" ".join(amount)} {materials[material_index]} ?'
+            assert credit == self.guc.process_line(request)[0].value, request
+        assert credits[7] == 0.3
+
+        # The exact variant returns reduced fractions
+        value_numerators, value_denominators = price_amounts_exact(np.repeat(values, 4), material_indices,
+                                                                   numerators, denominators)
+        for value, material_index, numerator, denominator in zip(np.repeat(values, 4), material_indices,
+                                                                 value_numerators, value_denominators):
+            price = self.guc.material_values[materials[material_index]]
+            assert Fraction(int(numerator), int(denominator)) == Fraction(int(value) * price.numerator,
+                                                                           price.denominator)
+            assert gcd(int(numerator), int(denominator)) == 1
+
+    def test_price_amounts_beyond_exact_floats(self):
+        # Quotients of integers beyond 2 ** 53 are rounded once as well, products beyond int64 are rejected
+        numerators, denominators = np.array([2 ** 60 + 1], dtype=np.int64), np.array([3], dtype=np.int64)
+        assert price_amounts(np.array([7]), np.array([0]), numerators, denominators)[0] == 7 * (2 ** 60 + 1) / 3
+        with pytest.raises(OverflowError):
+            price_amounts(np.array([8]), np.array([0]), numerators, denominators)
+        with pytest.raises(OverflowError):
+            price_amounts_exact(np.array([8]), np.array([0]), numerators, denominators)